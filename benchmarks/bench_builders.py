@@ -0,0 +1,51 @@
+"""Benchmark the specialised filter builders against the generic create_new_filter() path.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_builders
+"""
+
+import timeit
+
+from caracara_filters import FQLGenerator, builders
+
+ITERATIONS = 100_000
+
+CASES = [
+    ("hosts", "hostname", "TestBox*"),
+    ("hosts", "role", ["DC", "Server"]),
+    ("hosts", "last_seen", "-30m"),
+    ("hosts", "rfm", True),
+    ("iocs", "type", "SHA256"),
+]
+
+
+def main():
+    """Time each case via both paths and print the results."""
+    print(f"{'case':<24}{'generic (us)':>14}{'builder (us)':>14}{'speedup':>10}")
+    for dialect, filter_name, value in CASES:
+        fql_generator = FQLGenerator(dialect=dialect)
+        builder = getattr(builders.BUILDERS[dialect], filter_name)
+
+        generic_time = timeit.timeit(
+            lambda: fql_generator.create_new_filter(filter_name, value),
+            number=ITERATIONS,
+        )
+        fql_generator.reset()
+
+        builder_time = timeit.timeit(
+            lambda: fql_generator.add_filter(builder(value)),
+            number=ITERATIONS,
+        )
+        fql_generator.reset()
+
+        print(
+            f"{dialect + '.' + filter_name:<24}"
+            f"{generic_time / ITERATIONS * 1e6:>14.2f}"
+            f"{builder_time / ITERATIONS * 1e6:>14.2f}"
+            f"{generic_time / builder_time:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark indexed queries against a full scan of locally cached records.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_index
+"""
+
+import random
+import timeit
+
+from caracara_filters import FQLGenerator
+from caracara_filters.evaluate import evaluate
+from caracara_filters.index import RecordIndex
+
+RECORD_COUNT = 100_000
+REPEATS = 20
+
+
+def make_records():
+    """Return a reproducible list of host records."""
+    rng = random.Random(1234)
+    return [
+        {
+            "hostname": f"HOST-{i:06d}",
+            "platform_name": rng.choice(["Windows", "Linux", "Mac"]),
+            "site_name": f"Site{rng.randrange(50)}",
+            "tags": [f"FalconGroupingTags/T{rng.randrange(200)}"],
+            "last_seen": f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}T00:00:00Z",
+        }
+        for i in range(RECORD_COUNT)
+    ]
+
+
+def main():
+    """Time a selective query via the index and via a full scan, and print the results."""
+    records = make_records()
+    build_time = timeit.timeit(lambda: RecordIndex(records, dialect="hosts"), number=1)
+    index = RecordIndex(records, dialect="hosts")
+
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("os", "Linux")
+    fql_generator.create_new_filter("site", "Site7")
+    fql_generator.create_new_filter("last_seen", "2023-06-01T00:00:00Z", "GTE")
+
+    indexed_time = timeit.timeit(lambda: index.query(fql_generator), number=REPEATS) / REPEATS
+    scan_time = (
+        timeit.timeit(
+            lambda: [record for record in records if evaluate(fql_generator, record)],
+            number=REPEATS,
+        )
+        / REPEATS
+    )
+
+    print(f"records:      {RECORD_COUNT}")
+    print(f"matches:      {len(index.query(fql_generator))}")
+    print(f"index build:  {build_time * 1e3:.1f} ms")
+    print(f"full scan:    {scan_time * 1e3:.2f} ms")
+    print(f"indexed:      {indexed_time * 1e3:.2f} ms ({scan_time / indexed_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
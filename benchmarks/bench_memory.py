@@ -0,0 +1,109 @@
+"""Benchmark the memory used by many live FQL generators.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_memory
+
+Each generator holds a handful of typical filters. The same workload is then repeated with an
+equivalent unslotted FilterArgs dataclass, holding its own copies of the field and operator
+strings, for comparison. Finally, a device_id filter of 100,000 AIDs is measured both packed (as
+an AIDList) and as a list of strings.
+"""
+
+import os
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, List
+
+from caracara_filters import FQLGenerator
+from caracara_filters.fql import FilterArgs
+
+GENERATORS = 10_000
+AIDS = 100_000
+
+
+@dataclass
+class UnslottedFilterArgs:
+    """An unslotted, mutable equivalent of FilterArgs, for comparison."""
+
+    filter_def: str
+    fql: str
+    value: Any
+    operator: str
+
+
+def build_generators() -> List[FQLGenerator]:
+    """Build the generators that are measured."""
+    fql_generators = []
+    for i in range(GENERATORS):
+        fql_generator = FQLGenerator(dialect="hosts")
+        fql_generator.create_new_filter("os", "Windows")
+        fql_generator.create_new_filter("hostname", f"HOST{i}")
+        fql_generator.create_new_filter("last_seen", "-30m", "GTE")
+        fql_generators.append(fql_generator)
+
+    return fql_generators
+
+
+def copy_strings(fql_generators: List[FQLGenerator]) -> None:
+    """Replace every stored filter with an unslotted equivalent holding its own strings."""
+    for fql_generator in fql_generators:
+        for filter_id, filter_args in fql_generator.filters.items():
+            fql_generator.filters[filter_id] = UnslottedFilterArgs(
+                filter_def="".join(filter_args.filter_def),
+                fql="".join(filter_args.fql),
+                value=filter_args.value,
+                operator="".join(filter_args.operator),
+            )
+
+
+def measure(workload: Callable[[], Any]) -> int:
+    """Return the number of bytes still allocated by a workload once it has finished."""
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    live_objects = workload()
+    allocated = sum(
+        x.size_diff for x in tracemalloc.take_snapshot().compare_to(snapshot, "filename")
+    )
+    tracemalloc.stop()
+    del live_objects
+    return allocated
+
+
+def main():
+    """Measure both workloads and print the results."""
+    slotted = measure(build_generators)
+
+    def unslotted_workload() -> List[FQLGenerator]:
+        """Build the generators, then replace their filters with unslotted copies."""
+        fql_generators = build_generators()
+        copy_strings(fql_generators)
+        return fql_generators
+
+    unslotted = measure(unslotted_workload)
+    print(f"{'storage':<24}{'total (KiB)':>14}{'per generator (B)':>20}")
+    for label, allocated in (("slotted, interned", slotted), ("unslotted, copied", unslotted)):
+        print(f"{label:<24}{allocated / 1024:>14.1f}{allocated / GENERATORS:>20.1f}")
+
+    aids = [os.urandom(16).hex() for _ in range(AIDS)]
+
+    def packed_workload() -> FQLGenerator:
+        """Build a generator holding the AIDs, which the device_id filter packs."""
+        fql_generator = FQLGenerator(dialect="hosts")
+        fql_generator.create_new_filter("device_id", aids)
+        return fql_generator
+
+    def unpacked_workload() -> FilterArgs:
+        """Build a filter holding its own copy of every AID as a string."""
+        return FilterArgs("device_id", "device_id", ["".join(x) for x in aids], "EQUAL")
+
+    print(f"\n{'device_id storage':<24}{'total (KiB)':>14}{'per AID (B)':>20}")
+    for label, allocated in (
+        ("packed AIDList", measure(packed_workload)),
+        ("list of strings", measure(unpacked_workload)),
+    ):
+        print(f"{label:<24}{allocated / 1024:>14.1f}{allocated / AIDS:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark paging through a query served by the local stand-in server, end to end.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_server
+
+Each page is requested over HTTP with the generator's URL-encoded FQL, parsed and answered by the
+server, and decoded by the client, as a pipeline built on Caracara would do against the Falcon API.
+"""
+
+import json
+import time
+import urllib.request
+
+from caracara_filters import FQLGenerator
+from caracara_filters.server import StandInServer, make_fixtures
+
+RECORD_COUNT = 50_000
+PAGE_SIZE = 500
+
+
+def fetch_all(url: str, fql_generator: FQLGenerator, endpoint: str):
+    """Page through every result of a query, and return the records and number of requests."""
+    resources = []
+    requests = 0
+    offset = 0
+    while True:
+        with urllib.request.urlopen(
+            f"{url}{endpoint}?limit={PAGE_SIZE}&offset={offset}"
+            f"&filter={fql_generator.get_fql(encoded=True)}"
+        ) as response:
+            body = json.load(response)
+        requests += 1
+        resources.extend(body["resources"])
+        offset += PAGE_SIZE
+        if offset >= body["meta"]["pagination"]["total"]:
+            return resources, requests
+
+
+def main():
+    """Time paging through a selective and a broad query, and print the results."""
+    fixtures = make_fixtures(count=RECORD_COUNT)
+
+    selective = FQLGenerator(dialect="hosts")
+    selective.create_new_filter("os", "Windows")
+    selective.create_new_filter("site", "London")
+    selective.create_new_filter("last_seen", "2023-10-01T00:00:00Z", "GTE")
+
+    broad = FQLGenerator(dialect="hosts")
+    broad.create_new_filter("contained", "Not Contained")
+
+    with StandInServer(fixtures) as server:
+        for name, fql_generator, endpoint in (
+            ("selective ids", selective, "/devices/queries/devices/v1"),
+            ("broad ids", broad, "/devices/queries/devices/v1"),
+            ("broad records", broad, "/devices/combined/devices/v1"),
+        ):
+            started = time.perf_counter()
+            resources, requests = fetch_all(server.url, fql_generator, endpoint)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{name:<16}{len(resources):>8} results{requests:>6} requests"
+                f"{elapsed * 1e3:>10.1f} ms{requests / elapsed:>10.1f} req/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
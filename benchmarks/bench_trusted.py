@@ -0,0 +1,61 @@
+"""Benchmark trusted input against the default validated create_new_filter() path.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_trusted
+
+Values are unique within each filter, and the stage cache is cleared before every run, so that
+cached validation results do not hide the cost of validating values seen for the first time
+(e.g., AIDs, group IDs and tags taken from a Falcon API response).
+"""
+
+import timeit
+
+from caracara_filters import STAGE_CACHE, FQLGenerator
+from caracara_filters.common import parse_ip_network
+
+REPEATS = 200
+
+CASES = [
+    ("hosts", "local_ip", [f"10.0.{i // 256}.{i % 256}" for i in range(1000)]),
+    ("hosts", "role", ["DC", "Server", "Workstation"] * 300),
+    ("hosts", "device_id", [f"{i:032x}" for i in range(1000)]),
+    ("hosts", "tag", [f"FalconGroupingTags/Tag{i}" for i in range(1000)]),
+    ("hosts", "rfm", True),
+]
+
+
+def clear_caches():
+    """Clear every cache of validation and transform results."""
+    STAGE_CACHE.clear()
+    parse_ip_network.cache_clear()
+
+
+def time_case(dialect: str, filter_name: str, value, trusted: bool) -> float:
+    """Return the mean time taken to create one filter, in microseconds."""
+    fql_generator = FQLGenerator(dialect=dialect, trusted=trusted)
+    timings = timeit.repeat(
+        lambda: fql_generator.create_new_filter(filter_name, value),
+        setup=clear_caches,
+        number=1,
+        repeat=REPEATS,
+    )
+    return sum(timings) / REPEATS * 1e6
+
+
+def main():
+    """Time each case with and without trusted input, and print the results."""
+    print(f"{'case':<24}{'validated (us)':>16}{'trusted (us)':>14}{'speedup':>10}")
+    for dialect, filter_name, value in CASES:
+        validated_time = time_case(dialect, filter_name, value, trusted=False)
+        trusted_time = time_case(dialect, filter_name, value, trusted=True)
+        print(
+            f"{dialect + '.' + filter_name:<24}"
+            f"{validated_time:>16.2f}"
+            f"{trusted_time:>14.2f}"
+            f"{validated_time / trusted_time:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
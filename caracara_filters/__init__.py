@@ -4,7 +4,16 @@ This module contains a new implementation of an FQL generator designed to plug i
 """
 
 __all__ = [
+    "AndGroup",
+    "FQLExpression",
     "FQLGenerator",
+    "OrGroup",
+    "STAGE_CACHE",
+    "ValidationIssue",
+    "ValidationReport",
 ]
 
+from caracara_filters.cache import STAGE_CACHE
+from caracara_filters.expressions import AndGroup, FQLExpression, OrGroup
 from caracara_filters.fql import FQLGenerator
+from caracara_filters.validation import ValidationIssue, ValidationReport
@@ -0,0 +1,218 @@
+"""Caracara Filters: Specialised Filter Builders.
+
+Creating a filter via FQLGenerator.create_new_filter() takes a generic path: the filter name is
+looked up, and the filter definition is consulted on every call to decide whether the filter is
+multivariate or nullable, which operators are valid, and so on. This module compiles every
+filter of every dialect, at import time, into a specialised builder function that has these
+decisions baked in. Stages that would do nothing (i.e., identity validators and transforms) are
+omitted from the generated code entirely.
+
+Each builder accepts a value and an optional operator, and returns a FilterArgs object that can
+be added to an FQLGenerator of the same dialect via add_filter(). For example:
+
+    from caracara_filters import builders
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.add_filter(builders.hosts.last_seen("-30m", "GTE"))
+
+Builders perform exactly the same validation as create_new_filter(), and raise the same
+exceptions, but do not support per-call options such as dedupe.
+"""
+
+import sys
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from caracara_filters.cache import STAGE_CACHE
+from caracara_filters.dialects import DIALECTS, FilterIndex, get_filter_index
+from caracara_filters.fql import FilterArgs
+from caracara_filters.transforms import identity_transform
+from caracara_filters.validators import identity_validator
+
+FilterBuilder = Callable[[Any, Optional[str]], FilterArgs]
+
+_TYPE_ERROR_LIST = (
+    "f'You provided a list for {FILTER_NAME}, but the type of item {index} '"
+    "f'({str(type(value[index]))}) was not in the list of acceptable types: {TYPE_NAMES}'"
+)
+_TYPE_ERROR_SCALAR = (
+    "f'The type of the filter {FILTER_NAME} ({str(type(value))}) was not in the '"
+    "f'list of acceptable types: {TYPE_NAMES}'"
+)
+
+
+def _generate_builder_source(filter_def: Dict[str, Any]) -> str:
+    """Generate the source code of a builder function specialised for a filter definition."""
+    validate: bool = filter_def["validator"] is not identity_validator
+    transform: bool = filter_def["transform"] is not identity_transform
+    list_transform: bool = filter_def["list_transform"] is not identity_transform
+
+    lines: List[str] = [
+        "def build(value, operator=None):",
+        "    if operator is None:",
+        "        operator = DEFAULT_OPERATOR",
+        "    else:",
+        "        interned_operator = VALID_OPERATORS.get(operator)",
+        "        if interned_operator is None:",
+        "            raise ValueError(",
+        "                f'The provided initial operator, {operator}, is not valid. Valid '",
+        "                f'options for a {FILTER_NAME} filter: {str(VALID_OPERATORS_LIST)}'",
+        "            )",
+        "        operator = interned_operator",
+    ]
+
+    if filter_def["nullable"]:
+        lines += [
+            "    if value is None:",
+            "        return FilterArgs(FILTER_NAME, FQL, None, operator)",
+        ]
+    else:
+        lines += [
+            "    if value is None:",
+            "        raise TypeError(",
+            "            f'The filter {FILTER_NAME} is not nullable, but you provided a NoneType.'",
+            "        )",
+        ]
+
+    if filter_def["multivariate"]:
+        lines += [
+            "    if isinstance(value, list):",
+            "        for item_type in set(map(type, value)):",
+            "            if not issubclass(item_type, DATA_TYPES):",
+            "                index = next(",
+            "                    i for i, item in enumerate(value)",
+            "                    if not isinstance(item, DATA_TYPES)",
+            "                )",
+            f"                raise TypeError({_TYPE_ERROR_LIST})",
+        ]
+        if validate or transform:
+            lines += [
+                "        transformed_value = []",
+                "        for val in value:",
+            ]
+            if validate:
+                lines += [
+                    "            if not validator(val):",
+                    "                raise ValueError(",
+                    "                    f'The input {val} is not valid for filter type '",
+                    "                    f'{FILTER_NAME}.'",
+                    "                )",
+                ]
+            if transform:
+                lines += ["            transformed_value.append(transform(val))"]
+            else:
+                lines += ["            transformed_value.append(val)"]
+        else:
+            lines += ["        transformed_value = list(value)"]
+
+        if list_transform:
+            lines += ["        transformed_value = list_transform(transformed_value)"]
+
+        lines += ["        return FilterArgs(FILTER_NAME, FQL, transformed_value, operator)"]
+    else:
+        lines += [
+            "    if isinstance(value, list):",
+            "        raise TypeError(",
+            "            f'The filter {FILTER_NAME} is not multivariate, but you provided a list.'",
+            "        )",
+        ]
+
+    lines += [
+        "    if not isinstance(value, DATA_TYPES):",
+        f"        raise TypeError({_TYPE_ERROR_SCALAR})",
+    ]
+    if validate:
+        lines += [
+            "    if not validator(value):",
+            "        raise ValueError(",
+            "            f'The input {value} is not valid for filter type {FILTER_NAME}.'",
+            "        )",
+        ]
+    if transform:
+        lines += ["    value = transform(value)"]
+
+    lines += ["    return FilterArgs(FILTER_NAME, FQL, value, operator)"]
+    return "\n".join(lines) + "\n"
+
+
+def compile_filter_builder(filter_name: str, filter_def: Dict[str, Any]) -> FilterBuilder:
+    """Compile a filter definition into a specialised builder function."""
+    validator, transform = STAGE_CACHE.wrap_filter(filter_def)
+    namespace: Dict[str, Any] = {
+        "DATA_TYPES": tuple(filter_def["data_types"]),
+        "DEFAULT_OPERATOR": filter_def["operator"],
+        "FILTER_NAME": filter_name,
+        "FQL": filter_def["fql"],
+        "FilterArgs": FilterArgs,
+        "TYPE_NAMES": ", ".join(str(x) for x in filter_def["data_types"]),
+        # Maps each valid operator to its interned copy, so that builders store the same
+        # operator strings as create_new_filter() does
+        "VALID_OPERATORS": {sys.intern(x): sys.intern(x) for x in filter_def["valid_operators"]},
+        "VALID_OPERATORS_LIST": list(filter_def["valid_operators"]),
+        "list_transform": filter_def["list_transform"],
+        "transform": transform,
+        "validator": validator,
+    }
+    source = _generate_builder_source(filter_def)
+    # The generated source only ever references the namespace above, and the filter definition
+    # can only influence which of the fixed lines above are included.
+    code = compile(source, f"<caracara_filters builder: {filter_name}>", "exec")
+    exec(code, namespace)  # pylint: disable=exec-used
+    builder: FilterBuilder = namespace["build"]
+    builder.__name__ = filter_name
+    builder.__qualname__ = filter_name
+    builder.__doc__ = filter_def.get("help")
+    return builder
+
+
+def compile_dialect_builders(dialect: str) -> SimpleNamespace:
+    """Compile every filter available within a dialect into a namespace of builder functions.
+
+    Filters from the base dialect are included, unless overridden by the dialect itself, in the
+    same way as they are when an FQLGenerator is created. Aliases share a single builder, which
+    stores the canonical name of the filter.
+    """
+    available_filters, filter_index = get_filter_index(dialect)
+    compiled_builders: Dict[str, FilterBuilder] = {}
+    builders: Dict[str, FilterBuilder] = {}
+    for filter_name in available_filters:
+        canonical_name, filter_def = filter_index[filter_name]
+        if canonical_name not in compiled_builders:
+            compiled_builders[canonical_name] = compile_filter_builder(canonical_name, filter_def)
+
+        builders[filter_name] = compiled_builders[canonical_name]
+
+    return SimpleNamespace(**builders)
+
+
+BUILDERS: Dict[str, SimpleNamespace] = {
+    dialect: compile_dialect_builders(dialect) for dialect in DIALECTS
+}
+
+# The filter index that each dialect's builders were compiled from
+_BUILDER_INDEXES: Dict[str, FilterIndex] = {
+    dialect: get_filter_index(dialect)[1] for dialect in DIALECTS
+}
+
+
+def get_dialect_builders(dialect: str) -> SimpleNamespace:
+    """Return the builders for a dialect, compiling them if the dialect was registered at runtime.
+
+    Builders are compiled again if the dialect (or the base dialect) has been replaced since they
+    were last compiled.
+    """
+    filter_index = get_filter_index(dialect)[1]
+    if _BUILDER_INDEXES.get(dialect) is not filter_index:
+        BUILDERS[dialect] = compile_dialect_builders(dialect)
+        _BUILDER_INDEXES[dialect] = filter_index
+
+    return BUILDERS[dialect]
+
+
+base = BUILDERS["base"]
+hosts = BUILDERS["hosts"]
+iocs = BUILDERS["iocs"]
+prevention_policies = BUILDERS["prevention_policies"]
+response_policies = BUILDERS["response_policies"]
+rtr = BUILDERS["rtr"]
+sensor_download = BUILDERS["sensor_download"]
+users = BUILDERS["users"]
@@ -0,0 +1,103 @@
+"""Caracara Filters: Stage Cache.
+
+Most validators and transforms are pure functions, and are frequently called with the same small
+set of inputs (e.g., platform names, or True and False). This module wraps the validator and
+transform of every filter that is marked as pure (i.e., has "pure": True in its definition) in a
+bounded LRU cache, so that repeated inputs skip the work entirely. Filters are only pure if they
+say so, or if every stage they use is registered as pure in caracara_filters.stages.
+
+Each stage function receives its own cache, keyed on the input value and its type. As the stage
+functions are specific to a filter (or are shared between filters that would return the same
+result for the same input anyway), this is equivalent to keying on the filter and the value.
+
+Filters whose stages depend on anything other than the input value, such as relative timestamp
+filters which depend on the current time, must never be marked as pure.
+
+The number of cached stages is bounded too, as reloading a dialect creates new stage functions
+(e.g., new partials of the options validator). The least recently used stage, along with its
+cached results, is evicted once there are more than maxstages.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+
+from caracara_filters.transforms import identity_transform
+from caracara_filters.validators import identity_validator
+
+
+class StageCacheInfo(NamedTuple):
+    """Aggregated statistics for all stage caches."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class StageCache:
+    """A collection of bounded LRU caches, one per pure validator or transform function."""
+
+    def __init__(self, maxsize: int = 1024, maxstages: int = 256):
+        """Create a stage cache of up to maxstages stages, each holding up to maxsize results."""
+        self.maxsize: int = maxsize
+        self.maxstages: int = maxstages
+        self._lock = Lock()
+        self._stages: "OrderedDict[Callable, Callable]" = OrderedDict()
+
+    def wrap(self, stage: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        """Return a cached version of a pure stage function.
+
+        Identity stages are returned unchanged, as caching them could only slow them down.
+        """
+        if stage is identity_transform or stage is identity_validator:
+            return stage
+
+        with self._lock:
+            cached_stage = self._stages.get(stage)
+            if cached_stage is None:
+                cached_stage = lru_cache(maxsize=self.maxsize, typed=True)(stage)
+                self._stages[stage] = cached_stage
+                if len(self._stages) > self.maxstages:
+                    self._stages.popitem(last=False)
+            else:
+                self._stages.move_to_end(stage)
+
+        return cached_stage
+
+    def wrap_filter(
+        self, filter_def: Dict[str, Any]
+    ) -> Tuple[Callable[[Any], bool], Callable[[Any], Any]]:
+        """Return a filter's validator and transform, cached if the filter is pure."""
+        if not filter_def["pure"]:
+            return filter_def["validator"], filter_def["transform"]
+
+        return self.wrap(filter_def["validator"]), self.wrap(filter_def["transform"])
+
+    def info(self) -> StageCacheInfo:
+        """Return the hit and miss counters, summed across every cached stage."""
+        hits = misses = currsize = 0
+        with self._lock:
+            cached_stages = list(self._stages.values())
+
+        for cached_stage in cached_stages:
+            stage_info = cached_stage.cache_info()
+            hits += stage_info.hits
+            misses += stage_info.misses
+            currsize += stage_info.currsize
+
+        return StageCacheInfo(
+            hits=hits,
+            misses=misses,
+            maxsize=self.maxsize * len(cached_stages),
+            currsize=currsize,
+        )
+
+    def clear(self) -> None:
+        """Clear every cached result and reset the hit and miss counters."""
+        for cached_stage in list(self._stages.values()):
+            cached_stage.cache_clear()
+
+
+STAGE_CACHE = StageCache()
@@ -0,0 +1,205 @@
+"""Caracara Filters: Query Coalescing.
+
+Many small queries that differ only slightly (for example, host lookups that each target one
+hostname, but otherwise share the same filters) can be sent to the Falcon API as a single query.
+coalesce_generators() takes FQL generators of the same dialect, factors out the filters that they
+all share, and merges the filters that differ:
+
+- If every query differs by a single EQUAL filter on the same multivariate field, the differing
+  values are merged into one multivariate filter (e.g., hostname: ['HOST1','HOST2']), and the
+  merged query remains a plain FQLGenerator.
+- Otherwise, the differing filters of each query are combined into an OR group, which is ANDed
+  with the shared filters.
+
+The result also provides a routing function, which maps each record returned by the merged query
+back to the indexes of the original queries that it satisfies.
+"""
+
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple, Union
+
+from caracara_filters.common import AIDList
+from caracara_filters.evaluate import Record, evaluate, get_record_value
+from caracara_filters.expressions import AndGroup, FQLExpression, OrGroup
+from caracara_filters.fql import FilterArgs, FQLGenerator
+
+FilterKey = Tuple[str, str, str, Hashable]
+
+
+def _filter_key(filter_args: FilterArgs) -> FilterKey:
+    """Return a hashable key that identifies a filter by its definition, operator and value."""
+    value = filter_args.value
+    if isinstance(value, list):
+        value = tuple(value)
+    elif isinstance(value, AIDList):
+        # Compare packed AIDs with the equivalent list of AID strings
+        value = tuple(value)
+
+    return (filter_args.filter_def, filter_args.fql, filter_args.operator, value)
+
+
+def _is_mergeable(value: Any) -> bool:
+    """Check whether a filter value can be matched by hash lookup when routing."""
+    return isinstance(value, str) and "*" not in value and "/" not in value
+
+
+class CoalescedQuery:
+    """A merged query, and the means to route its results back to the original queries."""
+
+    def __init__(
+        self,
+        query: Union[FQLGenerator, FQLExpression],
+        route: Callable[[Record], List[int]],
+        query_count: int,
+    ):
+        """Create a coalesced query from a merged query and a routing function."""
+        self.query = query
+        self.route = route
+        self.query_count = query_count
+
+    def get_fql(self) -> str:
+        """Return the FQL string of the merged query."""
+        return self.query.get_fql()
+
+    def split(self, records: Sequence[Record]) -> List[List[Record]]:
+        """Split the records returned by the merged query into one list per original query."""
+        results: List[List[Record]] = [[] for _ in range(self.query_count)]
+        for record in records:
+            for index in self.route(record):
+                results[index].append(record)
+
+        return results
+
+
+def _route_by_evaluation(
+    differing_filters: List[List[FilterArgs]],
+) -> Callable[[Record], List[int]]:
+    """Return a routing function that evaluates the differing filters of each original query."""
+
+    def route(record: Record) -> List[int]:
+        """Return the indexes of the original queries that a record satisfies."""
+        return [
+            index
+            for index, filters in enumerate(differing_filters)
+            if all(evaluate(x, record) for x in filters)
+        ]
+
+    return route
+
+
+def _merge_values(
+    fql_generator: FQLGenerator,
+    differing_filters: List[List[FilterArgs]],
+    shared_filters: List[FilterArgs],
+) -> Union[CoalescedQuery, None]:
+    """Merge queries that each differ by one EQUAL filter on the same multivariate field."""
+    first_filter = differing_filters[0][0]
+    filter_def = fql_generator.available_filters.get(first_filter.filter_def)
+    if filter_def is None or not filter_def["multivariate"]:
+        return None
+
+    for filters in differing_filters:
+        if (
+            len(filters) != 1
+            or filters[0].filter_def != first_filter.filter_def
+            or filters[0].operator != "EQUAL"
+            or filters[0].value is None
+        ):
+            return None
+
+    merged_values: List[Any] = []
+    routes: Dict[Hashable, List[int]] = {}
+    unhashable_routes: List[Tuple[FilterArgs, int]] = []
+    for index, filters in enumerate(differing_filters):
+        values = filters[0].value
+        if not isinstance(values, (list, AIDList)):
+            values = [values]
+        if all(_is_mergeable(x) for x in values):
+            for value in values:
+                routes.setdefault(value.lower(), []).append(index)
+        else:
+            # Wildcards and CIDR networks cannot be matched by hash lookup
+            unhashable_routes.append((filters[0], index))
+
+        merged_values.extend(values)
+
+    for shared_filter in shared_filters:
+        fql_generator.add_filter(shared_filter)
+
+    fql_generator.add_filter(
+        FilterArgs(
+            filter_def=first_filter.filter_def,
+            fql=first_filter.fql,
+            value=filter_def["list_transform"](list(dict.fromkeys(merged_values))),
+            operator="EQUAL",
+        )
+    )
+    fql = first_filter.fql
+
+    def route(record: Record) -> List[int]:
+        """Return the indexes of the original queries that a record satisfies."""
+        record_value = get_record_value(record, fql)
+        record_values = record_value if isinstance(record_value, list) else [record_value]
+        indexes = {
+            index
+            for value in record_values
+            if isinstance(value, str)
+            for index in routes.get(value.lower(), [])
+        }
+        indexes.update(
+            index for filter_args, index in unhashable_routes if evaluate(filter_args, record)
+        )
+        return sorted(indexes)
+
+    return CoalescedQuery(fql_generator, route, len(differing_filters))
+
+
+def coalesce_generators(generators: Sequence[FQLGenerator]) -> CoalescedQuery:
+    """Coalesce many FQL generators of the same dialect into one query."""
+    if not generators:
+        raise ValueError("At least one FQL generator must be provided.")
+
+    dialect = generators[0].dialect
+    if any(x.dialect != dialect for x in generators):
+        raise ValueError("Every FQL generator to be coalesced must use the same dialect.")
+
+    # Shared filters are those present in every query, compared by definition, operator and value
+    keyed_filters: List[Dict[FilterKey, FilterArgs]] = [
+        {_filter_key(x): x for x in fql_generator.filters.values()} for fql_generator in generators
+    ]
+    shared_keys = set(keyed_filters[0]).intersection(*keyed_filters[1:])
+    shared_filters = [x for k, x in keyed_filters[0].items() if k in shared_keys]
+    differing_filters = [
+        [x for k, x in filters.items() if k not in shared_keys] for filters in keyed_filters
+    ]
+
+    fql_generator = FQLGenerator(dialect=dialect)
+    if any(not x for x in differing_filters):
+        # At least one query consists only of the shared filters, so it covers every other query
+        for shared_filter in shared_filters:
+            fql_generator.add_filter(shared_filter)
+
+        return CoalescedQuery(
+            fql_generator, _route_by_evaluation(differing_filters), len(generators)
+        )
+
+    merged = _merge_values(fql_generator, differing_filters, shared_filters)
+    if merged is not None:
+        return merged
+
+    for shared_filter in shared_filters:
+        fql_generator.add_filter(shared_filter)
+
+    # Identical sets of differing filters only need to appear in the OR group once
+    or_group_generators: Dict[Tuple[FilterKey, ...], FQLGenerator] = {}
+    for filters in differing_filters:
+        filters_key = tuple(sorted((_filter_key(x) for x in filters), key=repr))
+        if filters_key not in or_group_generators:
+            or_group_generators[filters_key] = FQLGenerator(dialect=dialect)
+            for filter_args in filters:
+                or_group_generators[filters_key].add_filter(filter_args)
+
+    return CoalescedQuery(
+        AndGroup(fql_generator, OrGroup(*or_group_generators.values())),
+        _route_by_evaluation(differing_filters),
+        len(generators),
+    )
@@ -5,16 +5,32 @@ shared regular expressions.
 """
 
 __all__ = [
+    "AID_RE",
+    "AID_WILDCARD_RE",
+    "AIDList",
     "FILTER_OPERATORS",
     "IP_ADDRESS_RE",
+    "IP_WILDCARD_RE",
+    "IPNetworkString",
     "ISO8601_TIMESTAMP_RE",
     "PLATFORMS",
     "RELATIVE_TIMESTAMP_RE",
+    "format_ip_network",
+    "parse_ip_network",
 ]
 
+from caracara_filters.common.aids import AIDList
 from caracara_filters.common.constants import FILTER_OPERATORS, PLATFORMS
+from caracara_filters.common.networks import (
+    IPNetworkString,
+    format_ip_network,
+    parse_ip_network,
+)
 from caracara_filters.common.regex import (
+    AID_RE,
+    AID_WILDCARD_RE,
     IP_ADDRESS_RE,
+    IP_WILDCARD_RE,
     ISO8601_TIMESTAMP_RE,
     RELATIVE_TIMESTAMP_RE,
 )
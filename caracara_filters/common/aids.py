@@ -0,0 +1,172 @@
+"""Caracara Filters: Packed Device ID (AID) Storage.
+
+Device IDs (AIDs) are 32 hexadecimal digits, i.e., 16 bytes. Bulk jobs (such as containing every
+host in an incident) can filter on 100,000 AIDs at once, and holding each one as its own Python
+string costs roughly 80 bytes per AID, plus the list that holds them. AIDList instead packs the
+AIDs into a single immutable bytes buffer of 16 bytes per AID, and renders them to FQL (or back
+into strings) directly from that buffer. AIDs are always rendered in lower case.
+
+Filters can also mix complete AIDs with other values, such as wildcard prefixes (e.g., abc*).
+AIDList.from_values() packs the complete AIDs, and keeps any other values as strings alongside
+their positions, so the list keeps the order in which its values were given.
+
+AIDList behaves as a read-only sequence of AID strings and other values, and compares equal to a
+list of the same (lower case) AIDs and values, in the same order.
+"""
+
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, List, Tuple, Union
+
+from caracara_filters.common.regex import AID_RE
+
+AID_BYTES = 16
+
+
+class AIDList(Sequence):
+    """An immutable sequence of AIDs, packed into 16 bytes each, mixed with any other values."""
+
+    __slots__ = ("_buffer", "_extras", "_positions")
+
+    def __init__(self, buffer: bytes = b"", extras: Iterable[Tuple[int, str]] = ()):
+        """Create an AID list from a buffer of packed (binary) AIDs, and any unpacked values.
+
+        Unpacked values are given as (position, value) pairs, where the position is the value's
+        index within the whole list.
+        """
+        if len(buffer) % AID_BYTES:
+            raise ValueError(f"A packed AID buffer must be a multiple of {AID_BYTES} bytes long.")
+        self._buffer = bytes(buffer)
+        self._extras: Tuple[Tuple[int, str], ...] = tuple(sorted(extras))
+        self._positions: Tuple[int, ...] = tuple(position for position, _ in self._extras)
+        if self._positions and (
+            self._positions[0] < 0
+            or self._positions[-1] >= len(self)
+            or len(set(self._positions)) != len(self._positions)
+        ):
+            raise ValueError("The positions of unpacked values must be unique and within the list.")
+
+    @classmethod
+    def from_hex(cls, aids: Iterable[str], validate: bool = True) -> "AIDList":
+        """Pack AID strings into a new AID list, validating each of them unless told otherwise."""
+        aids = list(aids)
+        if validate:
+            for index, aid in enumerate(aids):
+                if not isinstance(aid, str) or not AID_RE.match(aid):
+                    raise ValueError(
+                        f"Item {index} ({aid}) is not a valid AID of 32 hexadecimal digits."
+                    )
+
+        return cls(bytes.fromhex("".join(aids)))
+
+    @classmethod
+    def from_values(cls, values: Iterable[str]) -> "AIDList":
+        """Pack the complete AIDs within a list of values, keeping any other values as strings."""
+        aids = []
+        extras = []
+        for position, value in enumerate(values):
+            if isinstance(value, str) and AID_RE.match(value):
+                aids.append(value)
+            else:
+                extras.append((position, value))
+
+        return cls(bytes.fromhex("".join(aids)), extras)
+
+    @property
+    def buffer(self) -> bytes:
+        """Return the packed AIDs."""
+        return self._buffer
+
+    @property
+    def extras(self) -> Tuple[str, ...]:
+        """Return the values that are not complete AIDs, and so are not packed."""
+        return tuple(value for _, value in self._extras)
+
+    def __len__(self) -> int:
+        """Return the number of AIDs and other values in this list."""
+        return len(self._buffer) // AID_BYTES + len(self._extras)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, "AIDList"]:
+        """Return the AID (or other value) at an index, or a new AID list for a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1 and not self._extras:
+                return AIDList(self._buffer[start * AID_BYTES : stop * AID_BYTES])
+            return AIDList.from_values([self[i] for i in range(start, stop, step)])
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("AID list index out of range")
+
+        # Skip over the unpacked values that come before the index
+        extras_before = bisect_left(self._positions, index)
+        if extras_before < len(self._positions) and self._positions[extras_before] == index:
+            return self._extras[extras_before][1]
+
+        index -= extras_before
+        return self._buffer[index * AID_BYTES : (index + 1) * AID_BYTES].hex()
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the AIDs as lower case strings, and any other values, in order."""
+        hex_buffer = self._buffer.hex()
+        extras = iter(self._extras)
+        next_extra = next(extras, None)
+        position = 0
+        for offset in range(0, len(hex_buffer), AID_BYTES * 2):
+            while next_extra is not None and next_extra[0] == position:
+                yield next_extra[1]
+                next_extra = next(extras, None)
+                position += 1
+
+            yield hex_buffer[offset : offset + AID_BYTES * 2]
+            position += 1
+
+        while next_extra is not None:
+            yield next_extra[1]
+            next_extra = next(extras, None)
+
+    def __contains__(self, aid: Any) -> bool:
+        """Return True if an AID (in any case), or another value, is in this list."""
+        if any(aid == value for _, value in self._extras):
+            return True
+
+        if not isinstance(aid, str) or not AID_RE.match(aid):
+            return False
+
+        packed_aid = bytes.fromhex(aid)
+        offset = self._buffer.find(packed_aid)
+        while offset != -1:
+            # Only matches that are aligned to the start of an AID count
+            if offset % AID_BYTES == 0:
+                return True
+            offset = self._buffer.find(packed_aid, offset + 1)
+
+        return False
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare against another AID list, or a list of AID strings."""
+        if isinstance(other, AIDList):
+            return self._buffer == other.buffer and self._extras == other._extras
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Hash the packed AIDs and other values."""
+        return hash((self._buffer, self._extras))
+
+    def __repr__(self) -> str:
+        """Return a representation of this list, showing its length rather than its contents."""
+        return f"AIDList(<{len(self)} AIDs>)"
+
+    def to_list(self) -> List[str]:
+        """Return the AIDs as a list of lower case strings, along with any other values."""
+        return list(self)
+
+    def render_fql(self) -> str:
+        """Render the AIDs as an FQL list, directly from the packed buffer."""
+        if not self:
+            return "[]"
+
+        return "['" + "','".join(self) + "']"
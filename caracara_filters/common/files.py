@@ -0,0 +1,134 @@
+"""Caracara Filters: Data Files.
+
+This file contains functionality shared by everything that is loaded from a JSON or TOML data
+file (such as query packs and dialect definitions): parsing the file, and caching the compiled
+result of that file on disk so that it only needs to be compiled once.
+
+A cache file is a JSON object containing a format version, the SHA-256 hash of the source file's
+contents, and the source file's size and modification time. If the size and modification time of
+the source file are unchanged, only the cache file is read. Otherwise, the source file is read
+and hashed, and is only compiled again if its contents have changed. A compiled result may also
+depend on state outside the file (such as the dialects that a query pack uses), in which case a
+fingerprint of that state is stored too, and the file is compiled again if it differs.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+def get_data_file_format(file_path: str) -> str:
+    """Return the format of a data file (e.g., json or toml) based on its extension."""
+    return os.path.splitext(file_path)[1].lstrip(".").lower()
+
+
+def parse_data_file(file_bytes: bytes, file_format: str) -> Dict[str, Any]:
+    """Parse the raw contents of a JSON or TOML data file."""
+    if file_format == "json":
+        return json.loads(file_bytes)
+
+    if file_format == "toml":
+        if tomllib is None:
+            raise ImportError("Loading TOML files on Python < 3.11 requires tomli.")
+        return tomllib.loads(file_bytes.decode("utf-8"))
+
+    raise ValueError(f"Unsupported data file format {file_format}. Use json or toml.")
+
+
+def _read_cache(cache_path: str, cache_version: int) -> Optional[Dict[str, Any]]:
+    """Read a cache file, returning None if it is missing, corrupt or outdated."""
+    try:
+        with open(cache_path, "rb") as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cache, dict) or cache.get("version") != cache_version:
+        return None
+
+    return cache
+
+
+def _write_cache(cache_path: str, cache: Dict[str, Any]) -> None:
+    """Atomically write a cache file, ignoring any failure to do so."""
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(cache, cache_file, separators=(",", ":"))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # The cache is only an optimisation, so a read-only or full disk should not be fatal
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def load_compiled_data_file(  # pylint: disable=too-many-arguments
+    file_path: str,
+    compile_func: Callable[[Dict[str, Any]], Any],
+    cache_version: int,
+    cache_path: Optional[str] = None,
+    use_cache: bool = True,
+    *,
+    fingerprint_func: Optional[Callable[[Any], Any]] = None,
+) -> Any:
+    """Load the compiled form of a data file, using or creating a cache file.
+
+    The compile function receives the parsed contents of the data file, and must return an object
+    that can be serialised to JSON. The cache file defaults to the data file's path with a
+    .cache.json suffix. If given, the fingerprint function receives the compiled form, and must
+    return a JSON serialisable fingerprint of the external state that it was compiled against; a
+    cache whose stored fingerprint no longer matches is ignored.
+    """
+    if cache_path is None:
+        cache_path = f"{file_path}.cache.json"
+
+    file_stat = os.stat(file_path)
+    cache = _read_cache(cache_path, cache_version) if use_cache else None
+    if (
+        cache is not None
+        and fingerprint_func is not None
+        and cache.get("fingerprint") != fingerprint_func(cache.get("compiled"))
+    ):
+        cache = None
+
+    if (
+        cache is not None
+        and cache.get("size") == file_stat.st_size
+        and cache.get("mtime_ns") == file_stat.st_mtime_ns
+    ):
+        return cache["compiled"]
+
+    with open(file_path, "rb") as data_file:
+        file_bytes = data_file.read()
+
+    content_hash = hashlib.sha256(file_bytes).hexdigest()
+    if cache is not None and cache.get("content_hash") == content_hash:
+        compiled = cache["compiled"]
+    else:
+        compiled = compile_func(parse_data_file(file_bytes, get_data_file_format(file_path)))
+
+    if use_cache:
+        _write_cache(
+            cache_path,
+            {
+                "version": cache_version,
+                "content_hash": content_hash,
+                "size": file_stat.st_size,
+                "mtime_ns": file_stat.st_mtime_ns,
+                "compiled": compiled,
+                "fingerprint": fingerprint_func(compiled) if fingerprint_func else None,
+            },
+        )
+
+    return compiled
@@ -0,0 +1,51 @@
+"""Caracara Filters: IP Network Parsing.
+
+This file contains a shared, cached parser for IP address and CIDR network strings. Both the IP
+address validator and transform parse their input with this function, so that each entry is only
+parsed once per filter creation, even though it passes through two processing stages. The
+canonical string returned by format_ip_network() also keeps the network it was formatted from, so
+that list transforms (such as CIDR collapsing) can use it without parsing the string again.
+"""
+
+import ipaddress
+from functools import lru_cache
+from typing import Optional, Union
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+@lru_cache(maxsize=4096)
+def parse_ip_network(ip_input: str) -> Optional[IPNetwork]:
+    """Parse an IPv4/IPv6 address or CIDR network string, returning None if it is invalid.
+
+    Host bits set in a CIDR input (e.g., 10.0.0.5/24) are masked off, as the Falcon API matches
+    such a filter against the whole network regardless.
+    """
+    try:
+        return ipaddress.ip_network(ip_input.strip(), strict=False)
+    except ValueError:
+        return None
+
+
+class IPNetworkString(str):
+    """The canonical string form of an IP network, which keeps the parsed network alongside it."""
+
+    network: IPNetwork
+
+    def __new__(cls, value: str, network: IPNetwork):
+        """Create the string, attaching the network that it represents."""
+        instance = super().__new__(cls, value)
+        instance.network = network
+        return instance
+
+    def __reduce__(self):
+        """Pickle and copy the string along with its network."""
+        return (self.__class__, (str(self), self.network))
+
+
+def format_ip_network(network: IPNetwork) -> IPNetworkString:
+    """Format a network as FQL expects, rendering single-address networks without a prefix."""
+    if network.num_addresses == 1:
+        return IPNetworkString(str(network.network_address), network)
+
+    return IPNetworkString(str(network), network)
@@ -2,7 +2,20 @@
 
 import re
 
-IP_ADDRESS_RE = re.compile(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$")
+_IPV4_OCTET = r"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)"
+_IPV6_HEXTET = r"[0-9a-fA-F]{1,4}"
+
+IP_ADDRESS_RE = re.compile(rf"^(?:{_IPV4_OCTET}\.){{3}}{_IPV4_OCTET}$")
+
+# A wildcard address is a prefix of whole octets (e.g., 10.0.*) or hextets (e.g., 2001:db8:* or
+# fe80::*, with at most one :: in the prefix), followed by a single trailing *
+IP_WILDCARD_RE = re.compile(
+    rf"^(?:(?:{_IPV4_OCTET}\.){{1,3}}"
+    rf"|(?:{_IPV6_HEXTET}:){{1,7}}(?::(?:{_IPV6_HEXTET}:){{0,5}})?)\*$"
+)
 
 ISO8601_TIMESTAMP_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$")
 RELATIVE_TIMESTAMP_RE = re.compile(r"^(?P<sign>[-+])(?P<number>\d+)(?P<scale>(s|m|h|d))$")
+
+AID_RE = re.compile(r"^[0-9a-fA-F]{32}$")
+AID_WILDCARD_RE = re.compile(r"^[0-9a-fA-F]*\*[0-9a-fA-F*]*$")
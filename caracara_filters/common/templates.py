@@ -10,6 +10,8 @@ from caracara_filters.validators.relative_timestamp import relative_timestamp_va
 RELATIVE_TIMESTAMP_FILTER_TEMPLATE = {
     "multivariate": False,
     "operator": "GTE",
+    # Relative timestamps are transformed based on the current time, so must never be cached
+    "pure": False,
     "valid_operators": [
         "EQUAL",
         "GREATER",
@@ -0,0 +1,42 @@
+"""Caracara Filters: Timestamp Helpers.
+
+Falcon expects timestamps in ISO 8601 format, in UTC, with second precision. These helpers convert
+between that format, timezone-aware datetime objects and relative timestamps (e.g., -30d).
+"""
+
+import datetime
+from typing import Optional, Union
+
+from caracara_filters.common.regex import RELATIVE_TIMESTAMP_RE
+from caracara_filters.transforms.relative_timestamp import convert_relative_timestamp
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+Timestamp = Union[str, datetime.datetime]
+
+
+def parse_timestamp(
+    timestamp: Timestamp, now: Optional[datetime.datetime] = None
+) -> datetime.datetime:
+    """Parse an ISO 8601 UTC timestamp, a relative timestamp or an aware datetime.
+
+    Relative timestamps are relative to now, which defaults to the current time.
+    """
+    if isinstance(timestamp, datetime.datetime):
+        if timestamp.tzinfo is None:
+            raise ValueError("Datetime objects used as timestamps must be timezone aware.")
+        return timestamp.astimezone(datetime.timezone.utc)
+
+    if RELATIVE_TIMESTAMP_RE.match(timestamp):
+        if now is None:
+            now = datetime.datetime.now(tz=datetime.timezone.utc)
+        return convert_relative_timestamp(now, timestamp).replace(microsecond=0)
+
+    return datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT).replace(
+        tzinfo=datetime.timezone.utc
+    )
+
+
+def format_timestamp(timestamp: datetime.datetime) -> str:
+    """Format an aware datetime as an ISO 8601 UTC timestamp, as expected by Falcon."""
+    return timestamp.astimezone(datetime.timezone.utc).strftime(TIMESTAMP_FORMAT)
@@ -0,0 +1,134 @@
+"""Caracara Filters: Incremental Sync Cursors.
+
+Sync jobs typically poll an API for everything that has changed since their last poll, using a
+timestamp filter such as last_seen (hosts) or modified_on (IOCs). A SyncCursor holds the
+watermark (the upper bound of the last window that was fetched successfully) and builds the
+FQLGenerator for the next window, which covers (watermark, now]:
+
+    cursor = SyncCursor("hosts", "last_seen", base=online_windows_hosts)
+    fql_generator = cursor.next_generator()
+    # last_seen: >'2023-01-01T00:00:00Z'+last_seen: <='2023-01-01T00:05:00Z' (and the base filters)
+    ... fetch every page of results ...
+    cursor.commit()
+
+The watermark only moves when commit() is called, so a failed fetch is retried from the same
+watermark by the next window. Records are sometimes indexed after their timestamp, so an overlap
+(in seconds) can be provided to start each window slightly before the watermark. Records within
+the overlap may be returned twice, so consumers should be idempotent.
+
+A cursor's state serialises to a short JSON string with dumps(), and is restored with loads().
+The base generator is not serialised, and should be provided again when the cursor is restored.
+"""
+
+import datetime
+import json
+from typing import Optional
+
+from caracara_filters.common.timestamps import (
+    Timestamp,
+    format_timestamp,
+    parse_timestamp,
+)
+from caracara_filters.dialects import get_filter_index, resolve_filter
+from caracara_filters.fql import FQLGenerator
+
+
+class SyncCursor:
+    """A timestamp watermark that produces an FQLGenerator for each successive sync window."""
+
+    def __init__(
+        self,
+        dialect: str,
+        filter_name: str,
+        watermark: Optional[Timestamp] = None,
+        overlap: int = 0,
+        base: Optional[FQLGenerator] = None,
+    ):
+        """Create a new sync cursor over one of a dialect's timestamp filters.
+
+        If no watermark is provided, the first window has no lower bound. Every window also
+        includes a copy of the filters within the base generator, if one is provided.
+        """
+        available_filters, filter_index = get_filter_index(dialect)
+        resolved_filter = resolve_filter(filter_index, filter_name)
+        if resolved_filter is None:
+            raise ValueError(f"The specified filter name {filter_name} does not exist.")
+
+        filter_name = resolved_filter[0]
+        valid_operators = available_filters[filter_name]["valid_operators"]
+        if "GREATER" not in valid_operators or "LTE" not in valid_operators:
+            raise ValueError(
+                f"The filter {filter_name} does not support the GREATER and LTE operators, so "
+                "cannot be used as a sync cursor."
+            )
+
+        if base is not None and base.dialect != dialect:
+            raise ValueError("The base FQL generator must use the same dialect as the cursor.")
+
+        if overlap < 0:
+            raise ValueError("The overlap must not be negative.")
+
+        self.dialect: str = dialect
+        self.filter_name: str = filter_name
+        self.watermark: Optional[datetime.datetime] = (
+            None if watermark is None else parse_timestamp(watermark)
+        )
+        self.overlap: int = overlap
+        self.base: Optional[FQLGenerator] = base
+
+        # The upper bound of the most recent window, which becomes the watermark once committed
+        self.pending: Optional[datetime.datetime] = None
+
+    def next_generator(self, now: Optional[Timestamp] = None) -> FQLGenerator:
+        """Return an FQLGenerator covering the window from the watermark until now."""
+        upper_bound = (
+            datetime.datetime.now(tz=datetime.timezone.utc) if now is None else parse_timestamp(now)
+        )
+        # Never move backwards, even if the clock does
+        if self.watermark is not None and upper_bound < self.watermark:
+            upper_bound = self.watermark
+
+        fql_generator = (
+            FQLGenerator(dialect=self.dialect) if self.base is None else self.base.copy()
+        )
+        if self.watermark is not None:
+            lower_bound = self.watermark - datetime.timedelta(seconds=self.overlap)
+            fql_generator.create_new_filter(
+                self.filter_name, format_timestamp(lower_bound), "GREATER"
+            )
+        fql_generator.create_new_filter(self.filter_name, format_timestamp(upper_bound), "LTE")
+
+        self.pending = upper_bound
+        return fql_generator
+
+    def commit(self) -> None:
+        """Advance the watermark to the upper bound of the most recent window."""
+        if self.pending is None:
+            raise ValueError("There is no window to commit, as next_generator() was not called.")
+
+        self.watermark = self.pending
+        self.pending = None
+
+    def dumps(self) -> str:
+        """Serialise the state of this cursor (excluding the base generator) to a JSON string."""
+        state = {
+            "d": self.dialect,
+            "f": self.filter_name,
+            "w": None if self.watermark is None else format_timestamp(self.watermark),
+        }
+        if self.overlap:
+            state["o"] = self.overlap
+
+        return json.dumps(state, separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, state: str, base: Optional[FQLGenerator] = None) -> "SyncCursor":
+        """Restore a cursor from a string previously returned by dumps()."""
+        parsed_state = json.loads(state)
+        return cls(
+            dialect=parsed_state["d"],
+            filter_name=parsed_state["f"],
+            watermark=parsed_state["w"],
+            overlap=parsed_state.get("o", 0),
+            base=base,
+        )
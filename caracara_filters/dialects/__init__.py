@@ -3,10 +3,14 @@
 FQL's dialect varies based on the API in use. For example, Spotlight and Hosts show similar
 data but with different property names and paths. Each dialect is defined here, and matched to
 a dictionary of filters by string mapping.
+
+Further dialects can be registered at runtime via register_dialect(), or declared in JSON or TOML
+data files and loaded via load_dialect_file(), without requiring a new Python module.
 """
 
 __all__ = [
     "DIALECTS",
+    "FilterIndex",
     "HOSTS_FILTERS",
     "IOCS_FILTERS",
     "PREVENTION_POLICIES_FILTERS",
@@ -15,11 +19,27 @@ __all__ = [
     "SENSOR_DOWNLOAD_FILTERS",
     "USERS_FILTERS",
     "default_filter",
+    "get_dialect_fingerprint",
+    "get_filter_index",
+    "load_dialect_file",
+    "normalise_filter_name",
     "rebase_filters_on_default",
+    "register_dialect",
+    "resolve_filter",
 ]
 
-from caracara_filters.dialects._base import BASE_FILTERS, default_filter
+from caracara_filters.dialects._base import default_filter
 from caracara_filters.dialects._merge import rebase_filters_on_default
+from caracara_filters.dialects._registry import (
+    DIALECTS,
+    FilterIndex,
+    get_dialect_fingerprint,
+    get_filter_index,
+    load_dialect_file,
+    normalise_filter_name,
+    register_dialect,
+    resolve_filter,
+)
 from caracara_filters.dialects.hosts import HOSTS_FILTERS
 from caracara_filters.dialects.iocs import IOCS_FILTERS
 from caracara_filters.dialects.prevention_policies import PREVENTION_POLICIES_FILTERS
@@ -27,14 +47,3 @@ from caracara_filters.dialects.response_policies import RESPONSE_POLICIES_FILTER
 from caracara_filters.dialects.rtr import RTR_FILTERS
 from caracara_filters.dialects.sensor_download import SENSOR_DOWNLOAD_FILTERS
 from caracara_filters.dialects.users import USERS_FILTERS
-
-DIALECTS = {
-    "base": BASE_FILTERS,
-    "hosts": HOSTS_FILTERS,
-    "iocs": IOCS_FILTERS,
-    "prevention_policies": PREVENTION_POLICIES_FILTERS,
-    "response_policies": RESPONSE_POLICIES_FILTERS,
-    "rtr": RTR_FILTERS,
-    "sensor_download": SENSOR_DOWNLOAD_FILTERS,
-    "users": USERS_FILTERS,
-}
@@ -17,6 +17,8 @@ default_filter = {
     "operator": "EQUAL",
     "multivariate": True,
     "nullable": False,
+    "pure": False,
+    "list_transform": identity_transform,
     "transform": identity_transform,
     "validator": identity_validator,
     "valid_operators": ["EQUAL"],
@@ -0,0 +1,150 @@
+"""Caracara Filters: Data-Driven Dialect Loader.
+
+Dialects can be declared in JSON or TOML data files, rather than as Python modules. A dialect file
+contains the dialect's name, and a table of filters keyed by their canonical name. Each filter
+accepts the same properties as a filter defined in Python, except that validators, transforms and
+data types are referred to by their registered names (see caracara_filters.stages). Filters may
+also provide a list of aliases, and the name of a template to build upon. For example, in TOML:
+
+    name = "spotlight"
+
+    [filters.cve_id]
+    fql = "cve.id"
+    aliases = ["cveid"]
+    help = "Filter by CVE ID."
+
+    [filters.severity]
+    fql = "cve.severity"
+    validator = {name = "options", args = [["CRITICAL", "HIGH", "MEDIUM", "LOW"]]}
+    transform = "lowercase"
+
+    [filters.updated_timestamp]
+    fql = "updated_timestamp"
+    template = "relative_timestamp"
+
+Compiling a dialect file rebases every filter on the default filter (and its template, if any),
+and validates every reference. The compiled form is plain data, so it can be cached on disk and
+turned back into filter definitions without rebasing or validating anything again.
+"""
+
+from typing import Any, Dict, List
+
+from caracara_filters.common import FILTER_OPERATORS
+from caracara_filters.dialects._base import default_filter
+from caracara_filters.stages import (
+    TEMPLATES,
+    get_data_type_reference,
+    get_stage_reference,
+    resolve_data_type,
+    resolve_stage,
+)
+
+# Increment this whenever the structure of the compiled form of a dialect file changes.
+DIALECT_CACHE_VERSION = 1
+
+_STAGE_KINDS = ("validator", "transform", "list_transform")
+_FILTER_PROPERTIES = {*default_filter.keys(), "fql", "help"}
+
+
+def _to_references(filter_template: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a filter template defined in Python into its data file representation."""
+    references: Dict[str, Any] = {}
+    for filter_prop_k, filter_prop_v in filter_template.items():
+        if filter_prop_k in _STAGE_KINDS:
+            references[filter_prop_k] = get_stage_reference(filter_prop_k, filter_prop_v)
+        elif filter_prop_k == "data_types":
+            references[filter_prop_k] = [get_data_type_reference(x) for x in filter_prop_v]
+        elif filter_prop_k != "pure":
+            # Purity is instead derived from the stages that the filter references
+            references[filter_prop_k] = filter_prop_v
+
+    return references
+
+
+def _compile_filter(filter_name: str, definition: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebase and validate a single filter from a dialect file."""
+    if not isinstance(definition, dict) or not isinstance(definition.get("fql"), str):
+        raise ValueError(f"The filter {filter_name} must be a table containing an fql property.")
+
+    unknown_properties = set(definition) - _FILTER_PROPERTIES - {"aliases", "template"}
+    if unknown_properties:
+        raise ValueError(
+            f"The filter {filter_name} contains unknown properties: {sorted(unknown_properties)}"
+        )
+
+    compiled_filter = _to_references(default_filter)
+    if "template" in definition:
+        if definition["template"] not in TEMPLATES:
+            raise ValueError(
+                f"The template {definition['template']} used by the filter {filter_name} does "
+                f"not exist. Valid choices are: {str(list(TEMPLATES))}."
+            )
+        compiled_filter.update(_to_references(TEMPLATES[definition["template"]]))
+
+    compiled_filter.update(
+        {k: v for k, v in definition.items() if k not in ("aliases", "template")}
+    )
+
+    # Resolve every reference once now, so that invalid dialect files are rejected up front
+    stage_purity: List[bool] = [
+        resolve_stage(kind, compiled_filter[kind])[1] for kind in _STAGE_KINDS
+    ]
+    compiled_filter.setdefault("pure", all(stage_purity))
+    for data_type in compiled_filter["data_types"]:
+        resolve_data_type(data_type)
+
+    for operator in compiled_filter["valid_operators"]:
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"The filter {filter_name} contains an invalid operator {operator}.")
+
+    if compiled_filter["operator"] not in compiled_filter["valid_operators"]:
+        raise ValueError(
+            f"The default operator of the filter {filter_name} is not one of its valid operators."
+        )
+
+    return compiled_filter
+
+
+def compile_dialect_definition(dialect_contents: Dict[str, Any]) -> Dict[str, Any]:
+    """Compile the parsed contents of a dialect file into its cacheable compiled form."""
+    dialect_name = dialect_contents.get("name")
+    if not isinstance(dialect_name, str) or not dialect_name:
+        raise ValueError("A dialect file must contain a name.")
+
+    filters = dialect_contents.get("filters")
+    if not isinstance(filters, dict):
+        raise ValueError(f"The dialect {dialect_name} must contain a table of filters.")
+
+    compiled_filters: Dict[str, Dict[str, Any]] = {}
+    aliases: Dict[str, str] = {}
+    for filter_name, definition in filters.items():
+        compiled_filters[filter_name] = _compile_filter(filter_name, definition)
+
+        for alias in [filter_name, *definition.get("aliases", [])]:
+            # For compatability reasons, filter names are always looked up in lower case
+            alias = alias.lower()
+            if alias in aliases:
+                raise ValueError(f"The filter name {alias} is defined more than once.")
+            aliases[alias] = filter_name
+
+    return {"name": dialect_name, "filters": compiled_filters, "aliases": aliases}
+
+
+def build_dialect_filters(compiled_dialect: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Turn a compiled dialect back into a dictionary of filter definitions, keyed by alias.
+
+    Aliases of the same filter share a single filter definition, as they do in Python dialects.
+    """
+    filter_defs: Dict[str, Dict[str, Any]] = {}
+    for filter_name, compiled_filter in compiled_dialect["filters"].items():
+        filter_def = dict(compiled_filter)
+        filter_def["data_types"] = [resolve_data_type(x) for x in compiled_filter["data_types"]]
+        for kind in _STAGE_KINDS:
+            filter_def[kind] = resolve_stage(kind, compiled_filter[kind])[0]
+
+        filter_defs[filter_name] = filter_def
+
+    return {
+        alias: filter_defs[filter_name]
+        for alias, filter_name in compiled_dialect["aliases"].items()
+    }
@@ -6,6 +6,10 @@ so that a resultant filter can exist.
 
 from typing import Any, Dict
 
+from caracara_filters.stages import is_pure_stage
+
+_STAGE_KINDS = ("validator", "transform", "list_transform")
+
 
 def rebase_filters_on_default(
     default_filter: Dict[str, Any], filters: Dict[str, Dict[str, Any]]
@@ -16,8 +20,17 @@ def rebase_filters_on_default(
     data types in use here. Instead, this rebase function will only work down to one single level of
     dictionary. It is not a recursive function, and does not need to be, so long as we do not need
     to go to the level of nested dictionaries.
+
+    Filters that do not say whether they are pure are marked as pure if every one of their stages
+    (including those inherited from the default filter) is a registered pure stage. Otherwise,
+    they inherit the default filter's purity.
     """
     for filter_name, filter_dict in filters.items():
+        if "pure" not in filter_dict and all(
+            is_pure_stage(filter_dict.get(kind, default_filter.get(kind))) for kind in _STAGE_KINDS
+        ):
+            filters[filter_name]["pure"] = True
+
         for default_filter_prop_k, default_filter_prop_v in default_filter.items():
             if default_filter_prop_k not in filter_dict:
                 filters[filter_name][default_filter_prop_k] = default_filter_prop_v
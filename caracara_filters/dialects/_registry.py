@@ -0,0 +1,275 @@
+"""Caracara Filters: Dialect Registry.
+
+This file holds every registered dialect, alongside an index of each dialect's filters that is
+used to resolve filter names when a filter is created.
+
+Filter names are matched regardless of case and underscores, so last_seen, lastseen and LastSeen
+all resolve to the same filter. The index contains every filter name exactly as it was registered
+(so that the most common spellings resolve with a single dictionary lookup), as well as the
+normalised form of every name (lower case, without underscores), which is used as a fallback.
+Each index entry holds the filter's canonical name and its filter definition, so aliases of the
+same filter always resolve to a single definition.
+
+Each dialect also has a fingerprint of its filter definitions, which changes whenever the dialect
+(or the base dialect) is registered again with different filters. Compiled caches, such as those
+of query packs, store the fingerprints of the dialects they use, so they are invalidated by
+runtime changes to those dialects.
+"""
+
+import hashlib
+import sys
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+
+from caracara_filters.common.files import load_compiled_data_file
+from caracara_filters.dialects._base import BASE_FILTERS, default_filter
+from caracara_filters.dialects._loader import (
+    DIALECT_CACHE_VERSION,
+    build_dialect_filters,
+    compile_dialect_definition,
+)
+from caracara_filters.dialects._merge import rebase_filters_on_default
+from caracara_filters.dialects.hosts import HOSTS_FILTERS
+from caracara_filters.dialects.iocs import IOCS_FILTERS
+from caracara_filters.dialects.prevention_policies import PREVENTION_POLICIES_FILTERS
+from caracara_filters.dialects.response_policies import RESPONSE_POLICIES_FILTERS
+from caracara_filters.dialects.rtr import RTR_FILTERS
+from caracara_filters.dialects.sensor_download import SENSOR_DOWNLOAD_FILTERS
+from caracara_filters.dialects.users import USERS_FILTERS
+
+FilterIndex = Dict[str, Tuple[str, Dict[str, Any]]]
+
+DIALECTS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "base": BASE_FILTERS,
+    "hosts": HOSTS_FILTERS,
+    "iocs": IOCS_FILTERS,
+    "prevention_policies": PREVENTION_POLICIES_FILTERS,
+    "response_policies": RESPONSE_POLICIES_FILTERS,
+    "rtr": RTR_FILTERS,
+    "sensor_download": SENSOR_DOWNLOAD_FILTERS,
+    "users": USERS_FILTERS,
+}
+
+# The filters available in each dialect (i.e., the base filters overlaid with the dialect's own)
+AVAILABLE_FILTERS: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+# The name resolution index for each dialect, built from AVAILABLE_FILTERS
+FILTER_INDEXES: Dict[str, FilterIndex] = {}
+
+# The base and dialect filter dictionaries that each index was built from, so that dialects that
+# are replaced or removed directly within DIALECTS are detected
+_INDEXED_FILTERS: Dict[str, Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]] = {}
+
+# The fingerprint of each dialect's available filters, computed when first requested
+_FINGERPRINTS: Dict[str, str] = {}
+
+
+def normalise_filter_name(filter_name: str) -> str:
+    """Return the normalised form of a filter name, ignoring case and underscores."""
+    return filter_name.lower().replace("_", "")
+
+
+def _copy_filters(filters: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Return a copy of a dictionary of filters, in which aliases still share one definition."""
+    copies: Dict[int, Dict[str, Any]] = {}
+    copied_filters: Dict[str, Dict[str, Any]] = {}
+    for filter_name, filter_def in filters.items():
+        if id(filter_def) not in copies:
+            copies[id(filter_def)] = dict(filter_def)
+        copied_filters[filter_name] = copies[id(filter_def)]
+
+    return copied_filters
+
+
+def build_filter_index(available_filters: Dict[str, Dict[str, Any]]) -> FilterIndex:
+    """Build a name resolution index for a dictionary of filters, keyed by alias.
+
+    The canonical name of a filter is its longest registered alias, which favours the pythonic
+    (underscored) spelling. Two different filters whose names normalise to the same string are
+    ambiguous, and are rejected. The index refers to copies of the filter definitions, in which
+    canonical names, FQL property names and default operators are interned, so the definitions
+    that were passed in are left unmodified.
+    """
+    available_filters = _copy_filters(available_filters)
+    canonical_names: Dict[int, str] = {}
+    for filter_name, filter_def in available_filters.items():
+        current_name = canonical_names.get(id(filter_def))
+        if current_name is None or len(filter_name) > len(current_name):
+            canonical_names[id(filter_def)] = sys.intern(filter_name)
+
+        # Every stored filter refers to these strings, so intern them to ensure that filters
+        # share one copy of each, even when the dialect was loaded from a data file
+        filter_def["fql"] = sys.intern(filter_def["fql"])
+        filter_def["operator"] = sys.intern(filter_def["operator"])
+
+    filter_index: FilterIndex = {}
+    for filter_name, filter_def in available_filters.items():
+        entry = (canonical_names[id(filter_def)], filter_def)
+        normalised_name = normalise_filter_name(filter_name)
+        existing_entry = filter_index.get(normalised_name)
+        if existing_entry is not None and existing_entry[1] is not filter_def:
+            raise ValueError(
+                f"The filter names {existing_entry[0]} and {filter_name} are ambiguous, as they "
+                "differ only by case or underscores."
+            )
+
+        filter_index[normalised_name] = entry
+        filter_index[filter_name] = entry
+
+    return filter_index
+
+
+def _index_dialect(dialect: str) -> None:
+    """Merge a dialect's filters with the base filters and index the result."""
+    if dialect == "base":
+        available_filters = DIALECTS["base"]
+    else:
+        available_filters = {**DIALECTS["base"], **DIALECTS[dialect]}
+
+    filter_index = build_filter_index(available_filters)
+    FILTER_INDEXES[dialect] = filter_index
+    # The available filters refer to the same (interned) definitions as the index
+    AVAILABLE_FILTERS[dialect] = {
+        filter_name: filter_index[filter_name][1] for filter_name in available_filters
+    }
+    _INDEXED_FILTERS[dialect] = (DIALECTS["base"], DIALECTS[dialect])
+    _FINGERPRINTS.pop(dialect, None)
+
+
+def get_filter_index(dialect: str) -> Tuple[Dict[str, Dict[str, Any]], FilterIndex]:
+    """Return the available filters and filter index of a dialect, indexing it if necessary.
+
+    Dialects added to or replaced within DIALECTS directly (rather than via register_dialect())
+    are indexed the first time they are used.
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(
+            f"The specified dialect does not exist. Valid choices are: {str(DIALECTS.keys())}."
+        )
+
+    indexed_filters = _INDEXED_FILTERS.get(dialect)
+    if (
+        indexed_filters is None
+        or indexed_filters[0] is not DIALECTS["base"]
+        or indexed_filters[1] is not DIALECTS[dialect]
+    ):
+        _index_dialect(dialect)
+
+    return AVAILABLE_FILTERS[dialect], FILTER_INDEXES[dialect]
+
+
+def _describe_definition(value: Any) -> str:
+    """Return a stable description of part of a filter definition, for use in a fingerprint.
+
+    Functions and types are described by their qualified names, as their reprs include memory
+    addresses that differ between processes.
+    """
+    if isinstance(value, partial):
+        return (
+            f"partial({_describe_definition(value.func)}, {_describe_definition(value.args)}, "
+            f"{_describe_definition(value.keywords)})"
+        )
+
+    if isinstance(value, type) or callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', value)}"
+
+    if isinstance(value, dict):
+        items = sorted(
+            f"{_describe_definition(key)}: {_describe_definition(item)}"
+            for key, item in value.items()
+        )
+        return "{" + ", ".join(items) + "}"
+
+    if isinstance(value, (set, frozenset)):
+        return "{" + ", ".join(sorted(_describe_definition(item) for item in value)) + "}"
+
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_describe_definition(item) for item in value) + "]"
+
+    return repr(value)
+
+
+def get_dialect_fingerprint(dialect: str) -> str:
+    """Return a SHA-256 fingerprint of the filter definitions available within a dialect."""
+    available_filters, _ = get_filter_index(dialect)
+    fingerprint = _FINGERPRINTS.get(dialect)
+    if fingerprint is None:
+        description = _describe_definition(available_filters)
+        fingerprint = hashlib.sha256(description.encode("utf-8")).hexdigest()
+        _FINGERPRINTS[dialect] = fingerprint
+
+    return fingerprint
+
+
+def resolve_filter(
+    filter_index: FilterIndex, filter_name: str
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Resolve a filter name to its canonical name and definition, or None if it does not exist."""
+    entry = filter_index.get(filter_name)
+    if entry is None:
+        entry = filter_index.get(normalise_filter_name(filter_name))
+
+    return entry
+
+
+def register_dialect(dialect: str, filters: Dict[str, Dict[str, Any]]) -> None:
+    """Register (or replace) a dialect, making it available to new FQL generators.
+
+    Every filter is rebased on the default filter, in the same way as the built-in dialects, and
+    the base filters are available within the dialect unless it overrides them. Filter names are
+    stored in lower case, and aliases should share the same filter definition dictionary. The
+    dictionaries passed in are copied rather than modified.
+    """
+    filters = {
+        filter_name.lower(): filter_def
+        for filter_name, filter_def in _copy_filters(filters).items()
+    }
+    rebase_filters_on_default(default_filter, filters)
+
+    # Every dialect includes the base filters, so replacing them affects every dialect
+    affected_dialects = {dialect, *FILTER_INDEXES} if dialect == "base" else {dialect}
+    previous_filters = DIALECTS.get(dialect)
+    DIALECTS[dialect] = filters
+    try:
+        for affected_dialect in affected_dialects:
+            _index_dialect(affected_dialect)
+    except ValueError:
+        # Restore the previous state, so that an ambiguous dialect does not replace a working one
+        if previous_filters is None:
+            del DIALECTS[dialect]
+            FILTER_INDEXES.pop(dialect, None)
+            AVAILABLE_FILTERS.pop(dialect, None)
+            _INDEXED_FILTERS.pop(dialect, None)
+            affected_dialects.discard(dialect)
+        else:
+            DIALECTS[dialect] = previous_filters
+
+        for affected_dialect in affected_dialects:
+            _index_dialect(affected_dialect)
+        raise
+
+
+def load_dialect_file(
+    dialect_path: str,
+    cache_path: Optional[str] = None,
+    use_cache: bool = True,
+) -> str:
+    """Load a dialect from a JSON or TOML data file, and return the name of the dialect.
+
+    The compiled dialect is cached on disk (by default, alongside the dialect file with a
+    .cache.json suffix), so that subsequent loads of an unchanged file do not need to rebase or
+    validate any filters. A dialect with the same name as an existing dialect replaces it.
+    """
+    compiled_dialect = load_compiled_data_file(
+        file_path=dialect_path,
+        compile_func=compile_dialect_definition,
+        cache_version=DIALECT_CACHE_VERSION,
+        cache_path=cache_path,
+        use_cache=use_cache,
+    )
+    register_dialect(compiled_dialect["name"], build_dialect_filters(compiled_dialect))
+    return compiled_dialect["name"]
+
+
+for _dialect in DIALECTS:
+    _index_dialect(_dialect)
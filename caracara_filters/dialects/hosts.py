@@ -8,8 +8,20 @@ from typing import Any, Dict
 
 from caracara_filters.common.templates import RELATIVE_TIMESTAMP_FILTER_TEMPLATE
 from caracara_filters.dialects._base import default_filter, rebase_filters_on_default
-from caracara_filters.transforms import yes_no_transform
-from caracara_filters.validators import boolean_validator, options_validator
+from caracara_filters.transforms import (
+    aid_list_transform,
+    ip_address_transform,
+    ip_network_collapse_transform,
+    lowercase_transform,
+    user_readable_string_transform,
+    yes_no_transform,
+)
+from caracara_filters.validators import (
+    aid_validator,
+    boolean_validator,
+    ip_address_validator,
+    options_validator,
+)
 
 _containment_value_map = {
     "Contained": "contained",
@@ -23,18 +35,6 @@ _role_map = {
     "Workstation": "Workstation",
 }
 
-
-def user_readable_string_transform(map_dict: Dict[str, str], input_str: str) -> str:
-    """Map a human-readable string to a machine-readable one."""
-    if input_str in map_dict.values():
-        return input_str
-
-    if input_str in map_dict:
-        return map_dict[input_str]
-
-    raise ValueError("An invalid filter input was provided.")
-
-
 hosts_contained_filter = {
     "fql": "status",
     "help": "Filter by a host's network containment status.",
@@ -50,7 +50,14 @@ hosts_contained_filter = {
 
 hosts_device_id_filter = {
     "fql": "device_id",
-    "help": "Filter by device ID (AID).",
+    "validator": aid_validator,
+    "transform": lowercase_transform,
+    "list_transform": aid_list_transform,
+    "help": (
+        "Filter by device ID (AID). Values must be complete AIDs of 32 hexadecimal digits, or "
+        "hexadecimal partial IDs with wildcards (e.g., abc*). Values are lower cased, and the "
+        "complete AIDs within a list are packed into 16 bytes per AID."
+    ),
 }
 
 hosts_domain_filter = {
@@ -63,6 +70,8 @@ hosts_domain_filter = {
 
 hosts_external_ip_address_filter = {
     "fql": "external_ip",
+    "transform": ip_address_transform,
+    "validator": ip_address_validator,
     "help": (
         "This filter accepts an IP address string associated with a remote network, e.g. "
         "123.234.123.234, or 123.234.0.0/16 to cover the /16 range. You can also comma delimit "
@@ -117,11 +126,33 @@ hosts_last_seen_filter = {
 
 hosts_local_ip_address_filter = {
     "fql": "local_ip",
+    "transform": ip_address_transform,
+    "validator": ip_address_validator,
     "help": (
         "This filter accepts an IP address string associated with a network card, e.g. "
-        "172.16.1.2 or 172.16.0.0/16 to cover the /16 range. You can also comma delimit strings "
-        "for multiple matches, e.g., 172.16.1.2,172.16.1.3 to target hosts with each of those "
-        "IP addresses, or provide a Python list of IP address strings."
+        "172.16.1.2, 172.16.0.0/16 to cover the /16 range, or the wildcard 172.16.*. You can also "
+        "comma delimit strings for multiple matches, e.g., 172.16.1.2,172.16.1.3 to target hosts "
+        "with each of those IP addresses, or provide a Python list of IP address strings."
+    ),
+}
+
+hosts_external_ip_collapsed_filter = {
+    **hosts_external_ip_address_filter,
+    "list_transform": ip_network_collapse_transform,
+    "help": (
+        "This filter behaves like the external IP filter, but collapses a list of IP addresses "
+        "and CIDR networks into the fewest possible CIDR networks that cover exactly the same "
+        "addresses. For example, 10.0.0.0,10.0.0.1,10.0.0.2,10.0.0.3 becomes 10.0.0.0/30."
+    ),
+}
+
+hosts_local_ip_collapsed_filter = {
+    **hosts_local_ip_address_filter,
+    "list_transform": ip_network_collapse_transform,
+    "help": (
+        "This filter behaves like the local IP filter, but collapses a list of IP addresses "
+        "and CIDR networks into the fewest possible CIDR networks that cover exactly the same "
+        "addresses. For example, 172.16.1.0/25,172.16.1.128/25 becomes 172.16.1.0/24."
     ),
 }
 
@@ -194,6 +225,8 @@ HOSTS_FILTERS: Dict[str, Dict[str, Any]] = {
     "domain": hosts_domain_filter,
     "externalip": hosts_external_ip_address_filter,
     "external_ip": hosts_external_ip_address_filter,  # pythonic
+    "externalipcollapsed": hosts_external_ip_collapsed_filter,
+    "external_ip_collapsed": hosts_external_ip_collapsed_filter,  # pythonic
     "firstseen": hosts_first_seen_filter,
     "first_seen": hosts_first_seen_filter,  # pythonic
     "groupid": hosts_group_id_filter,
@@ -203,6 +236,8 @@ HOSTS_FILTERS: Dict[str, Dict[str, Any]] = {
     "last_seen": hosts_last_seen_filter,  # pythonic
     "localip": hosts_local_ip_address_filter,
     "local_ip": hosts_local_ip_address_filter,  # pythonic
+    "localipcollapsed": hosts_local_ip_collapsed_filter,
+    "local_ip_collapsed": hosts_local_ip_collapsed_filter,  # pythonic
     "macaddress": hosts_mac_address_filter,
     "mac_address": hosts_mac_address_filter,  # pythonic
     "osversion": hosts_os_version_filter,
@@ -32,6 +32,7 @@ iocs_action_filter = {
     "fql": "action",
     "validator": partial(options_validator, IOCS_ACTIONS, case_sensitive=False),
     "transform": lambda action: action.lower(),
+    "pure": True,
     "help": "Filter by IOC action.",
 }
 
@@ -96,6 +97,7 @@ iocs_platform_filter = {
     "fql": "platforms",
     "validator": partial(options_validator, PLATFORMS, case_sensitive=False),
     "transform": lambda platform: platform.lower(),  # Platforms in the IOC API are lower case
+    "pure": True,
     "help": "Filter by the platforms this IOC applies to.",
 }
 
@@ -103,6 +105,7 @@ iocs_mobile_action_filter = {
     "fql": "mobile_action",
     "validator": partial(options_validator, IOCS_ACTIONS, case_sensitive=False),
     "transform": lambda action: action.lower(),
+    "pure": True,
     "help": "Filter by mobile action",
 }
 
@@ -138,6 +141,7 @@ iocs_type_filter = {
     "fql": "type",
     "validator": partial(options_validator, IOCS_TYPES, case_sensitive=False),
     "transform": lambda type: type.lower(),  # The IOC API only matches types in lower case.
+    "pure": True,
     "help": "Filter by IOC type.",
 }
 
@@ -0,0 +1,164 @@
+"""Caracara Filters: Local Evaluation.
+
+This module evaluates filters, FQL generators and expressions against individual records (i.e.,
+dictionaries returned by the Falcon API), without sending anything to the cloud. This is useful
+for routing results back to the queries that requested them, and for filtering records that have
+been cached locally.
+
+Records are keyed by FQL property names. Dotted property names (e.g., cve.id) are looked up within
+nested dictionaries. Matching follows FQL's semantics as closely as is practical:
+
+- String comparisons are case-insensitive, and * acts as a wildcard.
+- Boolean values match their string representations (e.g., True matches "true").
+- A CIDR network (e.g., 10.0.0.0/8) matches any IP address within it.
+- A multivariate filter matches if any of its values match. With the NOT operator, it matches
+  only if none of its values match.
+- A record property that holds a list (e.g., tags) matches if any of its items match.
+- A null filter value matches a missing or null property.
+- Comparison operators (GREATER, GTE, LESS, LTE) compare strings lexicographically, which is
+  correct for the ISO 8601 timestamps produced by the relative timestamp transform.
+"""
+
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Pattern
+
+from caracara_filters.common.networks import parse_ip_network
+from caracara_filters.expressions import FQLExpression, OrGroup
+from caracara_filters.fql import FilterArgs, FQLGenerator
+
+Record = Dict[str, Any]
+
+_MISSING = object()
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "GREATER": operator.gt,
+    "GTE": operator.ge,
+    "LESS": operator.lt,
+    "LTE": operator.le,
+}
+
+
+def get_record_value(record: Record, fql: str) -> Any:
+    """Return the value of an FQL property within a record, or None if it does not exist."""
+    value = record.get(fql, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    # Fall back to walking nested dictionaries for dotted property names
+    value = record
+    for part in fql.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+
+    return value
+
+
+def _normalise(value: Any) -> Any:
+    """Normalise a filter or record value so that equivalent values compare as equal."""
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered == "true":
+            return True
+        if lowered == "false":
+            return False
+        return lowered
+
+    return value
+
+
+@lru_cache(maxsize=1024)
+def _wildcard_pattern(value: str) -> Pattern:
+    """Compile a case-insensitive regex for a filter value containing * wildcards."""
+    return re.compile(
+        ".*".join(re.escape(part) for part in value.split("*")), re.IGNORECASE | re.DOTALL
+    )
+
+
+def _value_equals(filter_value: Any, record_value: Any) -> bool:
+    """Check whether a single filter value matches a single record value."""
+    if filter_value is None or record_value is None:
+        return filter_value is None and record_value is None
+
+    if isinstance(filter_value, str) and isinstance(record_value, str):
+        if "*" in filter_value:
+            return _wildcard_pattern(filter_value).fullmatch(record_value) is not None
+
+        if "/" in filter_value:
+            network = parse_ip_network(filter_value)
+            address = parse_ip_network(record_value)
+            if network is not None and address is not None:
+                return address.version == network.version and address.subnet_of(network)
+
+    return _normalise(filter_value) == _normalise(record_value)
+
+
+def _value_compares(
+    comparison: Callable[[Any, Any], bool], filter_value: Any, record_value: Any
+) -> bool:
+    """Check whether a record value compares to a filter value via a comparison operator."""
+    if filter_value is None or record_value is None:
+        return False
+
+    try:
+        return comparison(_normalise(record_value), _normalise(filter_value))
+    except TypeError:
+        # Values of different types (e.g., a string and an integer) cannot be ordered
+        return False
+
+
+def evaluate_filter(filter_args: FilterArgs, record: Record) -> bool:
+    """Check whether a record matches a single stored filter."""
+    record_value = get_record_value(record, filter_args.fql)
+    record_values = record_value if isinstance(record_value, list) else [record_value]
+    filter_values = filter_args.value
+    if isinstance(filter_values, str) or not hasattr(filter_values, "__iter__"):
+        filter_values = [filter_values]
+
+    comparison = _COMPARISONS.get(filter_args.operator)
+    if comparison is None:
+        matched = any(
+            _value_equals(filter_value, value)
+            for filter_value in filter_values
+            for value in record_values
+        )
+    else:
+        matched = any(
+            _value_compares(comparison, filter_value, value)
+            for filter_value in filter_values
+            for value in record_values
+        )
+
+    if filter_args.operator == "NOT":
+        return not matched
+
+    return matched
+
+
+def evaluate(operand: Any, record: Record) -> bool:
+    """Check whether a record matches a filter, FQL generator or expression.
+
+    As with FQL itself, an FQL generator or expression with no filters matches every record, as
+    does an OR group containing such an operand.
+    """
+    if isinstance(operand, FilterArgs):
+        return evaluate_filter(operand, record)
+
+    if isinstance(operand, FQLGenerator):
+        return all(evaluate_filter(x, record) for x in operand.filters.values())
+
+    if isinstance(operand, FQLExpression):
+        if operand.matches_all():
+            return True
+        if isinstance(operand, OrGroup):
+            return any(evaluate(x, record) for x in operand.operands)
+        return all(evaluate(x, record) for x in operand.operands)
+
+    raise TypeError(f"Cannot evaluate a {str(type(operand))} against a record.")
+
+
+def make_predicate(operand: Any) -> Callable[[Record], bool]:
+    """Return a function that checks whether a record matches a filter, generator or expression."""
+    return lambda record: evaluate(operand, record)
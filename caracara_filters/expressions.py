@@ -0,0 +1,162 @@
+"""Caracara Filters: Boolean Expressions.
+
+An FQLGenerator can only AND its filters together. This module provides expression groups that
+combine FQLGenerator objects (and individual filters) into nested AND and OR conditions, so that
+a query such as "Linux hosts in group A, or any host tagged X" can be sent in a single request:
+
+    linux_in_group = FQLGenerator(dialect="hosts")
+    linux_in_group.create_new_filter("os", "Linux")
+    linux_in_group.create_new_filter("group_id", "abcdef")
+
+    tagged = FQLGenerator(dialect="hosts")
+    tagged.create_new_filter("tag", "FalconGroupingTags/X")
+
+    expression = OrGroup(linux_in_group, tagged)
+    # (platform_name: 'Linux'+groups: 'abcdef'),tags: 'FalconGroupingTags/X'
+
+In FQL, + represents AND and , represents OR. Nested groups are wrapped in parentheses only where
+they contain more than one term, and nested groups of the same kind are flattened. Groups can
+also be combined with the & and | operators.
+
+As in FQL itself, an FQL generator with no filters matches every record. An AND group skips such
+operands, but an OR group that contains one matches every record too, so the whole OR group is
+rendered as an empty string (and is skipped by any AND group that contains it).
+"""
+
+from typing import Iterator, List, Optional, Tuple, Union
+
+from caracara_filters.fql import FilterArgs, FQLGenerator, render_filter
+
+Operand = Union["FQLExpression", FQLGenerator, FilterArgs]
+
+
+def _matches_all(operand: Operand) -> bool:
+    """Check whether an operand matches every record, i.e., contains no effective filters."""
+    if isinstance(operand, FilterArgs):
+        return False
+
+    if isinstance(operand, FQLGenerator):
+        return not operand.filters
+
+    if isinstance(operand, FQLExpression):
+        return operand.matches_all()
+
+    raise TypeError(
+        "Expressions may only contain expressions, FQL generators or filters, "
+        f"but a {str(type(operand))} was provided."
+    )
+
+
+class FQLExpression:
+    """A group of operands (expressions, FQL generators or filters) joined by one operator."""
+
+    separator: str = ""
+
+    def __init__(self, *operands: Operand):
+        """Create a new expression group from any number of operands."""
+        self.operands: Tuple[Operand, ...] = operands
+        self.dialect: Optional[str] = None
+        for generator in self.iter_generators():
+            if self.dialect is None:
+                self.dialect = generator.dialect
+            elif generator.dialect != self.dialect:
+                raise ValueError(
+                    "Every FQL generator within an expression must use the same dialect, but "
+                    f"both {self.dialect} and {generator.dialect} were provided."
+                )
+
+    def iter_generators(self) -> Iterator[FQLGenerator]:
+        """Iterate over every FQL generator within this expression, including nested ones."""
+        for operand in self.operands:
+            if isinstance(operand, FQLGenerator):
+                yield operand
+            elif isinstance(operand, FQLExpression):
+                yield from operand.iter_generators()
+
+    def matches_all(self) -> bool:
+        """Return True if this expression matches every record, and so renders no FQL."""
+        return all(_matches_all(operand) for operand in self.operands)
+
+    def _iter_terms(self) -> Iterator[Tuple[Operand, int]]:
+        """Iterate over the terms of this group, and the number of filters within each term.
+
+        Operands that match every record are skipped. Nested groups of the same kind as this one,
+        and nested groups with only one term, are flattened into this group.
+        """
+        for operand in self.operands:
+            if _matches_all(operand):
+                continue
+
+            if isinstance(operand, FilterArgs):
+                yield operand, 1
+            elif isinstance(operand, FQLGenerator):
+                yield operand, len(operand.filters)
+            else:
+                terms = list(operand._iter_terms())  # pylint: disable=protected-access
+                if operand.separator == self.separator or len(terms) == 1:
+                    yield from terms
+                else:
+                    yield operand, sum(filter_count for _, filter_count in terms)
+
+    def _render_into(self, parts: List[str]) -> None:
+        """Append the rendered fragments of this expression to a list of string parts."""
+        if self.matches_all():
+            return
+
+        first = True
+        for term, filter_count in self._iter_terms():
+            if not first:
+                parts.append(self.separator)
+            first = False
+
+            # A term with more than one filter must be parenthesised, unless it is an AND group
+            # (i.e., an FQL generator) within another AND group, which has already been flattened
+            wrap = filter_count > 1 and not (
+                self.separator == "+" and isinstance(term, FQLGenerator)
+            )
+            if wrap:
+                parts.append("(")
+
+            if isinstance(term, FilterArgs):
+                parts.append(render_filter(term))
+            elif isinstance(term, FQLGenerator):
+                parts.append("+".join(render_filter(x) for x in term.filters.values()))
+            else:
+                term._render_into(parts)  # pylint: disable=protected-access
+
+            if wrap:
+                parts.append(")")
+
+    def get_fql(self) -> str:
+        """Return the FQL string representation of this expression."""
+        parts: List[str] = []
+        self._render_into(parts)
+        return "".join(parts)
+
+    def __str__(self) -> str:
+        """Return the FQL string representation of this expression."""
+        return self.get_fql()
+
+    def __and__(self, other: Operand) -> "AndGroup":
+        """Combine this expression with another operand via AND."""
+        return AndGroup(self, other)
+
+    def __or__(self, other: Operand) -> "OrGroup":
+        """Combine this expression with another operand via OR."""
+        return OrGroup(self, other)
+
+
+class AndGroup(FQLExpression):
+    """A group of operands that must all match (FQL +)."""
+
+    separator = "+"
+
+
+class OrGroup(FQLExpression):
+    """A group of operands, of which at least one must match (FQL ,)."""
+
+    separator = ","
+
+    def matches_all(self) -> bool:
+        """Return True if any operand (or, for an empty group, no operand) restricts nothing."""
+        return not self.operands or any(_matches_all(operand) for operand in self.operands)
@@ -4,30 +4,235 @@ This file contains a class that can be instantiated to contain filters. It must
 a dialect, after which filters can be added.
 """
 
+import io
+import sys
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+from urllib.parse import quote
 from uuid import uuid4
 
-from caracara_filters.common import FILTER_OPERATORS
-from caracara_filters.dialects import DIALECTS
+from caracara_filters.cache import STAGE_CACHE
+from caracara_filters.common import FILTER_OPERATORS, AIDList
+from caracara_filters.dialects import FilterIndex, get_filter_index, resolve_filter
+from caracara_filters.validation import ValidationReport
+from caracara_filters.validators import identity_validator
 
+if TYPE_CHECKING:
+    import sqlite3
 
-@dataclass
+    from caracara_filters.sql import SQLClause
+
+
+@dataclass(frozen=True)
 class FilterArgs:
     """Generic dataclass to hold a filter and its validated/transformed arguments.
 
     The contents of this dataclass are used once get_fql() is called. By storing the resultant
     data here, we can avoid needing to re-run any transformation of validation functions at the
     time that we actually require the FQL string.
+
+    Many thousands of these can be alive at once, so instances are slotted (i.e., have no
+    __dict__), and they are frozen so that they can be shared safely between generators. The
+    filter_def, fql and operator strings are interned by the dialect registry.
     """
 
+    __slots__ = ("filter_def", "fql", "value", "operator")
+
     filter_def: str
     fql: str
     value: Any
     operator: str
 
+    # dataclass(slots=True) requires Python 3.10, and the default pickle and deepcopy support for
+    # slotted objects restores fields via setattr(), which a frozen dataclass forbids
+    def __getstate__(self) -> Tuple[str, str, Any, str]:
+        """Return the fields of this filter, for pickling and copying."""
+        return (self.filter_def, self.fql, self.value, self.operator)
+
+    def __setstate__(self, state: Tuple[str, str, Any, str]) -> None:
+        """Restore the fields of an unpickled or copied filter, interning its strings again."""
+        filter_def, fql, value, operator = state
+        object.__setattr__(self, "filter_def", sys.intern(filter_def))
+        object.__setattr__(self, "fql", sys.intern(fql))
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "operator", sys.intern(operator))
+
+
+def _render_scalar_value(value: Any) -> str:
+    """Render a single (non-list) filter value as FQL."""
+    if isinstance(value, str):
+        if value.lower() in ["true", "false"]:
+            return value.lower()
+        return f"'{value}'"
+
+    if isinstance(value, bool):
+        return str(value).lower()
+
+    if value is None:
+        return "null"
+
+    return str(value)
+
+
+def render_fql_value(value: Any) -> str:
+    """Render a stored filter value, which may be a list of values, as FQL."""
+    if isinstance(value, AIDList):
+        return value.render_fql()
+
+    if isinstance(value, list):
+        if value and isinstance(value[0], str):
+            try:
+                return "['" + "','".join(value) + "']"
+            except TypeError:
+                # The list mixes strings with other acceptable types, such as bools
+                pass
+
+        return "[" + ",".join(_render_scalar_value(x) for x in value) + "]"
+
+    return _render_scalar_value(value)
+
+
+def render_filter(filter_args: FilterArgs) -> str:
+    """Render a single stored filter as an FQL string."""
+    operator_symbol = FILTER_OPERATORS[filter_args.operator]
+    return f"{filter_args.fql}: {operator_symbol}{render_fql_value(filter_args.value)}"
+
+
+def iter_filter_fragments(filter_args: FilterArgs, chunk_size: int = 1024) -> Iterator[str]:
+    """Render a single stored filter as a series of FQL fragments.
+
+    Joining the fragments gives the same string as render_filter(), but list values are rendered
+    chunk_size values at a time, so a huge list never needs to be rendered as one string.
+    """
+    operator_symbol = FILTER_OPERATORS[filter_args.operator]
+    value = filter_args.value
+    if not isinstance(value, (list, AIDList)):
+        yield f"{filter_args.fql}: {operator_symbol}{_render_scalar_value(value)}"
+        return
+
+    yield f"{filter_args.fql}: {operator_symbol}["
+
+    # Match render_fql_value(), which only quotes every value verbatim if they are all strings
+    all_strings = isinstance(value, AIDList) or all(isinstance(x, str) for x in value)
+    for offset in range(0, len(value), chunk_size):
+        chunk = value[offset : offset + chunk_size]
+        if all_strings:
+            rendered_chunk = "'" + "','".join(chunk) + "'"
+        else:
+            rendered_chunk = ",".join(_render_scalar_value(x) for x in chunk)
+
+        yield rendered_chunk if offset == 0 else "," + rendered_chunk
+
+    yield "]"
+
+
+def count_filter_values(filter_args: FilterArgs) -> int:
+    """Return the number of values held by a stored filter (one, unless it is a list)."""
+    if isinstance(filter_args.value, (list, AIDList)):
+        return len(filter_args.value)
+
+    return 1
+
+
+@dataclass(frozen=True, eq=False)
+class FrozenFQL:
+    """An immutable snapshot of an FQLGenerator's filters, returned by FQLGenerator.freeze().
 
-class FQLGenerator:
+    The FQL string and its canonical form are rendered once, when the snapshot is taken, and the
+    hash is computed from the canonical form, so snapshots can be shared between threads and used
+    in sets or as dictionary keys without rendering anything again. Two snapshots are equal if
+    they have the same dialect and their filters render the same FQL, regardless of the order of
+    those filters. FQLGenerator objects themselves are mutable, so are compared by identity;
+    compare their snapshots instead.
+    """
+
+    __slots__ = ("dialect", "filters", "fql", "canonical_fql", "hash_value")
+
+    dialect: str
+    filters: Tuple[FilterArgs, ...]
+    fql: str
+    canonical_fql: str
+    hash_value: int
+
+    @classmethod
+    def from_filters(cls, dialect: str, filters: Tuple[FilterArgs, ...]) -> "FrozenFQL":
+        """Create a snapshot of a dialect and a sequence of stored filters."""
+        fragments = [render_filter(filter_args) for filter_args in filters]
+        canonical_fql = "+".join(sorted(fragments))
+        return cls(
+            dialect=dialect,
+            filters=filters,
+            fql="+".join(fragments),
+            canonical_fql=canonical_fql,
+            hash_value=hash((dialect, canonical_fql)),
+        )
+
+    def __getstate__(self) -> Tuple[str, Tuple[FilterArgs, ...], str, str]:
+        """Return the fields of this snapshot, for pickling and copying.
+
+        The hash is left out, as string hashes differ between processes.
+        """
+        return (self.dialect, self.filters, self.fql, self.canonical_fql)
+
+    def __setstate__(self, state: Tuple[str, Tuple[FilterArgs, ...], str, str]) -> None:
+        """Restore the fields of an unpickled or copied snapshot, computing its hash again."""
+        dialect, filters, fql, canonical_fql = state
+        object.__setattr__(self, "dialect", dialect)
+        object.__setattr__(self, "filters", filters)
+        object.__setattr__(self, "fql", fql)
+        object.__setattr__(self, "canonical_fql", canonical_fql)
+        object.__setattr__(self, "hash_value", hash((dialect, canonical_fql)))
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare the dialect and the (order-insensitive) filters of two snapshots."""
+        if not isinstance(other, FrozenFQL):
+            return NotImplemented
+
+        return (
+            self.hash_value == other.hash_value
+            and self.dialect == other.dialect
+            and self.canonical_fql == other.canonical_fql
+        )
+
+    def __hash__(self) -> int:
+        """Return the hash computed when the snapshot was taken."""
+        return self.hash_value
+
+    def __repr__(self) -> str:
+        """Return a representation of this snapshot."""
+        return f"FrozenFQL(dialect={self.dialect!r}, fql={self.fql!r})"
+
+    def __str__(self) -> str:
+        """Return the FQL string of this snapshot."""
+        return self.fql
+
+    def get_fql(self) -> str:
+        """Return the FQL string of this snapshot, with the filters in their original order."""
+        return self.fql
+
+    def to_generator(self) -> "FQLGenerator":
+        """Return a new FQLGenerator containing this snapshot's filters."""
+        fql_generator = FQLGenerator(dialect=self.dialect)
+        for filter_args in self.filters:
+            fql_generator.add_filter(filter_args)
+
+        return fql_generator
+
+
+class FQLGenerator:  # pylint: disable=too-many-instance-attributes
     """Caracara FQL Generator Class.
 
     This class will configure itself based on the chosen dialect (base, hosts, etc.), and will
@@ -36,52 +241,103 @@ class FQLGenerator:
     When a filter is created, it will be validated and its inputs values transformed before being
     stored into the object. This means that changing a filter value once it has been stored is not
     supported, as the transforms and validators will be bypassed.
-    """
-
-    def __init__(self, dialect: str = "base"):
-        """Create a new FQL generator with a specific dialect."""
-        if dialect not in DIALECTS:
-            raise ValueError(
-                f"The specified dialect does not exist. Valid choices are: {str(DIALECTS.keys())}."
-            )
 
-        if dialect == "base":
-            self.available_filters: Dict[str, Dict[str, Any]] = DIALECTS["base"]
-        else:
-            self.available_filters: Dict[str, Dict[str, Any]] = {
-                **DIALECTS["base"],
-                **DIALECTS[dialect],
-            }
+    The rendered length and value count of the query are tracked as filters are added and
+    removed, so estimated_length and value_count never need to render the whole query.
+    """
 
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        dialect: str = "base",
+        dedupe: bool = False,
+        *,
+        max_length: Optional[int] = None,
+        max_values: Optional[int] = None,
+        on_budget_exceeded: Optional[Callable[["FQLGenerator", FilterArgs], None]] = None,
+        trusted: bool = False,
+    ):
+        """Create a new FQL generator with a specific dialect.
+
+        If dedupe is True, duplicate values provided to multivariate filters will be dropped
+        (keeping the first occurrence) unless overridden when creating an individual filter.
+
+        The max_length and max_values arguments set a budget for the rendered length of the FQL
+        string and for the total number of filter values. By default, adding a filter that would
+        exceed the budget raises a ValueError and the filter is not added. If on_budget_exceeded
+        is provided, it is instead called with this generator and the new filter, and the filter
+        is added regardless.
+
+        If trusted is True, filter values are assumed to be valid (e.g., because they came
+        straight from a Falcon API response), so type checks and validators are skipped unless
+        overridden when creating an individual filter. Transforms still run, as they produce the
+        form of each value that is rendered into FQL.
+        """
+        available_filters, filter_index = get_filter_index(dialect)
+        self.available_filters: Dict[str, Dict[str, Any]] = available_filters
+        self._filter_index: FilterIndex = filter_index
         self.dialect: str = dialect
+        self.dedupe: bool = dedupe
         self.filters: Dict[str, FilterArgs] = {}
+        self.max_length: Optional[int] = max_length
+        self.max_values: Optional[int] = max_values
+        self.on_budget_exceeded = on_budget_exceeded
+        self.trusted: bool = trusted
+
+        # The rendered length and value count of each filter, keyed by filter ID, and the totals
+        self._filter_sizes: Dict[str, Tuple[int, int]] = {}
+        self._fragments_length: int = 0
+        self._value_count: int = 0
+
+        # The percent-encoded FQL of each filter, keyed by filter ID, alongside the filter that it
+        # was rendered from, so that each filter is only ever encoded once
+        self._encoded_fragments: Dict[str, Tuple[FilterArgs, str]] = {}
+
+    @property
+    def estimated_length(self) -> int:
+        """Return the length of the FQL string that get_fql() would currently return."""
+        # Each filter after the first is preceded by a + separator
+        return self._fragments_length + max(len(self._filter_sizes) - 1, 0)
+
+    @property
+    def value_count(self) -> int:
+        """Return the total number of values held by the filters within this object."""
+        return self._value_count
 
     def _validate_input_type(
         self,
         filter_name: str,
         filter_def: Dict[str, Any],
         value: Any,
+        check_items: bool = True,
     ) -> None:
-        """Validate the data type of a filter's input, based on the filter definition."""
+        """Validate the data type of a filter's input, based on the filter definition.
+
+        If check_items is False, the types of the items within a list are not checked.
+        """
         data_types: List[Type] = filter_def["data_types"]
         multivariate: bool = filter_def["multivariate"]
         nullable: bool = filter_def["nullable"]
 
         if isinstance(value, list):
-            if (
-                multivariate is True
-                and value
-                and not any(isinstance(value[0], x) for x in data_types)
-            ):
-                raise TypeError(
-                    f"You provided a list for {filter_name}, but the type of the first item "
-                    f"({str(type(value))}) was not in the list of acceptable types: "
-                    + ", ".join(str(type(x)) for x in data_types)
-                )
             if multivariate is False:
                 raise TypeError(
                     f"The filter {filter_name} is not multivariate, but you provided a list."
                 )
+
+            # Lists are typically homogeneous, so rather than checking every item against every
+            # acceptable type, we check each distinct item type once. We only go back to the
+            # items themselves to locate the offending one for the error message.
+            acceptable_types = tuple(data_types)
+            for item_type in set(map(type, value)) if check_items else ():
+                if not issubclass(item_type, acceptable_types):
+                    index = next(
+                        i for i, item in enumerate(value) if not isinstance(item, acceptable_types)
+                    )
+                    raise TypeError(
+                        f"You provided a list for {filter_name}, but the type of item {index} "
+                        f"({str(type(value[index]))}) was not in the list of acceptable types: "
+                        + ", ".join(str(x) for x in data_types)
+                    )
         elif value is None and not nullable:
             raise TypeError(
                 f"The filter {filter_name} is not nullable, but you provided a NoneType."
@@ -93,34 +349,90 @@ class FQLGenerator:
             if not any(isinstance(value, x) for x in data_types):
                 raise TypeError(
                     f"The type of the filter {filter_name} ({str(type(value))}) was not in the "
-                    "list of acceptable types: " + ", ".join(str(type(x)) for x in data_types)
+                    "list of acceptable types: " + ", ".join(str(x) for x in data_types)
                 )
 
-    def _validate_and_transform(
+    def _validate_and_transform(  # pylint: disable=too-many-arguments,too-many-locals
         self,
         filter_name: str,
         filter_def: Dict[str, Any],
         value: Any,
+        dedupe: bool = False,
+        *,
+        report: Optional[ValidationReport] = None,
+        trusted: bool = False,
     ) -> Union[List[Any], str]:
-        """Take an input from a developer or user and return a valid filter value."""
+        """Take an input from a developer or user and return a valid filter value.
+
+        If dedupe is True, repeated values within a multivariate input are skipped before they
+        are validated, and values that transform to an already stored value are dropped. The
+        order of the first occurrence of each value is preserved.
+
+        If a report is provided, every item within a multivariate input is type checked,
+        validated and transformed, and invalid items are recorded in the report and skipped
+        rather than raising an exception.
+
+        If trusted is True, values are transformed without being validated.
+        """
+        # pylint: disable=too-many-branches
         multivariate: bool = filter_def["multivariate"]
-        transform_func: Callable[[Any], Any] = filter_def["transform"]
-        validation_func: Callable[[Any], bool] = filter_def["validator"]
+        list_transform_func: Callable[[List[Any]], List[Any]] = filter_def["list_transform"]
+        validation_func: Callable[[Any], bool]
+        transform_func: Callable[[Any], Any]
+        validation_func, transform_func = STAGE_CACHE.wrap_filter(filter_def)
+        if trusted:
+            validation_func = identity_validator
 
         # Handle multivariate options by validating and transforming each option individually
         if multivariate and isinstance(value, list):
             transformed_value = []
-            for val in value:
-                # Validate the input
-                if not validation_func(val):
-                    raise ValueError(f"The input {val} is not valid for filter type {filter}.")
-
-                # Transform the input
-                transformed_val = transform_func(val)
+            seen_values = set()
+            seen_transformed_values = set()
+            acceptable_types = tuple(filter_def["data_types"])
+            for index, val in enumerate(value):
+                # When collecting errors, item types have not been checked up front
+                if report is not None and not isinstance(val, acceptable_types):
+                    report.add_issue(
+                        filter_name,
+                        index,
+                        val,
+                        f"The type {str(type(val))} is not in the list of acceptable types: "
+                        + ", ".join(str(x) for x in acceptable_types),
+                    )
+                    continue
+
+                # Skip values that have already been validated and transformed
+                if dedupe:
+                    if val in seen_values:
+                        continue
+                    seen_values.add(val)
+
+                # Validate and transform the input
+                try:
+                    if not validation_func(val):
+                        raise ValueError(
+                            f"The input {val} is not valid for filter type {filter_name}."
+                        )
+
+                    transformed_val = transform_func(val)
+                except ValueError as exc:
+                    if report is None:
+                        raise
+                    report.add_issue(filter_name, index, val, str(exc))
+                    continue
+
+                # Different inputs can transform to the same output (e.g., DC and Domain Controller)
+                if dedupe:
+                    if transformed_val in seen_transformed_values:
+                        continue
+                    seen_transformed_values.add(transformed_val)
 
                 # Replace the value in the list
                 transformed_value.append(transformed_val)
 
+            # Transform the list as a whole, now that every individual value is valid
+            transformed_value = list_transform_func(transformed_value)
+
         else:
             # Non-multivariate input, so just handle the items directly
             # Run through the validation function
@@ -133,67 +445,202 @@ class FQLGenerator:
         return transformed_value
 
     def add_filter(self, new_filter: FilterArgs) -> str:
-        """Add a new filter to the FQLGenerator object."""
+        """Add a new filter to the FQLGenerator object, subject to its length and value budget."""
+        filter_length = len(render_filter(new_filter))
+        filter_value_count = count_filter_values(new_filter)
+
+        new_length = self._fragments_length + filter_length + len(self._filter_sizes)
+        new_value_count = self._value_count + filter_value_count
+        exceeded: List[str] = []
+        if self.max_length is not None and new_length > self.max_length:
+            exceeded.append(f"{new_length} characters (maximum {self.max_length})")
+        if self.max_values is not None and new_value_count > self.max_values:
+            exceeded.append(f"{new_value_count} values (maximum {self.max_values})")
+
+        if exceeded:
+            if self.on_budget_exceeded is None:
+                raise ValueError(
+                    f"Adding the {new_filter.filter_def} filter would take this query over "
+                    "budget, to " + " and ".join(exceeded) + "."
+                )
+            self.on_budget_exceeded(self, new_filter)
+
         filter_id = str(uuid4())
         self.filters[filter_id] = new_filter
+        self._filter_sizes[filter_id] = (filter_length, filter_value_count)
+        self._fragments_length += filter_length
+        self._value_count += filter_value_count
         return filter_id
 
     def remove_filter(self, filter_id: str):
         """Remove a filter from the current FQL Generator object by filter ID."""
         if filter_id in self.filters:
             del self.filters[filter_id]
+            filter_length, filter_value_count = self._filter_sizes.pop(filter_id)
+            self._fragments_length -= filter_length
+            self._value_count -= filter_value_count
+            self._encoded_fragments.pop(filter_id, None)
         else:
             raise KeyError(f"The filter with ID {filter_id} does not exist in this object.")
 
-    def create_new_filter(
+    def reset(self) -> None:
+        """Remove every filter and clear every cache, so that this object can be reused.
+
+        The dialect and settings are kept. If the dialect has been re-registered since this
+        object was created, its filter table is refreshed.
+        """
+        self.available_filters, self._filter_index = get_filter_index(self.dialect)
+        self.filters = {}
+        self._filter_sizes = {}
+        self._fragments_length = 0
+        self._value_count = 0
+        self._encoded_fragments = {}
+
+    def copy(self) -> "FQLGenerator":
+        """Return a new FQLGenerator with the same settings and filters (and filter IDs).
+
+        Stored filters are never modified, so they are shared between the two generators.
+        """
+        new_generator = FQLGenerator(
+            dialect=self.dialect,
+            dedupe=self.dedupe,
+            max_length=self.max_length,
+            max_values=self.max_values,
+            on_budget_exceeded=self.on_budget_exceeded,
+            trusted=self.trusted,
+        )
+        new_generator.filters = dict(self.filters)
+        # pylint: disable=protected-access
+        new_generator._filter_sizes = dict(self._filter_sizes)
+        new_generator._fragments_length = self._fragments_length
+        new_generator._value_count = self._value_count
+        new_generator._encoded_fragments = dict(self._encoded_fragments)
+        # pylint: enable=protected-access
+        return new_generator
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Return the state of this object for pickling, without the dialect's filter table.
+
+        Filter definitions can hold lambdas, which cannot be pickled, so the filter table is
+        looked up again by dialect name when the object is unpickled (e.g., in a worker process).
+        """
+        state = self.__dict__.copy()
+        del state["available_filters"]
+        del state["_filter_index"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore an unpickled object, looking up the dialect's filter table again."""
+        self.__dict__.update(state)
+        self.available_filters, self._filter_index = get_filter_index(self.dialect)
+
+    def create_new_filter(  # pylint: disable=too-many-arguments,too-many-branches,too-many-locals
         self,
         filter_name: str,
         initial_value: Any,
         initial_operator: Optional[str] = None,
-    ) -> str:
-        """Create a new FQL filter and store it, alongside its arguments, inside this object."""
-        # For compatability reasons, we must send all filter names to lower case.
-        filter_name = filter_name.lower()
-        if filter_name not in self.available_filters:
-            raise ValueError(f"The specified filter name {filter_name} does not exist.")
-
-        new_filter_def: Dict[str, Any] = self.available_filters[filter_name]
+        dedupe: Optional[bool] = None,
+        *,
+        report: Optional[ValidationReport] = None,
+        drop_invalid: bool = False,
+        trusted: Optional[bool] = None,
+    ) -> Optional[str]:
+        """Create a new FQL filter and store it, alongside its arguments, inside this object.
+
+        The dedupe argument overrides the generator's dedupe setting for this filter only.
+
+        If a report is provided, problems with the filter name, operator or values (or with the
+        generator's budget) are recorded in the report instead of raising an exception, and every
+        value of a multivariate filter is checked. If any problems are found, no filter is created
+        and None is returned, unless drop_invalid is True, in which case the filter is created
+        from the remaining valid values (if there are any, and if they fit within the budget).
+        drop_invalid implies a report, even if one is not provided.
+
+        The trusted argument overrides the generator's trusted setting for this filter only. The
+        filter name and operator are always checked, even for trusted input.
+        """
+        if trusted is None:
+            trusted = self.trusted
+
+        if drop_invalid and report is None:
+            report = ValidationReport()
+        issue_count = 0 if report is None else len(report)
+
+        # Filter names are matched regardless of case and underscores, and resolved to the
+        # canonical name of the filter (e.g., LastSeen becomes last_seen)
+        resolved_filter = resolve_filter(self._filter_index, filter_name)
+        if resolved_filter is None:
+            error = ValueError(f"The specified filter name {filter_name} does not exist.")
+            if report is None:
+                raise error
+            report.add_issue(filter_name, None, initial_value, str(error))
+            return None
+
+        new_filter_def: Dict[str, Any]
+        filter_name, new_filter_def = resolved_filter
 
         # Perform simple validations before we execute a validation function
         valid_operators: List[str] = new_filter_def["valid_operators"]
         nullable: bool = new_filter_def["nullable"]
 
-        if initial_operator is None:
-            initial_operator = new_filter_def["operator"]
-        elif initial_operator not in valid_operators:
-            raise ValueError(
-                f"The provided initial operator, {initial_operator}, is not valid. Valid "
-                f"options for a {filter_name} filter: {str(valid_operators)}"
-            )
+        try:
+            if initial_operator is None:
+                initial_operator = new_filter_def["operator"]
+            elif initial_operator not in valid_operators:
+                raise ValueError(
+                    f"The provided initial operator, {initial_operator}, is not valid. Valid "
+                    f"options for a {filter_name} filter: {str(valid_operators)}"
+                )
+            else:
+                initial_operator = sys.intern(initial_operator)
+
+            # Ensure the initial value provided is of the right data type. When collecting
+            # errors, the items of a list are checked individually while they are validated.
+            if not trusted:
+                self._validate_input_type(
+                    filter_name=filter_name,
+                    filter_def=new_filter_def,
+                    value=initial_value,
+                    check_items=report is None,
+                )
 
-        # Ensure the initial value provided is of the right data type
-        self._validate_input_type(
-            filter_name=filter_name,
-            filter_def=new_filter_def,
-            value=initial_value,
-        )
+            # If the input is None, and we're nullable, we can just skip the rest
+            if nullable and initial_value is None:
+                transformed_value = None
+            else:
+                transformed_value = self._validate_and_transform(
+                    filter_name=filter_name,
+                    filter_def=new_filter_def,
+                    value=initial_value,
+                    dedupe=self.dedupe if dedupe is None else dedupe,
+                    report=report,
+                    trusted=trusted,
+                )
+        except (TypeError, ValueError) as exc:
+            if report is None:
+                raise
+            report.add_issue(filter_name, None, initial_value, str(exc))
+            return None
 
-        # If the input is None, and we're nullable, we can just skip the rest
-        if nullable and initial_value is None:
-            transformed_value = None
-        else:
-            transformed_value = self._validate_and_transform(
-                filter_name=filter_name,
-                filter_def=new_filter_def,
-                value=initial_value,
-            )
+        if report is not None and len(report) > issue_count:
+            # Only create a filter from the remaining values if asked to, and if there are any
+            if not drop_invalid or not transformed_value:
+                return None
 
         fql = new_filter_def["fql"]
 
         filter_args = FilterArgs(
             filter_def=filter_name, fql=fql, value=transformed_value, operator=initial_operator
         )
-        return self.add_filter(filter_args)
+
+        # A filter that would take the generator over its budget is reported like invalid input
+        try:
+            return self.add_filter(filter_args)
+        except ValueError as exc:
+            if report is None:
+                raise
+            report.add_issue(filter_name, None, initial_value, str(exc))
+            return None
 
     def create_new_filter_from_kv_string(self, key_string: str, value) -> str:
         """
@@ -220,36 +667,178 @@ class FQLGenerator:
 
         return self.create_new_filter(filter_name=filter_name, initial_value=value)
 
-    def get_fql(self) -> str:
-        """Return a valid FQL string based on the filters within this object."""
-        fql_strings: List[str] = []
-        for filter_args in self.filters.values():
-            operator_symbol = FILTER_OPERATORS[filter_args.operator]
-
-            if (
-                isinstance(filter_args.value, list)
-                and filter_args.value
-                and isinstance(filter_args.value[0], str)
-            ):
-                fql_value = "['" + "','".join(filter_args.value) + "']"
-            elif isinstance(filter_args.value, list):
-                fql_value = "[" + ",".join(filter_args.value) + "]"
-            elif isinstance(filter_args.value, str):
-                if filter_args.value.lower() in ["true", "false"]:
-                    fql_value = filter_args.value.lower()
-                else:
-                    fql_value = f"'{filter_args.value}'"
-            elif isinstance(filter_args.value, bool):
-                fql_value = str(filter_args.value).lower()
-            elif filter_args.value is None:
-                fql_value = "null"
+    def create_new_filters(
+        self, filter_specs: Iterable[Dict[str, Any]], drop_invalid: bool = False
+    ) -> ValidationReport:
+        """Create many filters at once, checking every value and reporting every problem.
+
+        Each filter specification is a dictionary containing a name, a value and (optionally) an
+        operator, as in a query pack. The returned report contains every issue found, and the IDs
+        of the filters that were created. A specification that is not a dictionary, or that has no
+        name, is reported with its position in filter_specs as the index. If any issues are found
+        and drop_invalid is False, no filters are created; otherwise, invalid values are dropped
+        and the rest are created.
+        """
+        report = ValidationReport()
+        filter_ids: List[str] = []
+        for position, filter_spec in enumerate(filter_specs):
+            # Malformed specifications are reported against their position in the input
+            if not isinstance(filter_spec, dict):
+                report.add_issue(
+                    "",
+                    position,
+                    filter_spec,
+                    f"Filter specifications must be dictionaries, not {str(type(filter_spec))}.",
+                )
+                continue
+            if not isinstance(filter_spec.get("name"), str):
+                report.add_issue(
+                    "", position, filter_spec, "Filter specifications must contain a filter name."
+                )
+                continue
+
+            filter_id = self.create_new_filter(
+                filter_name=filter_spec["name"],
+                initial_value=filter_spec.get("value"),
+                initial_operator=filter_spec.get("operator"),
+                report=report,
+                drop_invalid=drop_invalid,
+            )
+            if filter_id is not None:
+                filter_ids.append(filter_id)
+
+        if report.issues and not drop_invalid:
+            for filter_id in filter_ids:
+                self.remove_filter(filter_id)
+            filter_ids = []
+
+        report.filter_ids = filter_ids
+        return report
+
+    def _get_encoded_fragment(self, filter_id: str, filter_args: FilterArgs) -> str:
+        """Return the percent-encoded FQL of a stored filter, encoding it only if necessary."""
+        cached_fragment = self._encoded_fragments.get(filter_id)
+        if cached_fragment is not None and cached_fragment[0] is filter_args:
+            return cached_fragment[1]
+
+        encoded_fragment = quote(render_filter(filter_args), safe="")
+        self._encoded_fragments[filter_id] = (filter_args, encoded_fragment)
+        return encoded_fragment
+
+    def get_fql(self, encoded: bool = False) -> str:
+        """Return a valid FQL string based on the filters within this object.
+
+        If encoded is True, the FQL string is percent-encoded, ready for use as a query parameter.
+        The encoded form of each filter is cached, so only filters that have been added since the
+        last call are encoded.
+        """
+        if not encoded:
+            return "+".join(render_filter(filter_args) for filter_args in self.filters.values())
+
+        # Drop the encoded forms of filters that have been removed from the filters dictionary
+        if len(self._encoded_fragments) > len(self.filters):
+            self._encoded_fragments = {
+                filter_id: self._encoded_fragments[filter_id]
+                for filter_id in self.filters
+                if filter_id in self._encoded_fragments
+            }
+
+        return "%2B".join(
+            self._get_encoded_fragment(filter_id, filter_args)
+            for filter_id, filter_args in self.filters.items()
+        )
+
+    def iter_fql(self, encoded: bool = False) -> Iterator[str]:
+        """Iterate over fragments of the FQL string, without building the full string.
+
+        If encoded is True, the fragments are percent-encoded. Filters whose encoded form has
+        already been cached by get_fql() are yielded from the cache.
+        """
+        first = True
+        for filter_id, filter_args in self.filters.items():
+            if not first:
+                yield "%2B" if encoded else "+"
+            first = False
+
+            if not encoded:
+                yield from iter_filter_fragments(filter_args)
+                continue
+
+            cached_fragment = self._encoded_fragments.get(filter_id)
+            if cached_fragment is not None and cached_fragment[0] is filter_args:
+                yield cached_fragment[1]
+            else:
+                for fragment in iter_filter_fragments(filter_args):
+                    yield quote(fragment, safe="")
+
+    def write_fql(self, writer: IO, encoding: Optional[str] = None) -> int:
+        """Stream the FQL string into a text or binary writer, and return the length written.
+
+        The writer may be anything with a write() method, such as a file, io.StringIO or a socket
+        file. Binary writers (i.e., io.RawIOBase and io.BufferedIOBase objects) are written UTF-8
+        encoded bytes (looping over any short writes made by raw writers), and all other writers
+        are written strings. If encoding is "url", each
+        fragment is percent-encoded as it is written, ready for use as a query parameter.
+        """
+        if encoding not in (None, "url"):
+            raise ValueError(f"The encoding {encoding} is not supported. Valid choices are: url.")
+
+        raw = isinstance(writer, io.RawIOBase)
+        binary = raw or isinstance(writer, io.BufferedIOBase)
+        written = 0
+        for fragment in self.iter_fql(encoded=encoding == "url"):
+            if raw:
+                # Raw writers may perform short writes, so write until the fragment is exhausted
+                remaining = memoryview(fragment.encode("utf-8"))
+                while remaining:
+                    count = writer.write(remaining)
+                    if count is None:
+                        raise BlockingIOError(
+                            "The writer is non-blocking and is not ready to be written to."
+                        )
+                    remaining = remaining[count:]
+                    written += count
+            elif binary:
+                encoded_fragment = fragment.encode("utf-8")
+                writer.write(encoded_fragment)
+                written += len(encoded_fragment)
             else:
-                fql_value = str(filter_args.value)
+                writer.write(fragment)
+                written += len(fragment)
+
+        return written
 
-            fql_string = f"{filter_args.fql}: {operator_symbol}{fql_value}"
-            fql_strings.append(fql_string)
+    def to_sql(
+        self,
+        columns: Optional[Dict[str, str]] = None,
+        *,
+        connection: Optional["sqlite3.Connection"] = None,
+        max_inline_values: Optional[int] = None,
+    ) -> "SQLClause":
+        """Compile the filters into a parameterised SQLite WHERE clause and its bind parameters.
+
+        FQL property names are mapped to column names via columns, if given. Lists longer than
+        max_inline_values (by default, SQL_MAX_INLINE_VALUES) are stored in temporary tables on
+        connection, which are dropped when the returned SQLClause is closed or used as a context
+        manager. See caracara_filters.sql for details of the translation.
+        """
+        # Imported here, so that this module can be imported on Python builds without sqlite3
+        # pylint: disable-next=import-outside-toplevel
+        from caracara_filters.sql import SQL_MAX_INLINE_VALUES, filters_to_sql
+
+        if max_inline_values is None:
+            max_inline_values = SQL_MAX_INLINE_VALUES
+
+        return filters_to_sql(
+            self.filters.values(),
+            columns,
+            connection=connection,
+            max_inline_values=max_inline_values,
+        )
 
-        return "+".join(fql_strings)
+    def freeze(self) -> FrozenFQL:
+        """Return an immutable, hashable snapshot of this object's dialect and filters."""
+        return FrozenFQL.from_filters(self.dialect, tuple(self.filters.values()))
 
     def __str__(self) -> str:
         """Return an FQL string representation of the FQLGenerator object's contents."""
@@ -0,0 +1,302 @@
+"""Caracara Filters: Local Record Index.
+
+This module answers FQL generators against a locally mirrored inventory of records (e.g., hosts
+cached from the Falcon API) without scanning every record. A RecordIndex is built from records
+keyed by the FQL property names of a dialect, and maintains two kinds of index:
+
+- Hash indexes for equality fields (by default, the platform_name, tags, groups and site_name
+  properties of the dialect), mapping each normalised value to the set of records that hold it.
+  List-valued properties such as tags are indexed under each of their items.
+- Sorted arrays for range fields (by default, every timestamp property of the dialect), which
+  are bisected to find the records that fall before or after a timestamp.
+
+When a generator is queried, each filter that an index can answer produces a candidate set, and
+the candidate sets are intersected smallest-first. The remaining filters (e.g., wildcards, or
+properties that are not indexed) are then evaluated against the surviving candidates only, via
+caracara_filters.evaluate, so the results are always identical to those of a full scan.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from caracara_filters.common.networks import parse_ip_network
+from caracara_filters.dialects import get_filter_index
+from caracara_filters.evaluate import (
+    Record,
+    _normalise,
+    evaluate,
+    evaluate_filter,
+    get_record_value,
+)
+from caracara_filters.fql import FilterArgs, FQLGenerator
+from caracara_filters.transforms import relative_timestamp_transform
+
+DEFAULT_EQUALITY_FIELDS = ("platform_name", "tags", "groups", "site_name")
+
+# Once the surviving candidates are this many times smaller than the next candidate set, it is
+# cheaper to check the remaining filters against each survivor than to build the set
+INTERSECTION_RATIO = 8
+
+_COMPARISON_OPERATORS = ("GREATER", "GTE", "LESS", "LTE")
+
+_EMPTY: FrozenSet[int] = frozenset()
+
+# The estimated number of candidates of a filter, a function that builds the candidate set, and
+# (for hash indexes) a function that narrows down a set of positions without building it
+_Plan = Tuple[int, Callable[[], Set[int]], Optional[Callable[[Set[int]], Set[int]]]]
+
+
+def _default_fields(dialect: str) -> Tuple[List[str], List[str]]:
+    """Return the default equality and range fields of a dialect."""
+    available_filters, _ = get_filter_index(dialect)
+    fqls = {filter_def["fql"] for filter_def in available_filters.values()}
+    equality_fields = [fql for fql in DEFAULT_EQUALITY_FIELDS if fql in fqls]
+    range_fields = sorted(
+        {
+            filter_def["fql"]
+            for filter_def in available_filters.values()
+            if filter_def["transform"] is relative_timestamp_transform
+        }
+    )
+    return equality_fields, range_fields
+
+
+def _filter_values(filter_args: FilterArgs) -> Sequence[Any]:
+    """Return the values of a stored filter as a sequence."""
+    if isinstance(filter_args.value, str) or not hasattr(filter_args.value, "__iter__"):
+        return [filter_args.value]
+
+    return filter_args.value
+
+
+def _record_values(record: Record, fql: str) -> List[Any]:
+    """Return the values of a record property as a list, i.e., the items of a list property."""
+    record_value = get_record_value(record, fql)
+    return record_value if isinstance(record_value, list) else [record_value]
+
+
+def _is_exact(value: Any) -> bool:
+    """Check whether a filter value only ever matches equal values, i.e., is not a pattern."""
+    if not isinstance(value, str):
+        return True
+
+    return "*" not in value and ("/" not in value or parse_ip_network(value) is None)
+
+
+class RecordIndex:
+    """An inverted index over locally cached records, keyed by FQL property names.
+
+    Records are referred to internally by their position within the records list, and query
+    results are always returned in the order in which the records were added.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[Record] = (),
+        dialect: str = "hosts",
+        equality_fields: Optional[Iterable[str]] = None,
+        range_fields: Optional[Iterable[str]] = None,
+    ):
+        """Build an index over records, using the default fields of a dialect if none are given."""
+        default_equality_fields, default_range_fields = _default_fields(dialect)
+        self.dialect = dialect
+        self.records: List[Record] = []
+        self._equality: Dict[str, Dict[Any, Set[int]]] = {
+            fql: {}
+            for fql in (default_equality_fields if equality_fields is None else equality_fields)
+        }
+        # Each range field maps to its sorted keys, and the position of the record of each key
+        self._ranges: Dict[str, Tuple[List[str], List[int]]] = {
+            fql: ([], [])
+            for fql in (default_range_fields if range_fields is None else range_fields)
+        }
+        self.add_records(records)
+
+    def __len__(self) -> int:
+        """Return the number of records within the index."""
+        return len(self.records)
+
+    def _index_record(self, position: int, record: Record) -> Dict[str, List[str]]:
+        """Add a record to the hash indexes, and return its keys for each range field."""
+        for fql, buckets in self._equality.items():
+            for value in _record_values(record, fql):
+                try:
+                    buckets.setdefault(_normalise(value), set()).add(position)
+                except TypeError:
+                    # Unhashable values (e.g., nested dictionaries) are never matched by a filter
+                    continue
+
+        # Only strings can be ordered against the (string) timestamps of a filter
+        return {
+            fql: [
+                key for key in map(_normalise, _record_values(record, fql)) if isinstance(key, str)
+            ]
+            for fql in self._ranges
+        }
+
+    def add_record(self, record: Record) -> None:
+        """Add a single record to the index."""
+        position = len(self.records)
+        self.records.append(record)
+        for fql, keys in self._index_record(position, record).items():
+            sorted_keys, positions = self._ranges[fql]
+            for key in keys:
+                insertion_point = bisect_right(sorted_keys, key)
+                sorted_keys.insert(insertion_point, key)
+                positions.insert(insertion_point, position)
+
+    def add_records(self, records: Iterable[Record]) -> None:
+        """Add many records to the index, sorting each range field once rather than per record."""
+        new_entries: Dict[str, List[Tuple[str, int]]] = {fql: [] for fql in self._ranges}
+        for record in records:
+            position = len(self.records)
+            self.records.append(record)
+            for fql, keys in self._index_record(position, record).items():
+                new_entries[fql].extend((key, position) for key in keys)
+
+        for fql, entries in new_entries.items():
+            if not entries:
+                continue
+
+            sorted_keys, positions = self._ranges[fql]
+            entries.extend(zip(sorted_keys, positions))
+            entries.sort()
+            self._ranges[fql] = ([key for key, _ in entries], [position for _, position in entries])
+
+    def _equality_plan(self, filter_args: FilterArgs) -> Optional[_Plan]:
+        """Plan the use of a hash index for a filter, or return None if it cannot be used."""
+        buckets = self._equality.get(filter_args.fql)
+        if buckets is None or filter_args.operator not in ("EQUAL", "NOT"):
+            return None
+
+        values = _filter_values(filter_args)
+        if not all(_is_exact(value) for value in values):
+            return None
+
+        try:
+            matches = [buckets.get(_normalise(value), _EMPTY) for value in values]
+        except TypeError:
+            return None
+
+        size = sum(len(x) for x in matches)
+        if filter_args.operator == "NOT":
+            return (
+                len(self.records) - size,
+                lambda: set(range(len(self.records))).difference(*matches),
+                lambda positions: {x for x in positions if not any(x in y for y in matches)},
+            )
+
+        return (
+            size,
+            lambda: set().union(*matches),
+            lambda positions: {x for x in positions if any(x in y for y in matches)},
+        )
+
+    def _range_plan(self, filter_args: FilterArgs) -> Optional[_Plan]:
+        """Plan the use of a sorted array for a filter, or return None if it cannot be used."""
+        sorted_range = self._ranges.get(filter_args.fql)
+        if sorted_range is None or filter_args.operator not in ("EQUAL", *_COMPARISON_OPERATORS):
+            return None
+
+        keys = [_normalise(value) for value in _filter_values(filter_args)]
+        if not all(isinstance(key, str) for key in keys):
+            return None
+
+        # Wildcards only apply to equality, as comparisons are purely lexicographic
+        if filter_args.operator == "EQUAL" and not all(map(_is_exact, keys)):
+            return None
+
+        sorted_keys, positions = sorted_range
+        slices = []
+        for key in keys:
+            if filter_args.operator == "GREATER":
+                slices.append((bisect_right(sorted_keys, key), len(sorted_keys)))
+            elif filter_args.operator == "GTE":
+                slices.append((bisect_left(sorted_keys, key), len(sorted_keys)))
+            elif filter_args.operator == "LESS":
+                slices.append((0, bisect_left(sorted_keys, key)))
+            elif filter_args.operator == "LTE":
+                slices.append((0, bisect_right(sorted_keys, key)))
+            else:
+                slices.append((bisect_left(sorted_keys, key), bisect_right(sorted_keys, key)))
+
+        return (
+            sum(end - start for start, end in slices),
+            lambda: {position for start, end in slices for position in positions[start:end]},
+            None,
+        )
+
+    def _plan(self, filter_args: FilterArgs) -> Optional[_Plan]:
+        """Plan the use of an index for a filter, or return None if it is not indexed."""
+        plan = self._equality_plan(filter_args)
+        if plan is None:
+            plan = self._range_plan(filter_args)
+
+        return plan
+
+    def candidates(self, filter_args: FilterArgs) -> Optional[Set[int]]:
+        """Return the positions of the records matching a filter, or None if it is not indexed."""
+        plan = self._plan(filter_args)
+        if plan is None:
+            return None
+
+        return plan[1]()
+
+    def query(self, operand: Any) -> List[Record]:
+        """Return the records matching a filter, FQL generator or expression.
+
+        Filters and FQL generators are answered via the indexes where possible: the candidate
+        sets are intersected smallest-first, probing the hash indexes for each surviving
+        candidate, and once the survivors are far fewer than the next sorted array range, the
+        remaining filters are checked against each survivor directly instead. Any other operand
+        (such as an AndGroup or OrGroup) is evaluated against every record.
+        """
+        if isinstance(operand, FilterArgs):
+            filters = [operand]
+        elif isinstance(operand, FQLGenerator):
+            filters = list(operand.filters.values())
+        else:
+            return [record for record in self.records if evaluate(operand, record)]
+
+        plans: List[Tuple[int, int, _Plan]] = []
+        residual_filters: List[FilterArgs] = []
+        for filter_number, filter_args in enumerate(filters):
+            plan = self._plan(filter_args)
+            if plan is None:
+                residual_filters.append(filter_args)
+            else:
+                plans.append((plan[0], filter_number, plan))
+
+        if not plans:
+            return [
+                record
+                for record in self.records
+                if all(evaluate_filter(x, record) for x in residual_filters)
+            ]
+
+        plans.sort(key=lambda x: x[:2])
+        positions = plans[0][2][1]()
+        for size, filter_number, (_, materialise, restrict) in plans[1:]:
+            if restrict is not None:
+                positions = restrict(positions)
+            elif size > len(positions) * INTERSECTION_RATIO:
+                residual_filters.append(filters[filter_number])
+            elif positions:
+                positions &= materialise()
+
+        return [
+            self.records[position]
+            for position in sorted(positions)
+            if all(evaluate_filter(x, self.records[position]) for x in residual_filters)
+        ]
@@ -0,0 +1,180 @@
+"""Caracara Filters: Query Packs.
+
+A query pack is a JSON or TOML file containing many named queries, each of which is a dialect and
+a list of filters. For example, in TOML:
+
+    [queries.online_windows]
+    dialect = "hosts"
+
+    [[queries.online_windows.filters]]
+    name = "os"
+    value = "Windows"
+
+    [[queries.online_windows.filters]]
+    name = "last_seen"
+    value = "-30m"
+    operator = "GTE"
+
+The equivalent JSON is a {"queries": {"online_windows": {"dialect": ..., "filters": [...]}}}
+object. Each filter accepts the same name, value and (optional) operator as
+FQLGenerator.create_new_filter().
+
+Loading a pack validates and transforms every filter once, and can persist the resultant compiled
+form to a cache file alongside a hash of the pack's contents. Subsequent loads of an unchanged
+pack read only the cache file, and build generators from it without re-running any validation.
+The cache also records a fingerprint of each dialect that the pack uses, so registering or loading
+a changed dialect at runtime causes the pack to be compiled again.
+Filters that are not pure (such as relative timestamps) are stored in their original form and are
+re-created each time a generator is built, so that they are always relative to the current time.
+"""
+
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+from caracara_filters.common import AIDList
+from caracara_filters.common.files import load_compiled_data_file
+from caracara_filters.dialects import DIALECTS, get_dialect_fingerprint
+from caracara_filters.fql import FilterArgs, FQLGenerator
+
+# Increment this whenever the structure of the cache file changes, or whenever a change to the
+# dialects means that previously compiled filters may no longer be valid.
+QUERY_PACK_CACHE_VERSION = 5
+
+
+class QueryPack:
+    """A collection of named, pre-validated queries that can each produce an FQLGenerator."""
+
+    def __init__(self, compiled_queries: Dict[str, Dict[str, Any]]):
+        """Create a query pack from its compiled representation."""
+        self.compiled_queries: Dict[str, Dict[str, Any]] = compiled_queries
+
+    def __contains__(self, query_name: str) -> bool:
+        """Return True if the pack contains a query with the given name."""
+        return query_name in self.compiled_queries
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the names of the queries in this pack."""
+        return iter(self.compiled_queries)
+
+    def __len__(self) -> int:
+        """Return the number of queries in this pack."""
+        return len(self.compiled_queries)
+
+    def __getitem__(self, query_name: str) -> FQLGenerator:
+        """Return a new FQLGenerator for the named query."""
+        return self.get_generator(query_name)
+
+    def get_generator(self, query_name: str) -> FQLGenerator:
+        """Build a new FQLGenerator containing the named query's filters."""
+        if query_name not in self.compiled_queries:
+            raise KeyError(f"The query {query_name} does not exist in this query pack.")
+
+        compiled_query = self.compiled_queries[query_name]
+        fql_generator = FQLGenerator(dialect=compiled_query["dialect"])
+        for compiled_filter in compiled_query["filters"]:
+            if compiled_filter["compiled"]:
+                value = compiled_filter["value"]
+                if compiled_filter.get("packed"):
+                    value = AIDList.from_values(value)
+
+                fql_generator.add_filter(
+                    FilterArgs(
+                        filter_def=sys.intern(compiled_filter["name"]),
+                        fql=sys.intern(compiled_filter["fql"]),
+                        value=value,
+                        operator=sys.intern(compiled_filter["operator"]),
+                    )
+                )
+            else:
+                fql_generator.create_new_filter(
+                    filter_name=compiled_filter["name"],
+                    initial_value=compiled_filter["value"],
+                    initial_operator=compiled_filter["operator"],
+                )
+
+        return fql_generator
+
+
+def compile_query(query_name: str, query: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate and transform a single query definition into its compiled form."""
+    if not isinstance(query, dict) or "dialect" not in query:
+        raise ValueError(f"The query {query_name} must be a table containing a dialect.")
+
+    fql_generator = FQLGenerator(dialect=query["dialect"])
+    compiled_filters: List[Dict[str, Any]] = []
+    for filter_spec in query.get("filters", []):
+        if not isinstance(filter_spec, dict) or "name" not in filter_spec:
+            raise ValueError(f"Every filter in the query {query_name} must have a name.")
+
+        filter_id = fql_generator.create_new_filter(
+            filter_name=filter_spec["name"],
+            initial_value=filter_spec.get("value"),
+            initial_operator=filter_spec.get("operator"),
+        )
+        filter_args = fql_generator.filters[filter_id]
+        pure: bool = fql_generator.available_filters[filter_args.filter_def]["pure"]
+        compiled_filter = {
+            "compiled": pure,
+            "name": filter_args.filter_def,
+            "fql": filter_args.fql,
+            "value": filter_args.value if pure else filter_spec.get("value"),
+            "operator": filter_args.operator,
+        }
+        if pure and isinstance(filter_args.value, AIDList):
+            # Packed AIDs are stored as strings, and packed again when a generator is built
+            compiled_filter["value"] = filter_args.value.to_list()
+            compiled_filter["packed"] = True
+
+        compiled_filters.append(compiled_filter)
+
+    return {"dialect": query["dialect"], "filters": compiled_filters}
+
+
+def compile_query_pack(pack_contents: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Validate and transform every query within a parsed query pack."""
+    queries = pack_contents.get("queries")
+    if not isinstance(queries, dict):
+        raise ValueError("A query pack must contain a table of queries.")
+
+    return {query_name: compile_query(query_name, query) for query_name, query in queries.items()}
+
+
+def fingerprint_query_pack(compiled_queries: Any) -> Dict[str, Optional[str]]:
+    """Return the fingerprint of every dialect used by a compiled query pack.
+
+    Dialects that are no longer registered have no fingerprint, so that a cached pack that uses
+    them is compiled (and rejected) again.
+    """
+    if not isinstance(compiled_queries, dict):
+        return {}
+
+    dialects = {
+        query.get("dialect") for query in compiled_queries.values() if isinstance(query, dict)
+    }
+    return {
+        dialect: get_dialect_fingerprint(dialect) if dialect in DIALECTS else None
+        for dialect in sorted(x for x in dialects if isinstance(x, str))
+    }
+
+
+def load_query_pack(
+    pack_path: str,
+    cache_path: Optional[str] = None,
+    use_cache: bool = True,
+) -> QueryPack:
+    """Load a JSON or TOML query pack from disk, using or creating a compiled cache file.
+
+    The cache file defaults to the pack's path with a .cache.json suffix. If the pack's size and
+    modification time are unchanged since the cache was written, only the cache file is read.
+    Otherwise, the pack is read and hashed, and is only recompiled if its contents have changed.
+    Either way, the pack is also recompiled if any dialect that it uses has changed.
+    """
+    compiled_queries = load_compiled_data_file(
+        file_path=pack_path,
+        compile_func=compile_query_pack,
+        cache_version=QUERY_PACK_CACHE_VERSION,
+        cache_path=cache_path,
+        use_cache=use_cache,
+        fingerprint_func=fingerprint_query_pack,
+    )
+    return QueryPack(compiled_queries)
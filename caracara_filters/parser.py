@@ -0,0 +1,220 @@
+"""Caracara Filters: FQL Parser.
+
+This module parses FQL strings, such as those generated by an FQLGenerator or received in the
+filter parameter of an API request, back into filters that can be evaluated locally via
+caracara_filters.evaluate. The following subset of FQL is supported:
+
+- Filters of the form property: value, with an optional operator before the value (!, >, >=, <
+  or <=, as listed in FILTER_OPERATORS).
+- Single or double quoted strings (where a backslash escapes the following character), the bare
+  keywords true, false and null, numbers, and bare words such as unquoted timestamps.
+- Lists of values within square brackets, e.g., platform_name: ['Linux','Mac'].
+- + (AND) and , (OR) between filters, where + binds more tightly than ,, and parentheses.
+
+A conjunction of filters is returned as an FQLGenerator of the given dialect, so that parsing the
+output of get_fql() returns a generator whose frozen snapshot is equal to the original's. Any other
+expression is returned as a tree of AndGroup and OrGroup objects. Parsed values are trusted, in
+that they are not validated or transformed by the dialect's filters, as they are already in the
+form that FQL expects.
+"""
+
+import re
+import sys
+from typing import Any, Dict, List
+
+from caracara_filters.common import FILTER_OPERATORS
+from caracara_filters.dialects import get_filter_index
+from caracara_filters.expressions import AndGroup, Operand, OrGroup
+from caracara_filters.fql import FilterArgs, FQLGenerator
+
+# Longest symbols first, so that >= is not read as > followed by a value beginning with =
+_OPERATOR_SYMBOLS = sorted(
+    ((symbol, name) for name, symbol in FILTER_OPERATORS.items() if symbol),
+    key=lambda x: -len(x[0]),
+)
+
+_PROPERTY_RE = re.compile(r"\s*([A-Za-z0-9_.]+)\s*:\s*")
+_BARE_VALUE_RE = re.compile(r"[^\s+,()\[\]'\"]+")
+_INTEGER_RE = re.compile(r"-?\d+")
+_FLOAT_RE = re.compile(r"-?\d+\.\d+")
+_KEYWORDS = {"true": True, "false": False, "null": None}
+
+
+class _FQLParser:  # pylint: disable=too-few-public-methods
+    """A recursive descent parser over a single FQL string."""
+
+    def __init__(self, fql: str, dialect: str):
+        """Prepare to parse an FQL string, resolving property names via a dialect."""
+        self.fql = fql
+        self.position = 0
+        self.dialect = dialect
+
+        # Map each FQL property name to the canonical name of the filter that targets it
+        _, filter_index = get_filter_index(dialect)
+        self.filter_names: Dict[str, str] = {}
+        for canonical_name, filter_def in sorted(filter_index.values(), key=lambda x: x[0]):
+            self.filter_names.setdefault(filter_def["fql"], canonical_name)
+
+    def _error(self, message: str) -> ValueError:
+        """Return an exception describing a syntax error at the current position."""
+        return ValueError(f"Invalid FQL at position {self.position}: {message}. FQL: {self.fql}")
+
+    def _skip_whitespace(self) -> None:
+        """Move past any whitespace."""
+        while self.position < len(self.fql) and self.fql[self.position].isspace():
+            self.position += 1
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character, or an empty string at the end."""
+        self._skip_whitespace()
+        return self.fql[self.position : self.position + 1]
+
+    def _expect(self, character: str) -> None:
+        """Consume a character, or raise an exception if it is not next."""
+        if self._peek() != character:
+            raise self._error(f"expected {character}")
+        self.position += 1
+
+    def parse(self) -> Operand:
+        """Parse the whole FQL string."""
+        if not self.fql.strip():
+            return FQLGenerator(dialect=self.dialect)
+
+        result = self._parse_or()
+        if self._peek():
+            raise self._error(f"unexpected {self._peek()}")
+
+        return result
+
+    def _parse_or(self) -> Operand:
+        """Parse one or more AND groups separated by commas."""
+        operands = [self._parse_and()]
+        while self._peek() == ",":
+            self.position += 1
+            operands.append(self._parse_and())
+
+        if len(operands) == 1:
+            return operands[0]
+
+        return OrGroup(*operands)
+
+    def _parse_and(self) -> Operand:
+        """Parse one or more terms separated by plus signs."""
+        operands = [self._parse_term()]
+        while self._peek() == "+":
+            self.position += 1
+            operands.append(self._parse_term())
+
+        if len(operands) == 1 and not isinstance(operands[0], FilterArgs):
+            return operands[0]
+
+        if all(isinstance(x, FilterArgs) for x in operands):
+            fql_generator = FQLGenerator(dialect=self.dialect)
+            for filter_args in operands:
+                fql_generator.add_filter(filter_args)
+            return fql_generator
+
+        return AndGroup(*operands)
+
+    def _parse_term(self) -> Operand:
+        """Parse a parenthesised expression or a single filter."""
+        if self._peek() == "(":
+            self.position += 1
+            operand = self._parse_or()
+            self._expect(")")
+            return operand
+
+        return self._parse_filter()
+
+    def _parse_filter(self) -> FilterArgs:
+        """Parse a single filter, i.e., a property name, an optional operator and a value."""
+        match = _PROPERTY_RE.match(self.fql, self.position)
+        if match is None:
+            raise self._error("expected a property name followed by a colon")
+
+        self.position = match.end()
+        fql = sys.intern(match.group(1))
+        operator = "EQUAL"
+        for symbol, name in _OPERATOR_SYMBOLS:
+            if self.fql.startswith(symbol, self.position):
+                operator = name
+                self.position += len(symbol)
+                break
+
+        if self._peek() == "~":
+            raise self._error("the text match operator (~) is not supported")
+
+        if self._peek() == "[":
+            value: Any = self._parse_list()
+        else:
+            value = self._parse_scalar()
+
+        return FilterArgs(
+            filter_def=self.filter_names.get(fql, fql),
+            fql=fql,
+            value=value,
+            operator=operator,
+        )
+
+    def _parse_list(self) -> List[Any]:
+        """Parse a list of values within square brackets."""
+        self._expect("[")
+        values: List[Any] = []
+        if self._peek() == "]":
+            self.position += 1
+            return values
+
+        values.append(self._parse_scalar())
+        while self._peek() == ",":
+            self.position += 1
+            values.append(self._parse_scalar())
+
+        self._expect("]")
+        return values
+
+    def _parse_scalar(self) -> Any:
+        """Parse a single quoted string, keyword, number or bare word."""
+        quote = self._peek()
+        if quote in ("'", '"'):
+            return self._parse_quoted(quote)
+
+        match = _BARE_VALUE_RE.match(self.fql, self.position)
+        if match is None:
+            raise self._error("expected a value")
+
+        self.position = match.end()
+        word = match.group(0)
+        if word.lower() in _KEYWORDS:
+            return _KEYWORDS[word.lower()]
+        if _INTEGER_RE.fullmatch(word):
+            return int(word)
+        if _FLOAT_RE.fullmatch(word):
+            return float(word)
+
+        return word
+
+    def _parse_quoted(self, quote: str) -> str:
+        """Parse a quoted string, in which a backslash escapes the following character."""
+        self.position += 1
+        characters: List[str] = []
+        while self.position < len(self.fql):
+            character = self.fql[self.position]
+            self.position += 1
+            if character == quote:
+                return "".join(characters)
+            if character == "\\" and self.position < len(self.fql):
+                character = self.fql[self.position]
+                self.position += 1
+            characters.append(character)
+
+        raise self._error(f"unterminated string; expected {quote}")
+
+
+def parse_fql(fql: str, dialect: str = "base") -> Operand:
+    """Parse an FQL string into an FQLGenerator, or an expression of AndGroup and OrGroup objects.
+
+    Property names are resolved to the names of the dialect's filters where possible, although
+    properties that the dialect does not define are accepted too. A ValueError is raised if the
+    string is not valid FQL.
+    """
+    return _FQLParser(fql, dialect).parse()
@@ -0,0 +1,96 @@
+"""Caracara Filters: Generator Pool.
+
+Request handlers that build a new FQLGenerator for every call can instead borrow one from a pool,
+which keeps a small number of reset generators for each dialect:
+
+    with GENERATOR_POOL.generator("hosts") as fql_generator:
+        fql_generator.create_new_filter("os", "Windows")
+        fql = fql_generator.get_fql()
+
+Generators are reset (and their settings restored to the defaults) when they are returned to the
+pool, so a borrowed generator must not be used once it has been released. The pool tracks which
+generators are borrowed, and rejects the release of a generator that it did not lend out, or that
+has already been released, as either would let two callers share one generator. The pool is safe
+to share between threads, but each borrowed generator should only be used by one thread at a time.
+"""
+
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, List
+from weakref import WeakSet
+
+from caracara_filters.fql import FQLGenerator
+
+
+class GeneratorPool:
+    """A thread-safe pool of reusable FQL generators, kept per dialect."""
+
+    def __init__(self, max_size: int = 16):
+        """Create a new pool, which keeps up to max_size idle generators per dialect."""
+        self.max_size: int = max_size
+        self._lock = Lock()
+        self._idle: Dict[str, List[FQLGenerator]] = {}
+        # Weakly referenced, so that a generator that is never released can still be freed
+        self._borrowed: "WeakSet[FQLGenerator]" = WeakSet()
+
+    def acquire(self, dialect: str = "base") -> FQLGenerator:
+        """Borrow an empty generator with default settings from the pool, or create a new one."""
+        with self._lock:
+            idle_generators = self._idle.get(dialect)
+            if idle_generators:
+                fql_generator = idle_generators.pop()
+                self._borrowed.add(fql_generator)
+                return fql_generator
+
+        fql_generator = FQLGenerator(dialect=dialect)
+        with self._lock:
+            self._borrowed.add(fql_generator)
+
+        return fql_generator
+
+    def release(self, fql_generator: FQLGenerator) -> None:
+        """Reset a generator and return it to the pool, unless the pool is already full.
+
+        A ValueError is raised if the generator was not borrowed from this pool, or has already
+        been released.
+        """
+        with self._lock:
+            if fql_generator not in self._borrowed:
+                raise ValueError(
+                    "This generator was not borrowed from this pool, or has already been released."
+                )
+            self._borrowed.discard(fql_generator)
+
+        fql_generator.reset()
+        fql_generator.dedupe = False
+        fql_generator.trusted = False
+        fql_generator.max_length = None
+        fql_generator.max_values = None
+        fql_generator.on_budget_exceeded = None
+
+        with self._lock:
+            idle_generators = self._idle.setdefault(fql_generator.dialect, [])
+            if len(idle_generators) < self.max_size:
+                idle_generators.append(fql_generator)
+
+    @contextmanager
+    def generator(self, dialect: str = "base") -> Iterator[FQLGenerator]:
+        """Borrow a generator for the duration of a with block."""
+        fql_generator = self.acquire(dialect)
+        try:
+            yield fql_generator
+        finally:
+            self.release(fql_generator)
+
+    def clear(self) -> None:
+        """Discard every idle generator. Borrowed generators can still be released afterwards."""
+        with self._lock:
+            self._idle.clear()
+
+    def idle_count(self, dialect: str) -> int:
+        """Return the number of idle generators held for a dialect."""
+        with self._lock:
+            return len(self._idle.get(dialect, []))
+
+
+GENERATOR_POOL = GeneratorPool()
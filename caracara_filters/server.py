@@ -0,0 +1,432 @@
+"""Caracara Filters: Local Stand-in Server.
+
+This module provides a small HTTP server (built on the standard library's http.server) that stands
+in for the parts of the Falcon API used by the hosts, IOCs, users and sensor_download dialects,
+so that pipelines built on Caracara can be load-tested and benchmarked end to end offline.
+
+The server holds a list of fixture records per dialect, keyed by the dialect's FQL property names.
+The filter parameter of each request is parsed with caracara_filters.parser, and answered via a
+caracara_filters.index.RecordIndex, which evaluates filters with caracara_filters.evaluate. The
+following endpoints are served:
+
+- GET queries endpoints (e.g., /devices/queries/devices/v1) return the IDs of matching records.
+- GET combined endpoints (e.g., /devices/combined/devices/v1) return the matching records.
+- GET or POST entities endpoints (e.g., /devices/entities/devices/v2) return the records with the
+  IDs given in the ids query parameter, or in the ids list of a JSON request body.
+- POST /oauth2/token returns a dummy bearer token, so that API clients can authenticate.
+
+Queries and combined endpoints are paginated via the offset and limit query parameters, and
+report the total number of matches in meta.pagination, as the Falcon API does. Records are
+returned in fixture order; the sort parameter is ignored. The query string is form decoded, as
+it is by the Falcon API, so FQL's + (AND) operator must be sent percent-encoded as %2B, which
+urlencode() and FalconPy do, and get_fql(encoded=True) returns.
+
+To serve synthetic fixtures on port 8080, run:
+
+    python -m caracara_filters.server --port 8080 --count 10000
+
+Fixtures can also be loaded from a JSON or TOML file (via --fixtures) whose top level maps each
+dialect name to a list of records.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from uuid import UUID, uuid4
+
+from caracara_filters.common.files import get_data_file_format, parse_data_file
+from caracara_filters.evaluate import Record
+from caracara_filters.expressions import Operand
+from caracara_filters.index import RecordIndex
+from caracara_filters.parser import parse_fql
+
+DEFAULT_LIMIT = 100
+
+MAX_LIMIT = 5000
+
+QUERY_CACHE_SIZE = 256
+
+# The property holding the ID of each record, which is returned by queries endpoints
+ID_PROPERTIES = {
+    "hosts": "device_id",
+    "iocs": "id",
+    "sensor_download": "sha256",
+    "users": "uuid",
+}
+
+ENDPOINTS: Dict[str, Tuple[str, str]] = {
+    "/devices/queries/devices/v1": ("hosts", "queries"),
+    "/devices/combined/devices/v1": ("hosts", "combined"),
+    "/devices/entities/devices/v2": ("hosts", "entities"),
+    "/iocs/queries/indicators/v1": ("iocs", "queries"),
+    "/iocs/combined/indicator/v1": ("iocs", "combined"),
+    "/iocs/entities/indicators/v1": ("iocs", "entities"),
+    "/sensors/queries/installers/v2": ("sensor_download", "queries"),
+    "/sensors/combined/installers/v2": ("sensor_download", "combined"),
+    "/sensors/entities/installers/v2": ("sensor_download", "entities"),
+    "/user-management/queries/users/v1": ("users", "queries"),
+    "/user-management/entities/users/GET/v1": ("users", "entities"),
+}
+
+TOKEN_ENDPOINT = "/oauth2/token"
+
+
+_HOST_OS_VERSIONS = {"Linux": "Ubuntu 22.04", "Mac": "Sonoma (14)", "Windows": "Windows 11"}
+
+
+def _timestamp(rng: random.Random) -> str:
+    """Return a random ISO 8601 timestamp within 2023."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(1672531200 + rng.randrange(31536000)))
+
+
+def _make_host(rng: random.Random, number: int) -> Record:
+    """Return a synthetic host record."""
+    platform_name = rng.choice(["Linux", "Mac", "Windows"])
+    first_seen = _timestamp(rng)
+    return {
+        "device_id": f"{rng.getrandbits(128):032x}",
+        "hostname": f"HOST-{number:06d}",
+        "platform_name": platform_name,
+        "os_version": _HOST_OS_VERSIONS[platform_name],
+        "product_type_desc": rng.choice(["Domain Controller", "Server", "Workstation"]),
+        "local_ip": f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+        "external_ip": f"203.0.113.{rng.randrange(1, 255)}",
+        "mac_address": "-".join(f"{rng.randrange(256):02x}" for _ in range(6)),
+        "machine_domain": rng.choice(["", "corp.example.com"]),
+        "site_name": rng.choice(["", "London", "New York", "Tokyo"]),
+        "status": rng.choice(["normal"] * 18 + ["containment_pending", "contained"]),
+        "reduced_functionality_mode": rng.choice(["no"] * 9 + ["yes"]),
+        "groups": [f"{rng.randrange(16):032x}" for _ in range(rng.randrange(3))],
+        "tags": [f"FalconGroupingTags/Tag{rng.randrange(20)}" for _ in range(rng.randrange(3))],
+        "first_seen": first_seen,
+        "last_seen": max(first_seen, _timestamp(rng)),
+    }
+
+
+def _make_ioc(rng: random.Random, number: int) -> Record:
+    """Return a synthetic IOC record."""
+    ioc_type = rng.choice(["domain", "ipv4", "md5", "sha256"])
+    value = {
+        "domain": f"host{number}.example.net",
+        "ipv4": f"198.51.100.{number % 256}",
+        "md5": f"{rng.getrandbits(128):032x}",
+        "sha256": f"{rng.getrandbits(256):064x}",
+    }[ioc_type]
+    created_on = _timestamp(rng)
+    return {
+        "id": f"{rng.getrandbits(256):064x}",
+        "type": ioc_type,
+        "value": value,
+        "action": rng.choice(["no_action", "allow", "prevent", "detect"]),
+        "mobile_action": "no_action",
+        "severity": rng.choice(["critical", "high", "medium", "low", "informational"]),
+        "platforms": rng.sample(["linux", "mac", "windows"], rng.randrange(1, 4)),
+        "tags": [f"Campaign{rng.randrange(10)}" for _ in range(rng.randrange(2))],
+        "applied_globally": rng.random() < 0.8,
+        "expired": rng.random() < 0.1,
+        "from_parent": False,
+        "created_by": "api-client-id",
+        "created_on": created_on,
+        "modified_by": "api-client-id",
+        "modified_on": max(created_on, _timestamp(rng)),
+        "expiration": _timestamp(rng),
+    }
+
+
+def _make_user(rng: random.Random, number: int) -> Record:
+    """Return a synthetic user record."""
+    first_name = rng.choice(["Alex", "Sam", "Jordan", "Taylor", "Casey", "Robin"])
+    last_name = rng.choice(["Smith", "Jones", "Lee", "Patel", "Garcia", "Kim"])
+    cid = f"{rng.randrange(4):032x}"
+    return {
+        "uuid": str(UUID(int=rng.getrandbits(128), version=4)),
+        "uid": f"{first_name}.{last_name}{number}@example.com".lower(),
+        "name": f"{first_name} {last_name}",
+        "first_name": first_name,
+        "last_name": last_name,
+        "cid": cid,
+        "assigned_cids": [cid],
+    }
+
+
+def _make_installer(rng: random.Random, number: int) -> Record:
+    """Return a synthetic sensor installer record."""
+    platform = rng.choice(["linux", "mac", "windows"])
+    version = f"7.{number // 20}.{number % 20}"
+    return {
+        "sha256": f"{rng.getrandbits(256):064x}",
+        "name": f"falcon-sensor-{version}-{platform}",
+        "version": version,
+        "platform": platform,
+        "os": {"linux": "Ubuntu", "mac": "macOS", "windows": "Windows"}[platform],
+        "os_version": {"linux": "22/24", "mac": "", "windows": ""}[platform],
+        "architectures": rng.sample(["x86_64", "arm64"], rng.randrange(1, 3)),
+        "is_lts": number % 10 == 0,
+        "release_date": _timestamp(rng),
+    }
+
+
+FIXTURE_FACTORIES = {
+    "hosts": _make_host,
+    "iocs": _make_ioc,
+    "sensor_download": _make_installer,
+    "users": _make_user,
+}
+
+
+def make_fixtures(count: int = 1000, seed: int = 0) -> Dict[str, List[Record]]:
+    """Return count reproducible, synthetic records for each dialect served by the server."""
+    rng = random.Random(seed)
+    return {
+        dialect: [factory(rng, number) for number in range(count)]
+        for dialect, factory in FIXTURE_FACTORIES.items()
+    }
+
+
+def load_fixtures(file_path: str) -> Dict[str, List[Record]]:
+    """Load fixture records from a JSON or TOML file that maps dialect names to lists of records."""
+    with open(file_path, "rb") as fixtures_file:
+        fixtures = parse_data_file(fixtures_file.read(), get_data_file_format(file_path))
+
+    unknown_dialects = set(fixtures) - set(FIXTURE_FACTORIES)
+    if unknown_dialects:
+        raise ValueError(
+            f"The fixtures file contains the unsupported dialects {sorted(unknown_dialects)}. "
+            f"Valid choices are: {sorted(FIXTURE_FACTORIES)}."
+        )
+
+    return fixtures
+
+
+@lru_cache(maxsize=1024)
+def _parse_filter(fql: str, dialect: str) -> Operand:
+    """Parse the FQL of a request, caching the result as load tests tend to repeat queries.
+
+    The parsed operand is shared between requests, so must not be modified.
+    """
+    return parse_fql(fql, dialect)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """An HTTP server that answers Falcon API requests from local fixture records."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        fixtures: Optional[Dict[str, List[Record]]] = None,
+        server_address: Tuple[str, int] = ("127.0.0.1", 0),
+        verbose: bool = False,
+    ):
+        """Index the fixtures (or synthetic fixtures, if none are given) and bind the server.
+
+        Port 0 binds to any free port; the chosen port is available via the url property.
+        """
+        super().__init__(server_address, StandInRequestHandler)
+        self.verbose = verbose
+        self.indexes: Dict[str, RecordIndex] = {}
+        self.records_by_id: Dict[str, Dict[Any, Record]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._cached_query = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._query)
+        for dialect, records in (make_fixtures() if fixtures is None else fixtures).items():
+            self.indexes[dialect] = RecordIndex(records, dialect=dialect)
+            self.records_by_id[dialect] = {
+                record.get(ID_PROPERTIES[dialect]): record for record in records
+            }
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server, e.g., for use as a Falcon API base URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _query(self, dialect: str, fql: str) -> List[Record]:
+        """Return the fixture records of a dialect that match an FQL string."""
+        return self.indexes[dialect].query(_parse_filter(fql, dialect))
+
+    def query(self, dialect: str, fql: str) -> List[Record]:
+        """Return the fixture records of a dialect that match an FQL string.
+
+        Results are cached, as the fixtures never change and each page of a query repeats it.
+        The returned list is shared between requests, so must not be modified.
+        """
+        return self._cached_query(dialect, fql)
+
+    def get_entities(self, dialect: str, ids: Iterable[Any]) -> List[Record]:
+        """Return the fixture records of a dialect with the given IDs, skipping unknown IDs."""
+        records_by_id = self.records_by_id[dialect]
+        return [records_by_id[x] for x in ids if x in records_by_id]
+
+    def start(self) -> None:
+        """Serve requests from a background thread until stop() is called."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving requests, and close the server's socket."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StandInServer":
+        """Start serving requests from a background thread."""
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop serving requests."""
+        self.stop()
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """Handle a single request to a StandInServer."""
+
+    server: StandInServer
+    server_version = "CaracaraFiltersStandIn"
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        """Only log requests if the server is verbose, so that logging does not skew benchmarks."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        """Send a JSON response."""
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_result(
+        self,
+        status: int,
+        resources: List[Any],
+        started: float,
+        pagination: Optional[Dict[str, int]] = None,
+        errors: Optional[List[str]] = None,
+    ) -> None:
+        """Send a response in the shape of a Falcon API response body."""
+        meta: Dict[str, Any] = {
+            "query_time": round(time.perf_counter() - started, 6),
+            "powered_by": "caracara-filters",
+            "trace_id": str(uuid4()),
+        }
+        if pagination is not None:
+            meta["pagination"] = pagination
+
+        self._send_json(
+            status,
+            {
+                "meta": meta,
+                "resources": resources,
+                "errors": [{"code": status, "message": x} for x in errors or []],
+            },
+        )
+
+    def _read_json_body(self) -> Dict[str, Any]:
+        """Read the JSON request body, if there is one."""
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+
+        body = json.loads(self.rfile.read(length))
+        if not isinstance(body, dict):
+            raise ValueError("The request body must be a JSON object.")
+
+        return body
+
+    def _handle(self, method: str) -> None:
+        """Route a request to its endpoint."""
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        params = parse_qs(url.query, keep_blank_values=True)
+
+        if url.path == TOKEN_ENDPOINT and method == "POST":
+            self._send_json(
+                201, {"access_token": uuid4().hex, "token_type": "bearer", "expires_in": 1799}
+            )
+            return
+
+        endpoint = ENDPOINTS.get(url.path)
+        if endpoint is None or endpoint[0] not in self.server.indexes:
+            self._send_result(404, [], started, errors=[f"{url.path} is not served."])
+            return
+
+        dialect, kind = endpoint
+        try:
+            if kind == "entities":
+                ids = params.get("ids", []) + (
+                    self._read_json_body().get("ids", []) if method == "POST" else []
+                )
+                self._send_result(200, self.server.get_entities(dialect, ids), started)
+                return
+
+            if method != "GET":
+                self._send_result(405, [], started, errors=[f"{url.path} only accepts GET."])
+                return
+
+            offset = int(params.get("offset", ["0"])[-1] or 0)
+            limit = int(params.get("limit", [str(DEFAULT_LIMIT)])[-1] or DEFAULT_LIMIT)
+            if offset < 0 or not 1 <= limit <= MAX_LIMIT:
+                raise ValueError(
+                    f"The offset must not be negative, and the limit must be 1 to {MAX_LIMIT}."
+                )
+
+            records = self.server.query(dialect, params.get("filter", [""])[-1])
+        except ValueError as exc:
+            self._send_result(400, [], started, errors=[str(exc)])
+            return
+
+        page = records[offset : offset + limit]
+        if kind == "queries":
+            page = [record.get(ID_PROPERTIES[dialect]) for record in page]
+
+        pagination = {"offset": offset, "limit": limit, "total": len(records)}
+        self._send_result(200, page, started, pagination=pagination)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handle a GET request."""
+        self._handle("GET")
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Handle a POST request."""
+        self._handle("POST")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run a stand-in server from the command line until it is interrupted."""
+    parser = argparse.ArgumentParser(
+        description="Serve Falcon API fixture records locally, filtered by FQL."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="The address to listen on.")
+    parser.add_argument("--port", type=int, default=8080, help="The port to listen on.")
+    parser.add_argument("--fixtures", help="A JSON or TOML file of fixture records.")
+    parser.add_argument("--count", type=int, default=1000, help="Synthetic records per dialect.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic records.")
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args(argv)
+
+    fixtures = (
+        load_fixtures(args.fixtures) if args.fixtures else make_fixtures(args.count, args.seed)
+    )
+    server = StandInServer(fixtures, (args.host, args.port), verbose=args.verbose)
+    print(f"Serving {', '.join(sorted(fixtures))} fixtures at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Caracara Filters: Query Sharding.
+
+Large queries are slow to page through, and can hit the Falcon API's pagination limits. This
+module splits one FQLGenerator into many smaller ones that, between them, return the same
+results, so that they can be fetched concurrently.
+
+shard_by_time() splits a timestamp range into contiguous, non-overlapping windows. Each shard
+contains a copy of the original generator's filters, alongside a GTE filter on the start of its
+window and a LESS filter on its end. Any filters that the original generator already has on the
+same property are replaced by the window's bounds:
+
+    shards = shard_by_time(fql_generator, "modified_on", "-90d", "+0s", shards=9)
+    # modified_on: >='...'+modified_on: <'...' for each ten day window
+
+shard_by_device_id() splits a hosts query into 16 or 256 shards by the leading hex digits of each
+host's device ID (AID), which are uniformly distributed, so each shard holds a similar number of
+hosts and can be paged through with shallow offsets:
+
+    shards = shard_by_device_id(fql_generator, shards=256)
+    # device_id: '00*', device_id: '01*', ... device_id: 'ff*', each with the original filters
+"""
+
+import datetime
+from typing import List, Optional, Union
+
+from caracara_filters.common.timestamps import (
+    Timestamp,
+    format_timestamp,
+    parse_timestamp,
+)
+from caracara_filters.dialects import get_filter_index, resolve_filter
+from caracara_filters.fql import FQLGenerator
+
+DEVICE_ID_SHARD_COUNTS = {16: 1, 256: 2}
+
+
+def shard_by_time(  # pylint: disable=too-many-arguments,too-many-locals
+    fql_generator: FQLGenerator,
+    filter_name: str,
+    start: Timestamp,
+    end: Timestamp,
+    *,
+    shards: Optional[int] = None,
+    interval: Optional[Union[int, datetime.timedelta]] = None,
+) -> List[FQLGenerator]:
+    """Split a generator into one generator per window of the [start, end) timestamp range.
+
+    Exactly one of shards (the number of equally sized windows) or interval (the length of each
+    window, either as a timedelta or in seconds) must be provided. With an interval, the final
+    window is shortened so that it ends at the end of the range. The start and end may be ISO 8601
+    timestamps, relative timestamps (e.g., -90d) or aware datetime objects. Existing filters on
+    the same property as filter_name are not copied into the shards.
+    """
+    if (shards is None) == (interval is None):
+        raise ValueError("Exactly one of shards or interval must be provided.")
+
+    _, filter_index = get_filter_index(fql_generator.dialect)
+    resolved_filter = resolve_filter(filter_index, filter_name)
+    if resolved_filter is None:
+        raise ValueError(f"The specified filter name {filter_name} does not exist.")
+
+    filter_name, filter_def = resolved_filter
+    if "GTE" not in filter_def["valid_operators"] or "LESS" not in filter_def["valid_operators"]:
+        raise ValueError(
+            f"The filter {filter_name} does not support the GTE and LESS operators, so cannot be "
+            "used to shard by time."
+        )
+
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    start_timestamp = parse_timestamp(start, now=now)
+    end_timestamp = parse_timestamp(end, now=now)
+    total_seconds = int((end_timestamp - start_timestamp).total_seconds())
+    if total_seconds <= 0:
+        raise ValueError("The end of the time range must be after its start.")
+
+    # Window boundaries are whole numbers of seconds from the start, as FQL timestamps have no
+    # fractional part, and each window's end is the next window's start
+    if shards is not None:
+        if shards < 1 or shards > total_seconds:
+            raise ValueError(
+                f"The number of shards must be between 1 and {total_seconds} for this range."
+            )
+        offsets = [(total_seconds * i) // shards for i in range(shards + 1)]
+    else:
+        if isinstance(interval, datetime.timedelta):
+            interval = int(interval.total_seconds())
+        if interval < 1:
+            raise ValueError("The interval must be at least one second.")
+        offsets = [*range(0, total_seconds, interval), total_seconds]
+
+    # Each shard's bounds replace any existing filters on the same property, rather than being
+    # combined with them
+    base_generator = fql_generator.copy()
+    for filter_id, filter_args in fql_generator.filters.items():
+        if filter_args.fql == filter_def["fql"]:
+            base_generator.remove_filter(filter_id)
+
+    sharded_generators: List[FQLGenerator] = []
+    for window_start, window_end in zip(offsets, offsets[1:]):
+        shard = base_generator.copy()
+        shard.create_new_filter(
+            filter_name,
+            format_timestamp(start_timestamp + datetime.timedelta(seconds=window_start)),
+            "GTE",
+        )
+        shard.create_new_filter(
+            filter_name,
+            format_timestamp(start_timestamp + datetime.timedelta(seconds=window_end)),
+            "LESS",
+        )
+        sharded_generators.append(shard)
+
+    return sharded_generators
+
+
+def shard_by_device_id(fql_generator: FQLGenerator, shards: int = 16) -> List[FQLGenerator]:
+    """Split a generator into 16 or 256 generators by device ID (AID) hex prefix."""
+    prefix_length = DEVICE_ID_SHARD_COUNTS.get(shards)
+    if prefix_length is None:
+        raise ValueError(
+            "Device ID sharding supports the following numbers of shards: "
+            + ", ".join(str(x) for x in DEVICE_ID_SHARD_COUNTS)
+        )
+
+    sharded_generators: List[FQLGenerator] = []
+    for prefix in range(shards):
+        shard = fql_generator.copy()
+        shard.create_new_filter("device_id", f"{prefix:0{prefix_length}x}*")
+        sharded_generators.append(shard)
+
+    return sharded_generators
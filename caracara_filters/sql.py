@@ -0,0 +1,252 @@
+"""Caracara Filters: SQL Translation.
+
+This module compiles the filters of an FQL generator into a parameterised SQLite WHERE clause and
+a list of bind parameters, so that records mirrored into a local SQLite database (e.g., hosts or
+IOCs kept for analytics and reporting) can be filtered by the database, using its own indexes.
+It is exposed via FQLGenerator.to_sql().
+
+FQL property names are mapped to column names through an optional mapping; unmapped properties
+are used as column names directly. Column names are always quoted, and values are always bound
+as parameters. Filters are translated as follows:
+
+- Operators are mapped from FILTER_OPERATORS (e.g., GTE to >=). NOT also matches NULL columns,
+  as FQL's ! operator matches records that do not have the property at all.
+- A null value is compared with IS NULL (or IS NOT NULL for NOT).
+- Values containing FQL's * wildcard are compared with LIKE, which (as with FQL) ignores case.
+  All other string comparisons follow the collation of the column, so columns should be
+  declared with COLLATE NOCASE to match FQL's case-insensitivity.
+- A multivariate filter becomes IN (...), or NOT IN (...) for NOT. Lists longer than
+  max_inline_values are inserted, a chunk at a time, into a temporary table instead, and
+  compared with IN (SELECT ...), to stay within SQLite's limit on bind parameters. This requires
+  an open sqlite3 connection, on which the temporary table is created.
+
+The clause is returned as an SQLClause, which unpacks as (where, params) and drops any temporary
+tables that it created when it is closed, or when it is used as a context manager:
+
+    with fql_generator.to_sql(connection=connection) as (where, params):
+        rows = connection.execute(f"SELECT * FROM hosts WHERE {where}", params).fetchall()
+
+CIDR networks (as accepted by the Hosts IP address filters) cannot be expressed in SQL, so are
+rejected; caracara_filters.evaluate can filter such records locally instead.
+"""
+
+import sqlite3
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from uuid import uuid4
+
+from caracara_filters.common import FILTER_OPERATORS, parse_ip_network
+
+SQL_MAX_INLINE_VALUES = 500
+
+SQL_INSERT_CHUNK_SIZE = 10000
+
+# FQL's operator symbols are valid SQL, apart from equality (no symbol) and negation (!)
+SQL_OPERATORS = {
+    operator: {"": "=", "!": "!="}.get(symbol, symbol)
+    for operator, symbol in FILTER_OPERATORS.items()
+}
+
+
+def quote_identifier(identifier: str) -> str:
+    """Quote a column or table name for use within SQL."""
+    escaped_identifier = identifier.replace('"', '""')
+    return f'"{escaped_identifier}"'
+
+
+def _escape_like(value: str) -> str:
+    """Convert an FQL wildcard pattern to a LIKE pattern, escaping LIKE's own wildcards."""
+    escaped_value = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped_value.replace("*", "%")
+
+
+def _create_temp_table(connection: sqlite3.Connection, values: Iterable[Any]) -> str:
+    """Create a temporary table holding the values of a filter, and return its quoted name."""
+    table = quote_identifier(f"caracara_values_{uuid4().hex}")
+    connection.execute(f"CREATE TEMP TABLE {table} (value PRIMARY KEY) WITHOUT ROWID")
+
+    insert_statement = f"INSERT OR IGNORE INTO {table} (value) VALUES (?)"
+    value_iterator = iter(values)
+    while True:
+        chunk = [(value,) for value in islice(value_iterator, SQL_INSERT_CHUNK_SIZE)]
+        if not chunk:
+            break
+        connection.executemany(insert_statement, chunk)
+
+    return f"temp.{table}"
+
+
+class SQLClause(tuple):
+    """A WHERE clause and its bind parameters, which unpacks as (where, params).
+
+    Any temporary tables created for the clause are dropped by close(), or on leaving a with
+    block, once the query has been run.
+    """
+
+    connection: Optional[sqlite3.Connection]
+    temp_tables: List[str]
+
+    def __new__(
+        cls,
+        where: str,
+        params: List[Any],
+        connection: Optional[sqlite3.Connection] = None,
+        temp_tables: Iterable[str] = (),
+    ):
+        """Create the clause, recording the connection and names of its temporary tables."""
+        clause = super().__new__(cls, (where, params))
+        clause.connection = connection
+        clause.temp_tables = list(temp_tables)
+        return clause
+
+    @property
+    def where(self) -> str:
+        """Return the WHERE clause."""
+        return self[0]
+
+    @property
+    def params(self) -> List[Any]:
+        """Return the bind parameters of the WHERE clause."""
+        return self[1]
+
+    def close(self) -> None:
+        """Drop the temporary tables created for this clause. This is safe to call repeatedly."""
+        while self.temp_tables:
+            table = self.temp_tables.pop()
+            if self.connection is not None:
+                self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def __enter__(self) -> "SQLClause":
+        """Return the clause, which is closed on leaving the with block."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Drop the temporary tables created for this clause."""
+        self.close()
+
+
+class _SQLCompiler:  # pylint: disable=too-few-public-methods
+    """Compile stored filters into SQL conditions, collecting their bind parameters."""
+
+    def __init__(
+        self,
+        columns: Optional[Dict[str, str]],
+        connection: Optional[sqlite3.Connection],
+        max_inline_values: int,
+    ):
+        """Configure the column mapping, connection and inline list size of the compiler."""
+        self.columns = columns or {}
+        self.connection = connection
+        self.max_inline_values = max_inline_values
+        self.params: List[Any] = []
+        self.temp_tables: List[str] = []
+
+    def _membership(self, column: str, values: List[Any]) -> Optional[str]:
+        """Return a condition matching any of a list of exact values, or None if it is empty."""
+        if not values:
+            return None
+
+        if len(values) == 1:
+            self.params.append(values[0])
+            return f"{column} = ?"
+
+        if len(values) <= self.max_inline_values:
+            self.params.extend(values)
+            return f"{column} IN ({', '.join('?' * len(values))})"
+
+        if self.connection is None:
+            raise ValueError(
+                f"A list of {len(values)} values requires a sqlite3 connection, on which to "
+                "create a temporary table."
+            )
+
+        table = _create_temp_table(self.connection, values)
+        self.temp_tables.append(table)
+        return f"{column} IN (SELECT value FROM {table})"
+
+    def _equality(self, column: str, values: Sequence[Any], negated: bool) -> str:
+        """Return a condition for an EQUAL or NOT filter."""
+        conditions = []
+        if None in values:
+            conditions.append(f"{column} IS NULL")
+
+        patterns = [x for x in values if isinstance(x, str) and "*" in x]
+        for pattern in patterns:
+            conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+            self.params.append(_escape_like(pattern))
+
+        membership = self._membership(
+            column, [x for x in values if x is not None and x not in patterns]
+        )
+        if membership is not None:
+            conditions.append(membership)
+
+        condition = " OR ".join(conditions) if conditions else "0"
+        if negated:
+            if None in values:
+                return f"NOT ({condition})"
+            return f"({column} IS NULL OR NOT ({condition}))"
+
+        if len(conditions) > 1:
+            return f"({condition})"
+
+        return condition
+
+    def _comparison(self, column: str, operator: str, values: Sequence[Any]) -> str:
+        """Return a condition for a GREATER, GTE, LESS or LTE filter."""
+        # Comparisons with null never match, as in caracara_filters.evaluate
+        comparable_values = [x for x in values if x is not None]
+        if not comparable_values:
+            return "0"
+
+        conditions = [f"{column} {SQL_OPERATORS[operator]} ?" for _ in comparable_values]
+        self.params.extend(comparable_values)
+        if len(conditions) == 1:
+            return conditions[0]
+
+        return f"({' OR '.join(conditions)})"
+
+    def compile_filter(self, filter_args: Any) -> str:
+        """Return a condition for a stored filter, collecting its bind parameters."""
+        values = filter_args.value
+        if isinstance(values, str) or not hasattr(values, "__iter__"):
+            values = [values]
+        elif not isinstance(values, Sequence):
+            values = list(values)
+
+        for value in values:
+            if isinstance(value, str) and "/" in value and parse_ip_network(value) is not None:
+                raise ValueError(f"The CIDR network {value} cannot be expressed in SQL.")
+
+        column = quote_identifier(self.columns.get(filter_args.fql, filter_args.fql))
+        if filter_args.operator in ("EQUAL", "NOT"):
+            return self._equality(column, values, negated=filter_args.operator == "NOT")
+
+        if filter_args.operator not in SQL_OPERATORS:
+            raise ValueError(f"The operator {filter_args.operator} cannot be expressed in SQL.")
+
+        return self._comparison(column, filter_args.operator, values)
+
+
+def filters_to_sql(
+    filters: Iterable[Any],
+    columns: Optional[Dict[str, str]] = None,
+    *,
+    connection: Optional[sqlite3.Connection] = None,
+    max_inline_values: int = SQL_MAX_INLINE_VALUES,
+) -> SQLClause:
+    """Compile stored filters (FilterArgs) into a SQLite WHERE clause and its bind parameters.
+
+    The filters are ANDed together, as in FQL. If there are no filters, the clause matches every
+    row. If compiling a filter fails, any temporary tables already created are dropped.
+    """
+    compiler = _SQLCompiler(columns, connection, max_inline_values)
+    try:
+        conditions = [compiler.compile_filter(filter_args) for filter_args in filters]
+    except Exception:
+        SQLClause("0", [], connection, compiler.temp_tables).close()
+        raise
+
+    return SQLClause(
+        " AND ".join(conditions) or "1", compiler.params, connection, compiler.temp_tables
+    )
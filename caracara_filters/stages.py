@@ -0,0 +1,162 @@
+"""Caracara Filters: Stage Registry.
+
+Filters defined in data files (rather than Python modules) cannot hold references to functions
+directly. Instead, they refer to validators, transforms, data types and templates by the names
+registered here. A stage reference is either a name, such as "lowercase", or a table containing
+a name alongside positional and keyword arguments to bind to the function, such as:
+
+    {"name": "options", "args": [["Linux", "Mac", "Windows"]], "kwargs": {"case_sensitive": false}}
+
+Each stage is registered alongside whether it is pure (i.e., its output depends only on its input).
+Stages are not pure unless registered as such. Filters, whether defined in data files or in Python,
+are pure only if every stage they use is a registered pure stage, or if they are explicitly marked
+as pure.
+
+Additional stages can be registered with register_validator() and register_transform().
+"""
+
+from functools import partial
+from typing import Any, Callable, Dict, NamedTuple, Tuple, Type, Union
+
+from caracara_filters.common.templates import RELATIVE_TIMESTAMP_FILTER_TEMPLATE
+from caracara_filters.transforms import (
+    aid_list_transform,
+    bool_transform,
+    identity_transform,
+    ip_address_transform,
+    ip_network_collapse_transform,
+    lowercase_transform,
+    relative_timestamp_transform,
+    user_readable_string_transform,
+    yes_no_transform,
+)
+from caracara_filters.validators import (
+    aid_validator,
+    boolean_validator,
+    identity_validator,
+    ip_address_validator,
+    options_validator,
+    relative_timestamp_validator,
+)
+
+StageReference = Union[str, Dict[str, Any]]
+
+
+class Stage(NamedTuple):
+    """A registered validator or transform function, and whether it is pure."""
+
+    func: Callable
+    pure: bool
+
+
+# Maps each stage kind (i.e., the key within a filter definition) to its registry
+STAGES: Dict[str, Dict[str, Stage]] = {
+    "validator": {
+        "aid": Stage(aid_validator, True),
+        "boolean": Stage(boolean_validator, True),
+        "identity": Stage(identity_validator, True),
+        "ip_address": Stage(ip_address_validator, True),
+        "options": Stage(options_validator, True),
+        "relative_timestamp": Stage(relative_timestamp_validator, True),
+    },
+    "transform": {
+        "bool": Stage(bool_transform, True),
+        "identity": Stage(identity_transform, True),
+        "ip_address": Stage(ip_address_transform, True),
+        "lowercase": Stage(lowercase_transform, True),
+        "relative_timestamp": Stage(relative_timestamp_transform, False),
+        "user_readable_string": Stage(user_readable_string_transform, True),
+        "yes_no": Stage(yes_no_transform, True),
+    },
+    "list_transform": {
+        "aid": Stage(aid_list_transform, True),
+        "identity": Stage(identity_transform, True),
+        "ip_network_collapse": Stage(ip_network_collapse_transform, True),
+    },
+}
+
+DATA_TYPES: Dict[str, Type] = {
+    "bool": bool,
+    "float": float,
+    "int": int,
+    "str": str,
+}
+
+TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "relative_timestamp": RELATIVE_TIMESTAMP_FILTER_TEMPLATE,
+}
+
+
+def register_validator(name: str, func: Callable[[Any], bool], pure: bool = False) -> None:
+    """Register a validator function so that data files can refer to it by name."""
+    STAGES["validator"][name] = Stage(func, pure)
+
+
+def register_transform(
+    name: str, func: Callable[[Any], Any], pure: bool = False, list_transform: bool = False
+) -> None:
+    """Register a transform (or, if list_transform is True, a list transform) by name."""
+    STAGES["list_transform" if list_transform else "transform"][name] = Stage(func, pure)
+
+
+def is_pure_stage(func: Callable) -> bool:
+    """Return True if a stage function (or a partial of one) is registered as pure."""
+    if isinstance(func, partial):
+        func = func.func
+
+    return any(
+        stage.func is func and stage.pure for stages in STAGES.values() for stage in stages.values()
+    )
+
+
+def resolve_stage(kind: str, reference: StageReference) -> Tuple[Callable, bool]:
+    """Resolve a stage reference into a callable, and whether that callable is pure."""
+    if isinstance(reference, str):
+        name = reference
+        args = []
+        kwargs = {}
+    elif isinstance(reference, dict) and isinstance(reference.get("name"), str):
+        name = reference["name"]
+        args = reference.get("args", [])
+        kwargs = reference.get("kwargs", {})
+    else:
+        raise ValueError(f"The {kind} reference {reference} is not a name or a table with a name.")
+
+    if name not in STAGES[kind]:
+        raise ValueError(
+            f"The {kind} {name} is not registered. Valid choices are: {str(list(STAGES[kind]))}."
+        )
+
+    stage = STAGES[kind][name]
+    if args or kwargs:
+        return partial(stage.func, *args, **kwargs), stage.pure
+
+    return stage.func, stage.pure
+
+
+def get_stage_reference(kind: str, func: Callable) -> str:
+    """Return the registered name of a (non-partial) stage function."""
+    for name, stage in STAGES[kind].items():
+        if stage.func is func:
+            return name
+
+    raise ValueError(f"The {kind} {func} is not registered.")
+
+
+def resolve_data_type(name: str) -> Type:
+    """Resolve the name of a data type into the type itself."""
+    if name not in DATA_TYPES:
+        raise ValueError(
+            f"The data type {name} is not supported. Valid choices are: {str(list(DATA_TYPES))}."
+        )
+
+    return DATA_TYPES[name]
+
+
+def get_data_type_reference(data_type: Type) -> str:
+    """Return the registered name of a data type."""
+    for name, registered_type in DATA_TYPES.items():
+        if registered_type is data_type:
+            return name
+
+    raise ValueError(f"The data type {data_type} is not registered.")
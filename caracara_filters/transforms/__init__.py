@@ -6,15 +6,27 @@ an exception.
 """
 
 __all__ = [
+    "aid_list_transform",
     "bool_transform",
     "identity_transform",
+    "ip_address_transform",
+    "ip_network_collapse_transform",
     "lowercase_transform",
     "relative_timestamp_transform",
+    "user_readable_string_transform",
     "yes_no_transform",
 ]
 
+from caracara_filters.transforms.aid import aid_list_transform
 from caracara_filters.transforms.bool import bool_transform
 from caracara_filters.transforms.identity import identity_transform
+from caracara_filters.transforms.ip_address import (
+    ip_address_transform,
+    ip_network_collapse_transform,
+)
 from caracara_filters.transforms.lowercase import lowercase_transform
 from caracara_filters.transforms.relative_timestamp import relative_timestamp_transform
+from caracara_filters.transforms.user_readable_string import (
+    user_readable_string_transform,
+)
 from caracara_filters.transforms.yes_no import yes_no_transform
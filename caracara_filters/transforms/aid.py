@@ -0,0 +1,17 @@
+"""Caracara Filters: Device ID (AID) List Transform.
+
+This file contains a list transform that packs a list of AIDs into an AIDList, which holds each
+AID in 16 bytes rather than as a separate string. Anything other than a complete AID (such as a
+wildcard) is kept as a string in its original position, so one such value does not stop the rest
+of the list from being packed. AIDs are lower cased by the filter's value transform beforehand,
+so that values differing only by case are deduplicated before they are packed.
+"""
+
+from typing import List
+
+from caracara_filters.common.aids import AIDList
+
+
+def aid_list_transform(aids: List[str]) -> AIDList:
+    """Pack the complete AIDs within a list into an AIDList, keeping any other values as is."""
+    return AIDList.from_values(aids)
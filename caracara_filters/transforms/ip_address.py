@@ -0,0 +1,65 @@
+"""Caracara Filters: IP Address Transforms.
+
+This file contains a transform that normalises an IP address or CIDR network into its canonical
+form (e.g., 2001:DB8::0001 becomes 2001:db8::1), as well as a list transform that collapses many
+addresses and networks into the fewest CIDR blocks that cover exactly the same addresses. The
+latter can shrink a filter containing thousands of contiguous addresses down to a handful of
+networks, significantly reducing the size of the resultant FQL string. Wildcard addresses (e.g.,
+10.0.*) are passed through both transforms unchanged, as they cannot be expressed as networks.
+"""
+
+import ipaddress
+from typing import List
+
+from caracara_filters.common.networks import (
+    IPNetworkString,
+    format_ip_network,
+    parse_ip_network,
+)
+from caracara_filters.common.regex import IP_WILDCARD_RE
+
+
+def ip_address_transform(ip_input: str) -> str:
+    """Return the canonical string representation of an IP address or CIDR network."""
+    if IP_WILDCARD_RE.match(ip_input):
+        return ip_input
+
+    network = parse_ip_network(ip_input)
+    if network is None:
+        raise ValueError(f"{ip_input} is not a valid IP address or CIDR network")
+
+    return format_ip_network(network)
+
+
+def ip_network_collapse_transform(ip_inputs: List[str]) -> List[str]:
+    """Collapse a list of IP addresses and networks into the minimal set of CIDR networks.
+
+    IPv4 networks are returned ahead of IPv6 networks, each sorted by network address, followed
+    by any wildcard addresses in their original order. Inputs that have already been through
+    ip_address_transform carry their parsed networks, so are not parsed again.
+    """
+    ipv4_networks = []
+    ipv6_networks = []
+    wildcards = []
+    for ip_input in ip_inputs:
+        if isinstance(ip_input, IPNetworkString):
+            network = ip_input.network
+        elif IP_WILDCARD_RE.match(ip_input):
+            wildcards.append(ip_input)
+            continue
+        else:
+            network = parse_ip_network(ip_input)
+            if network is None:
+                raise ValueError(f"{ip_input} is not a valid IP address or CIDR network")
+
+        if network.version == 4:
+            ipv4_networks.append(network)
+        else:
+            ipv6_networks.append(network)
+
+    collapsed: List[str] = [
+        format_ip_network(network)
+        for networks in (ipv4_networks, ipv6_networks)
+        for network in ipaddress.collapse_addresses(networks)
+    ]
+    return collapsed + wildcards
@@ -0,0 +1,20 @@
+"""Caracara Filters: User Readable String Transform.
+
+This file contains a function that maps a human-readable string to the machine-readable string
+expected by the Falcon API (e.g., Containment Pending becomes containment_pending), based on a
+dictionary of human-readable keys to machine-readable values. Input that is already
+machine-readable is returned unchanged.
+"""
+
+from typing import Dict
+
+
+def user_readable_string_transform(map_dict: Dict[str, str], input_str: str) -> str:
+    """Map a human-readable string to a machine-readable one."""
+    if input_str in map_dict.values():
+        return input_str
+
+    if input_str in map_dict:
+        return map_dict[input_str]
+
+    raise ValueError("An invalid filter input was provided.")
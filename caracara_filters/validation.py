@@ -0,0 +1,55 @@
+"""Caracara Filters: Validation Reports.
+
+By default, creating a filter raises an exception at the first invalid value, so fixing a bulk
+import with several mistakes takes several attempts. When a ValidationReport is passed to
+FQLGenerator.create_new_filter() (or when filters are created in bulk with create_new_filters()),
+every value is checked instead, and each problem is recorded in the report as a ValidationIssue,
+which contains the filter name, the index of the value within a list (or None for the filter as
+a whole), the value itself, and the reason that it was rejected.
+"""
+
+from typing import Any, Iterator, List, NamedTuple, Optional
+
+
+class ValidationIssue(NamedTuple):
+    """A single invalid value (or filter) found while creating filters."""
+
+    filter_name: str
+    index: Optional[int]
+    value: Any
+    reason: str
+
+
+class ValidationReport:
+    """A record of every validation issue found while creating one or more filters."""
+
+    def __init__(self):
+        """Create an empty validation report."""
+        self.issues: List[ValidationIssue] = []
+        self.filter_ids: List[str] = []
+
+    @property
+    def ok(self) -> bool:
+        """Return True if no issues have been found."""
+        return not self.issues
+
+    def add_issue(self, filter_name: str, index: Optional[int], value: Any, reason: str) -> None:
+        """Record a validation issue."""
+        self.issues.append(ValidationIssue(filter_name, index, value, reason))
+
+    def __iter__(self) -> Iterator[ValidationIssue]:
+        """Iterate over the issues within this report."""
+        return iter(self.issues)
+
+    def __len__(self) -> int:
+        """Return the number of issues within this report."""
+        return len(self.issues)
+
+    def __str__(self) -> str:
+        """Return a human-readable summary of every issue within this report."""
+        return "\n".join(
+            f"{issue.filter_name}"
+            + ("" if issue.index is None else f"[{issue.index}]")
+            + f": {issue.reason}"
+            for issue in self.issues
+        )
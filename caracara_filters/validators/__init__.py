@@ -7,13 +7,17 @@ string that will be valid FQL, and in turn recognised by the Falcon API.
 """
 
 __all__ = [
+    "aid_validator",
     "boolean_validator",
     "identity_validator",
+    "ip_address_validator",
     "options_validator",
     "relative_timestamp_validator",
 ]
 
+from caracara_filters.validators.aid import aid_validator
 from caracara_filters.validators.boolean import boolean_validator
 from caracara_filters.validators.identity import identity_validator
+from caracara_filters.validators.ip_address import ip_address_validator
 from caracara_filters.validators.options import options_validator
 from caracara_filters.validators.relative_timestamp import relative_timestamp_validator
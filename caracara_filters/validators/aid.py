@@ -0,0 +1,13 @@
+"""Caracara Filters: Device ID (AID) Validator.
+
+This file contains a validator for device IDs (AIDs). A complete AID is 32 hexadecimal digits.
+Partial IDs must be hexadecimal prefixes (or patterns) containing * wildcards, e.g., abc*, as a
+partial ID without a wildcard is an exact match that could never match a host.
+"""
+
+from caracara_filters.common.regex import AID_RE, AID_WILDCARD_RE
+
+
+def aid_validator(aid: str) -> bool:
+    """Check that an input is a complete AID, or a hexadecimal pattern with wildcards."""
+    return AID_RE.match(aid) is not None or AID_WILDCARD_RE.match(aid) is not None
@@ -0,0 +1,17 @@
+"""Caracara Filters: IP Address Validator.
+
+This file contains a validator to ensure that the input is a valid IPv4 or IPv6 address, a
+network in CIDR notation (e.g., 172.16.0.0/16), or a prefix of whole octets or hextets followed
+by FQL's * wildcard (e.g., 10.0.* or fe80::*).
+"""
+
+from caracara_filters.common.networks import parse_ip_network
+from caracara_filters.common.regex import IP_WILDCARD_RE
+
+
+def ip_address_validator(ip_input: str) -> bool:
+    """Check if an input is a valid IP address, CIDR network or wildcard address."""
+    if IP_WILDCARD_RE.match(ip_input):
+        return True
+
+    return parse_ip_network(ip_input) is not None
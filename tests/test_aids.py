@@ -0,0 +1,82 @@
+"""Test packed AID storage, and its use by the hosts device_id filter."""
+
+import pytest
+
+from caracara_filters import FQLGenerator
+from caracara_filters.common import AIDList
+
+AIDS = [f"{i:032x}" for i in range(1, 4)]
+
+
+def test_aid_list():
+    """Test that an AID list behaves as a read-only sequence of AID strings."""
+    aid_list = AIDList.from_hex([x.upper() for x in AIDS])
+    assert len(aid_list) == 3
+    assert len(aid_list.buffer) == 48
+    assert aid_list[0] == AIDS[0]
+    assert aid_list[-1] == AIDS[2]
+    assert aid_list[1:] == AIDS[1:]
+    assert list(aid_list) == AIDS
+    assert aid_list == AIDList.from_hex(AIDS)
+    assert AIDS[1].upper() in aid_list
+    assert "0" * 31 + "4" not in aid_list
+    assert aid_list.render_fql() == "['" + "','".join(AIDS) + "']"
+
+    with pytest.raises(IndexError):
+        aid_list[3]  # pylint: disable=pointless-statement
+
+
+def test_aid_list_validation():
+    """Test that AIDs are validated when they are packed."""
+    with pytest.raises(ValueError):
+        AIDList.from_hex([AIDS[0], "not an aid"])
+
+    with pytest.raises(ValueError):
+        AIDList(b"\x00" * 15)
+
+
+def test_device_id_filter():
+    """Test that lists of complete AIDs are packed."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    filter_id = fql_generator.create_new_filter("device_id", AIDS)
+    assert isinstance(fql_generator.filters[filter_id].value, AIDList)
+    assert fql_generator.get_fql() == "device_id: ['" + "','".join(AIDS) + "']"
+    assert fql_generator.estimated_length == len(fql_generator.get_fql())
+    assert fql_generator.value_count == 3
+
+
+def test_device_id_wildcards_and_validation():
+    """Test that complete AIDs are packed alongside wildcards, and invalid AIDs are rejected."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    filter_id = fql_generator.create_new_filter("device_id", ["abc*", AIDS[0], AIDS[1].upper()])
+    value = fql_generator.filters[filter_id].value
+    assert isinstance(value, AIDList)
+    assert len(value.buffer) == 32
+    assert value.extras == ("abc*",)
+    assert value == ["abc*", AIDS[0], AIDS[1]]
+    assert value[0] == "abc*" and value[2] == AIDS[1] and "abc*" in value and AIDS[1] in value
+    assert value[1:] == [AIDS[0], AIDS[1]]
+    assert fql_generator.get_fql() == f"device_id: ['abc*','{AIDS[0]}','{AIDS[1]}']"
+    assert fql_generator.estimated_length == len(fql_generator.get_fql())
+
+    for invalid_value in ["1" * 31 + "g", "z" * 32, "not-an-aid!!", "1" * 31, "abc", "xyz*", "*-*"]:
+        with pytest.raises(ValueError):
+            fql_generator.create_new_filter("device_id", invalid_value)
+
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("device_id", [AIDS[0], "1" * 31 + "g"])
+
+
+def test_device_id_case_and_order():
+    """Test that AIDs are lower cased before they are deduplicated, keeping the input order."""
+    fql_generator = FQLGenerator(dialect="hosts", dedupe=True)
+    fql_generator.create_new_filter("device_id", ["b*", "F" * 32, "f" * 32, AIDS[0], "0*"])
+    fql_generator.create_new_filter("device_id", AIDS[2].upper())
+    assert fql_generator.get_fql() == (
+        f"device_id: ['b*','{'f' * 32}','{AIDS[0]}','0*']+device_id: '{AIDS[2]}'"
+    )
+
+    value = next(iter(fql_generator.filters.values())).value
+    assert [value[i] for i in range(len(value))] == list(value) == value.to_list()
+    assert AIDList.from_values(value.to_list()) == value
+    assert value[::2] == ["b*", AIDS[0]]
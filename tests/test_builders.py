@@ -0,0 +1,90 @@
+"""Test the specialised filter builders compiled for each dialect."""
+
+from datetime import datetime
+
+import pytest
+import time_machine
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
+
+from caracara_filters import FQLGenerator, builders
+
+
+def test_builder_matches_generic_path():
+    """Test that a builder produces the same FQL as create_new_filter()."""
+    generic_generator = FQLGenerator(dialect="hosts")
+    generic_generator.create_new_filter("role", ["DC", "Server"])
+    generic_generator.create_new_filter("rfm", True)
+    generic_generator.create_new_filter("hostname", None)
+
+    builder_generator = FQLGenerator(dialect="hosts")
+    builder_generator.add_filter(builders.hosts.role(["DC", "Server"]))
+    builder_generator.add_filter(builders.hosts.rfm(True))
+    builder_generator.add_filter(builders.hosts.hostname(None))
+
+    assert builder_generator.get_fql() == generic_generator.get_fql()
+    assert builder_generator.get_fql() == (
+        "product_type_desc: ['Domain Controller','Server']+reduced_functionality_mode: 'yes'"
+        "+hostname: null"
+    )
+
+
+@time_machine.travel(datetime(2023, 8, 15, 1, 2, 3, tzinfo=ZoneInfo("UTC")))
+def test_builder_operator():
+    """Test a builder with an explicit operator."""
+    filter_args = builders.hosts.last_seen("-1h", "LTE")
+    assert filter_args.fql == "last_seen"
+    assert filter_args.operator == "LTE"
+    assert filter_args.value == "2023-08-15T00:02:03Z"
+
+
+def test_builder_operator_interned():
+    """Test that builders store the same interned operator as create_new_filter()."""
+    operator = "".join(["G", "TE"])
+    fql_generator = FQLGenerator(dialect="hosts")
+    filter_id = fql_generator.create_new_filter("last_seen", "2023-08-15T00:00:00Z", operator)
+    generic_args = fql_generator.filters[filter_id]
+    builder_args = builders.hosts.last_seen("2023-08-15T00:00:00Z", operator)
+    assert builder_args == generic_args
+    assert builder_args.operator is generic_args.operator
+
+
+def test_builder_base_filters():
+    """Test that base filters are available in every dialect, unless overridden."""
+    assert builders.users.name("John Smith").fql == "name"
+    assert builders.hosts.os("Windows").fql == "platform_name"
+    assert builders.sensor_download.os("RHEL").fql == "os"
+
+
+def test_builder_exceptions():
+    """Test that builders raise the same exceptions as the generic path."""
+    with pytest.raises(ValueError):
+        builders.hosts.last_seen("-30m", "NOT")
+
+    with pytest.raises(ValueError):
+        builders.hosts.contained("some containment option")
+
+    with pytest.raises(ValueError):
+        builders.base.os(["Windows", "Solaris"])
+
+    with pytest.raises(TypeError):
+        builders.hosts.last_seen(["-30m", "-60h"])
+
+    with pytest.raises(TypeError):
+        builders.hosts.hostname(["host1", 2])
+
+    with pytest.raises(TypeError):
+        builders.hosts.domain(None)
+
+    with pytest.raises(TypeError):
+        builders.hosts.rfm(13)
+
+
+@pytest.mark.parametrize("dialect", sorted(builders.BUILDERS))
+def test_builders_cover_dialect(dialect):
+    """Test that a builder exists for every filter that an FQLGenerator of a dialect accepts."""
+    fql_generator = FQLGenerator(dialect=dialect)
+    assert sorted(vars(builders.BUILDERS[dialect])) == sorted(fql_generator.available_filters)
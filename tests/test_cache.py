@@ -0,0 +1,119 @@
+"""Test the LRU cache wrapped around pure validators and transforms."""
+
+from datetime import datetime
+
+import time_machine
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
+
+from caracara_filters import STAGE_CACHE, FQLGenerator
+from caracara_filters.cache import StageCache
+from caracara_filters.dialects import DIALECTS, register_dialect
+from caracara_filters.transforms import (
+    identity_transform,
+    lowercase_transform,
+    relative_timestamp_transform,
+)
+
+
+def test_pure_stage_hits():
+    """Test that repeated inputs to a pure filter are served from the cache."""
+    STAGE_CACHE.clear()
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("role", ["DC", "Server"])
+    first_info = STAGE_CACHE.info()
+    assert first_info.hits == 0
+    assert first_info.misses == 4  # Two validations and two transforms
+
+    fql_generator.create_new_filter("role", ["DC", "Server", "DC"])
+    second_info = STAGE_CACHE.info()
+    assert second_info.hits == 6
+    assert second_info.misses == 4
+    assert fql_generator.get_fql() == (
+        "product_type_desc: ['Domain Controller','Server']"
+        "+product_type_desc: ['Domain Controller','Server','Domain Controller']"
+    )
+
+
+def test_typed_cache_keys():
+    """Test that equal values of different types do not share a cache entry."""
+    stage_cache = StageCache()
+    cached_str = stage_cache.wrap(str)
+    assert cached_str(1) == "1"
+    assert cached_str(True) == "True"
+    assert stage_cache.info().misses == 2
+
+
+def test_identity_stages_not_cached():
+    """Test that identity stages are left unwrapped."""
+    stage_cache = StageCache()
+    assert stage_cache.wrap(identity_transform) is identity_transform
+    assert stage_cache.info().currsize == 0
+
+
+def test_impure_filter_not_cached():
+    """Test that relative timestamp filters are never served from the cache."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    last_seen_def = fql_generator.available_filters["last_seen"]
+    assert last_seen_def["pure"] is False
+    _, transform = STAGE_CACHE.wrap_filter(last_seen_def)
+    assert transform is relative_timestamp_transform
+
+    with time_machine.travel(datetime(2023, 8, 15, 1, 2, 3, tzinfo=ZoneInfo("UTC"))):
+        fql_generator.create_new_filter("last_seen", "-1h")
+
+    with time_machine.travel(datetime(2023, 8, 16, 1, 2, 3, tzinfo=ZoneInfo("UTC"))):
+        fql_generator.create_new_filter("last_seen", "-1h")
+
+    assert fql_generator.get_fql() == (
+        "last_seen: >='2023-08-15T00:02:03Z'+last_seen: >='2023-08-16T00:02:03Z'"
+    )
+
+
+def test_bounded_cache():
+    """Test that each stage cache is bounded by its maximum size."""
+    stage_cache = StageCache(maxsize=2)
+    cached_upper = stage_cache.wrap(str.upper)
+    for value in ["a", "b", "c", "a"]:
+        cached_upper(value)
+
+    info = stage_cache.info()
+    assert info.currsize == 2
+    assert info.misses == 4
+    stage_cache.clear()
+    assert stage_cache.info().currsize == 0
+
+
+def test_bounded_stages():
+    """Test that the least recently used stage is evicted once there are too many stages."""
+    stage_cache = StageCache(maxstages=2)
+    cached_upper = stage_cache.wrap(str.upper)
+    cached_lower = stage_cache.wrap(str.lower)
+    assert stage_cache.wrap(str.upper) is cached_upper
+    stage_cache.wrap(str.title)
+    assert stage_cache.info().maxsize == 2 * stage_cache.maxsize
+    assert stage_cache.wrap(str.upper) is cached_upper
+    assert stage_cache.wrap(str.lower) is not cached_lower
+
+
+def test_purity_defaults():
+    """Test that filters are only pure if marked as such, or if all their stages are pure."""
+    register_dialect(
+        "purity_test",
+        {
+            "registered": {"fql": "registered", "transform": lowercase_transform},
+            "unregistered": {"fql": "unregistered", "transform": str.lower},
+            "marked": {"fql": "marked", "transform": str.lower, "pure": True},
+        },
+    )
+    try:
+        filters = DIALECTS["purity_test"]
+        assert filters["registered"]["pure"] is True
+        assert filters["unregistered"]["pure"] is False
+        assert filters["marked"]["pure"] is True
+        assert STAGE_CACHE.wrap_filter(filters["unregistered"])[1] is str.lower
+    finally:
+        del DIALECTS["purity_test"]
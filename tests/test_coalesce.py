@@ -0,0 +1,66 @@
+"""Test coalescing many FQL generators into a single query with result routing."""
+
+import pytest
+
+from caracara_filters import FQLGenerator
+from caracara_filters.coalesce import coalesce_generators
+
+
+def _hosts_generator(**filters):
+    """Create a hosts FQL generator containing the given filters."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    for filter_name, value in filters.items():
+        fql_generator.create_new_filter(filter_name, value)
+    return fql_generator
+
+
+def test_merge_values():
+    """Test merging queries that differ only by the value of one multivariate filter."""
+    generators = [
+        _hosts_generator(os="Windows", hostname="HOST1"),
+        _hosts_generator(os="Windows", hostname="HOST2"),
+        _hosts_generator(os="Windows", hostname=["HOST2", "HOST3*"]),
+    ]
+    coalesced = coalesce_generators(generators)
+    assert isinstance(coalesced.query, FQLGenerator)
+    assert coalesced.get_fql() == ("platform_name: 'Windows'+hostname: ['HOST1','HOST2','HOST3*']")
+
+    records = [
+        {"hostname": "host1", "platform_name": "Windows"},
+        {"hostname": "HOST2", "platform_name": "Windows"},
+        {"hostname": "HOST33", "platform_name": "Windows"},
+    ]
+    assert coalesced.route(records[1]) == [1, 2]
+    assert coalesced.split(records) == [[records[0]], [records[1]], [records[1], records[2]]]
+
+
+def test_or_group():
+    """Test coalescing queries with differing filters into an OR group."""
+    generators = [
+        _hosts_generator(site="London", os="Linux"),
+        _hosts_generator(site="London", os="Mac", rfm=True),
+    ]
+    coalesced = coalesce_generators(generators)
+    assert coalesced.get_fql() == (
+        "site_name: 'London'+(platform_name: 'Linux',"
+        "(platform_name: 'Mac'+reduced_functionality_mode: 'yes'))"
+    )
+    record = {"site_name": "London", "platform_name": "Mac", "reduced_functionality_mode": "yes"}
+    assert coalesced.route(record) == [1]
+
+
+def test_subsuming_query():
+    """Test that a query containing only shared filters covers every other query."""
+    generators = [_hosts_generator(site="London"), _hosts_generator(site="London", os="Linux")]
+    coalesced = coalesce_generators(generators)
+    assert coalesced.get_fql() == "site_name: 'London'"
+    assert coalesced.route({"site_name": "London", "platform_name": "Mac"}) == [0]
+
+
+def test_invalid_input():
+    """Test that empty input and mixed dialects are rejected."""
+    with pytest.raises(ValueError):
+        coalesce_generators([])
+
+    with pytest.raises(ValueError):
+        coalesce_generators([FQLGenerator(dialect="hosts"), FQLGenerator(dialect="users")])
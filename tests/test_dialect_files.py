@@ -0,0 +1,117 @@
+"""Test dialects declared in JSON and TOML data files."""
+
+import json
+from datetime import datetime
+
+import pytest
+import time_machine
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
+
+from caracara_filters import FQLGenerator
+from caracara_filters.dialects import DIALECTS, _registry, load_dialect_file
+
+SPOTLIGHT_DIALECT = """
+name = "spotlight_test"
+
+[filters.cve_id]
+fql = "cve.id"
+aliases = ["cveid", "CVE"]
+help = "Filter by CVE ID."
+
+[filters.severity]
+fql = "cve.severity"
+validator = {name = "options", args = [["CRITICAL", "HIGH"]], kwargs = {case_sensitive = false}}
+transform = "lowercase"
+
+[filters.updated_timestamp]
+fql = "updated_timestamp"
+template = "relative_timestamp"
+
+[filters.suppressed]
+fql = "suppression_info.is_suppressed"
+data_types = ["str", "bool"]
+multivariate = false
+validator = "boolean"
+"""
+
+
+@pytest.fixture(name="dialect_path")
+def fixture_dialect_path(tmp_path):
+    """Write the test dialect to disk, and unload it once the test completes."""
+    dialect_path = tmp_path / "spotlight.toml"
+    dialect_path.write_text(SPOTLIGHT_DIALECT)
+    yield dialect_path
+    DIALECTS.pop("spotlight_test", None)
+
+
+@time_machine.travel(datetime(2023, 8, 15, 1, 2, 3, tzinfo=ZoneInfo("UTC")))
+def test_load_dialect_file(dialect_path):
+    """Test loading a dialect from a TOML file and generating FQL with it."""
+    assert load_dialect_file(str(dialect_path)) == "spotlight_test"
+    fql_generator = FQLGenerator(dialect="spotlight_test")
+    fql_generator.create_new_filter("CVE", ["CVE-2021-44228", "CVE-2014-0160"])
+    fql_generator.create_new_filter("severity", "Critical")
+    fql_generator.create_new_filter("updated_timestamp", "-1d")
+    fql_generator.create_new_filter("suppressed", False)
+    fql_generator.create_new_filter("name", "base filters are still available")
+    assert fql_generator.get_fql() == (
+        "cve.id: ['CVE-2021-44228','CVE-2014-0160']+cve.severity: 'critical'"
+        "+updated_timestamp: >='2023-08-14T01:02:03Z'+suppression_info.is_suppressed: false"
+        "+name: 'base filters are still available'"
+    )
+
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("severity", "Unknown")
+
+
+def test_dialect_file_purity_and_aliases(dialect_path):
+    """Test that aliases share one definition, and that purity is derived from the stages."""
+    load_dialect_file(str(dialect_path), use_cache=False)
+    filters = DIALECTS["spotlight_test"]
+    assert filters["cveid"] is filters["cve_id"]
+    assert filters["cve"] is filters["cve_id"]
+    assert filters["cve_id"]["pure"] is True
+    assert filters["updated_timestamp"]["pure"] is False
+    assert filters["updated_timestamp"]["operator"] == "GTE"
+
+
+def test_dialect_file_cache(dialect_path, monkeypatch):
+    """Test that an unchanged dialect file is loaded from its cache without being recompiled."""
+    load_dialect_file(str(dialect_path))
+    cache = json.loads((dialect_path.parent / "spotlight.toml.cache.json").read_text())
+    assert cache["compiled"]["aliases"]["cveid"] == "cve_id"
+
+    def fail_compile(_):
+        raise AssertionError("The dialect should have been loaded from the cache.")
+
+    monkeypatch.setattr(_registry, "compile_dialect_definition", fail_compile)
+    DIALECTS.pop("spotlight_test")
+    assert load_dialect_file(str(dialect_path)) == "spotlight_test"
+    assert "cveid" in DIALECTS["spotlight_test"]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"bad": {"help": "No FQL property"}},
+        {"bad": {"fql": "bad", "validator": "not_registered"}},
+        {"bad": {"fql": "bad", "data_types": ["complex"]}},
+        {"bad": {"fql": "bad", "template": "not_a_template"}},
+        {"bad": {"fql": "bad", "valid_operators": ["EQUAL", "LIKE"]}},
+        {"bad": {"fql": "bad", "operator": "GTE"}},
+        {"bad": {"fql": "bad", "unknown_property": True}},
+        {"bad": {"fql": "bad"}, "also_bad": {"fql": "also_bad", "aliases": ["Bad"]}},
+    ],
+)
+def test_invalid_dialect_files(tmp_path, filters):
+    """Test that invalid dialect definitions are rejected when they are compiled."""
+    dialect_path = tmp_path / "bad.json"
+    dialect_path.write_text(json.dumps({"name": "bad_dialect", "filters": filters}))
+    with pytest.raises(ValueError):
+        load_dialect_file(str(dialect_path))
+
+    assert "bad_dialect" not in DIALECTS
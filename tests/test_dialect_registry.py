@@ -0,0 +1,115 @@
+"""Test runtime dialect registration and filter name resolution."""
+
+import sys
+
+import pytest
+
+from caracara_filters import FQLGenerator, builders
+from caracara_filters.dialects import (
+    DIALECTS,
+    get_filter_index,
+    register_dialect,
+    resolve_filter,
+)
+
+
+@pytest.fixture(name="custom_dialect")
+def fixture_custom_dialect():
+    """Register a custom dialect, and remove it once the test completes."""
+    owner_filter = {"fql": "owner.name", "help": "Filter by owner."}
+    register_dialect(
+        "custom_test",
+        {
+            "owner": owner_filter,
+            "OwnerName": owner_filter,
+            "risk_score": {"fql": "risk_score", "valid_operators": ["EQUAL", "GTE"]},
+        },
+    )
+    yield "custom_test"
+    del DIALECTS["custom_test"]
+
+
+@pytest.mark.parametrize("filter_name", ["last_seen", "lastseen", "LastSeen", "LAST_SEEN"])
+def test_normalised_filter_names(filter_name):
+    """Test that filter names resolve regardless of case and underscores."""
+    _, filter_index = get_filter_index("hosts")
+    canonical_name, filter_def = resolve_filter(filter_index, filter_name)
+    assert canonical_name == "last_seen"
+    assert filter_def["fql"] == "last_seen"
+
+
+def test_aliases_resolve_to_canonical_name():
+    """Test that every alias of a filter is stored under the filter's canonical name."""
+    fql_generator = FQLGenerator(dialect="sensor_download")
+    lts_ids = [fql_generator.create_new_filter(x, True) for x in ["lts", "IsLTS", "is_lts"]]
+    assert {fql_generator.filters[x].filter_def for x in lts_ids} == {"is_lts"}
+
+
+def test_unknown_filter_name():
+    """Test that unknown filter names do not resolve."""
+    _, filter_index = get_filter_index("hosts")
+    assert resolve_filter(filter_index, "not_a_filter") is None
+    with pytest.raises(ValueError):
+        FQLGenerator(dialect="hosts").create_new_filter("not_a_filter", "value")
+
+
+def test_register_dialect(custom_dialect):
+    """Test registering a dialect at runtime, including base filters and builders."""
+    fql_generator = FQLGenerator(dialect=custom_dialect)
+    fql_generator.create_new_filter("Owner_Name", "alice")
+    fql_generator.create_new_filter("RiskScore", "80", "GTE")
+    fql_generator.create_new_filter("os", "Linux")
+    assert fql_generator.get_fql() == (
+        "owner.name: 'alice'+risk_score: >='80'+platform_name: 'Linux'"
+    )
+
+    custom_builders = builders.get_dialect_builders(custom_dialect)
+    assert custom_builders.owner("bob").filter_def == "ownername"
+    assert custom_builders.risk_score("10").fql == "risk_score"
+
+
+def test_registered_filters_not_modified():
+    """Test that registering and indexing a dialect leaves the caller's definitions unchanged."""
+    fql = "".join(["owner.", "email"])
+    owner_filter = {"fql": fql}
+    filters = {"Owner": owner_filter, "owner_email": owner_filter}
+    register_dialect("copy_test", filters)
+    try:
+        assert filters == {"Owner": {"fql": fql}, "owner_email": {"fql": fql}}
+        assert owner_filter == {"fql": fql}
+
+        # Aliases still share a single (interned) definition within the index
+        available_filters, filter_index = get_filter_index("copy_test")
+        assert available_filters["owner"] is available_filters["owner_email"]
+        assert resolve_filter(filter_index, "Owner")[1] is available_filters["owner"]
+        assert available_filters["owner"]["fql"] is sys.intern(fql)
+        assert available_filters["owner"]["operator"] == "EQUAL"
+    finally:
+        del DIALECTS["copy_test"]
+
+
+def test_ambiguous_dialect_rejected(custom_dialect):
+    """Test that filter names that differ only by case or underscores are rejected."""
+    with pytest.raises(ValueError):
+        register_dialect(
+            custom_dialect,
+            {"risk_score": {"fql": "risk_score"}, "riskscore": {"fql": "other_score"}},
+        )
+
+    # The previously registered dialect remains in place
+    _, filter_index = get_filter_index(custom_dialect)
+    assert resolve_filter(filter_index, "owner")[1]["fql"] == "owner.name"
+
+    with pytest.raises(ValueError):
+        register_dialect("ambiguous_test", {"NAME": {"fql": "other_name"}, "n_ame": {"fql": "n"}})
+
+    assert "ambiguous_test" not in DIALECTS
+
+
+def test_directly_modified_dialects():
+    """Test that dialects added to or removed from DIALECTS directly are respected."""
+    DIALECTS["direct_test"] = {}
+    assert FQLGenerator(dialect="direct_test").available_filters == DIALECTS["base"]
+    del DIALECTS["direct_test"]
+    with pytest.raises(ValueError):
+        FQLGenerator(dialect="direct_test")
@@ -0,0 +1,53 @@
+"""Test evaluating filters, generators and expressions against records locally."""
+
+from caracara_filters import FQLGenerator, OrGroup, builders
+from caracara_filters.evaluate import evaluate, get_record_value, make_predicate
+from caracara_filters.fql import FilterArgs
+
+HOST = {
+    "hostname": "WEB-01",
+    "platform_name": "Linux",
+    "local_ip": "10.1.2.3",
+    "tags": ["FalconGroupingTags/Prod", "FalconGroupingTags/Web"],
+    "reduced_functionality_mode": "no",
+    "last_seen": "2023-01-05T00:00:00Z",
+    "device_policies": {"prevention": {"policy_id": "abc"}},
+}
+
+
+def test_equality_and_wildcards():
+    """Test case-insensitive equality, wildcards and list-valued properties."""
+    assert evaluate(builders.hosts.hostname("web-01"), HOST)
+    assert evaluate(builders.hosts.hostname("WEB-*"), HOST)
+    assert not evaluate(builders.hosts.hostname("DB-*"), HOST)
+    assert evaluate(builders.hosts.tag("FalconGroupingTags/Web"), HOST)
+    assert evaluate(builders.hosts.hostname(["DB-01", "WEB-01"]), HOST)
+
+
+def test_operators():
+    """Test the NOT operator and the comparison operators."""
+    assert not evaluate(FilterArgs("hostname", "hostname", "WEB-01", "NOT"), HOST)
+    assert evaluate(FilterArgs("hostname", "hostname", ["DB-01", "DB-02"], "NOT"), HOST)
+    assert evaluate(builders.hosts.last_seen("2023-01-01T00:00:00Z", "GTE"), HOST)
+    assert not evaluate(builders.hosts.last_seen("2023-01-01T00:00:00Z", "LESS"), HOST)
+
+
+def test_networks_and_nested_properties():
+    """Test CIDR matching and dotted property names."""
+    assert evaluate(builders.hosts.local_ip("10.0.0.0/8"), HOST)
+    assert not evaluate(builders.hosts.local_ip("192.168.0.0/16"), HOST)
+    assert get_record_value(HOST, "device_policies.prevention.policy_id") == "abc"
+    assert get_record_value(HOST, "device_policies.missing") is None
+
+
+def test_generators_and_expressions():
+    """Test that generators AND their filters, and expressions follow their groups."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("os", "Linux")
+    fql_generator.create_new_filter("rfm", False)
+    assert evaluate(fql_generator, HOST)
+
+    expression = OrGroup(builders.hosts.os("Windows"), builders.hosts.site("London"))
+    assert not evaluate(expression, HOST)
+    assert make_predicate(expression | builders.hosts.hostname("WEB-01"))(HOST)
+    assert evaluate(FQLGenerator(dialect="hosts"), HOST)
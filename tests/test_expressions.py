@@ -0,0 +1,96 @@
+"""Test nested AND and OR expressions over FQL generators and filters."""
+
+import pytest
+
+from caracara_filters import AndGroup, FQLGenerator, OrGroup, builders
+from caracara_filters.evaluate import evaluate
+
+
+def _hosts_generator(**filters):
+    """Create a hosts FQL generator containing the given filters."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    for filter_name, value in filters.items():
+        fql_generator.create_new_filter(filter_name, value)
+    return fql_generator
+
+
+def test_or_of_generators():
+    """Test combining two generators into a single OR query."""
+    linux_in_group = _hosts_generator(os="Linux", group_id="abcdef")
+    tagged = _hosts_generator(tag="FalconGroupingTags/X")
+    expression = OrGroup(linux_in_group, tagged)
+    assert expression.get_fql() == (
+        "(platform_name: 'Linux'+groups: 'abcdef'),tags: 'FalconGroupingTags/X'"
+    )
+    assert str(expression) == expression.get_fql()
+    assert expression.dialect == "hosts"
+
+
+def test_nested_groups():
+    """Test an AND of an OR group alongside an individual filter."""
+    expression = AndGroup(
+        OrGroup(_hosts_generator(os="Linux"), _hosts_generator(os="Mac", rfm=True)),
+        builders.hosts.site("London"),
+    )
+    assert expression.get_fql() == (
+        "(platform_name: 'Linux',(platform_name: 'Mac'+reduced_functionality_mode: 'yes'))"
+        "+site_name: 'London'"
+    )
+
+
+def test_flattening():
+    """Test that same-kind groups, single-term groups and empty operands are flattened."""
+    windows = builders.hosts.os("Windows")
+    linux = builders.hosts.os("Linux")
+    mac = builders.hosts.os("Mac")
+    assert OrGroup(windows, OrGroup(linux, mac)).get_fql() == (
+        "platform_name: 'Windows',platform_name: 'Linux',platform_name: 'Mac'"
+    )
+    assert AndGroup(OrGroup(_hosts_generator(os="Linux", site="London"))).get_fql() == (
+        "platform_name: 'Linux'+site_name: 'London'"
+    )
+    assert OrGroup(AndGroup(_hosts_generator(os="Linux", site="London")), mac).get_fql() == (
+        "(platform_name: 'Linux'+site_name: 'London'),platform_name: 'Mac'"
+    )
+    assert AndGroup(FQLGenerator(dialect="hosts"), windows).get_fql() == "platform_name: 'Windows'"
+    assert OrGroup().get_fql() == ""
+
+
+def test_or_with_empty_operand():
+    """Test that an OR group with an empty operand matches every record, and renders nothing."""
+    linux = builders.hosts.os("Linux")
+    hostname = builders.hosts.hostname("h")
+    empty_or = OrGroup(FQLGenerator(dialect="hosts"), hostname)
+    assert empty_or.matches_all()
+    assert empty_or.get_fql() == ""
+
+    expression = AndGroup(linux, empty_or)
+    assert expression.get_fql() == "platform_name: 'Linux'"
+    assert OrGroup(linux, AndGroup(empty_or)).get_fql() == ""
+    assert not OrGroup(linux, AndGroup(FQLGenerator(dialect="hosts"), hostname)).matches_all()
+
+    records = [
+        {"platform_name": "Linux", "hostname": "other"},
+        {"platform_name": "Mac", "hostname": "h"},
+    ]
+    assert [evaluate(expression, x) for x in records] == [True, False]
+    assert all(evaluate(empty_or, x) for x in records)
+
+
+def test_operators():
+    """Test combining expressions with the & and | operators."""
+    expression = OrGroup(builders.hosts.os("Linux")) & builders.hosts.site("London")
+    expression = expression | builders.hosts.tag("Tag1")
+    assert isinstance(expression, OrGroup)
+    assert expression.get_fql() == (
+        "(platform_name: 'Linux'+site_name: 'London'),tags: 'Tag1'"
+    )
+
+
+def test_invalid_operands():
+    """Test that mixed dialects and unsupported operands are rejected."""
+    with pytest.raises(ValueError):
+        OrGroup(FQLGenerator(dialect="hosts"), FQLGenerator(dialect="iocs"))
+
+    with pytest.raises(TypeError):
+        OrGroup("platform_name: 'Linux'").get_fql()
@@ -11,6 +11,8 @@ except ImportError:
     from backports.zoneinfo import ZoneInfo
 
 from caracara_filters import FQLGenerator
+from caracara_filters.common import parse_ip_network
+from caracara_filters.transforms import ip_address_transform, ip_network_collapse_transform
 
 
 def test_external_ip_address_fql():
@@ -317,3 +319,73 @@ def test_last_seen_relative_seconds():
     fql_generator.create_new_filter("lastseen", "-63s")
     fql = fql_generator.get_fql()
     assert fql == "last_seen: >='2023-08-15T01:01:00Z'"
+
+
+def test_local_ip_address_cidr_fql():
+    """Test filtering by a local IP range in CIDR notation, with host bits set."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("local_ip", "172.16.4.5/16")
+    fql = fql_generator.get_fql()
+    assert fql == "local_ip: '172.16.0.0/16'"
+
+
+def test_external_ip_address_ipv6_fql():
+    """Test that an IPv6 external IP address is normalised to its canonical form."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("external_ip", ["2001:DB8::0001", "100.100.200.200"])
+    fql = fql_generator.get_fql()
+    assert fql == "external_ip: ['2001:db8::1','100.100.200.200']"
+
+
+def test_invalid_ip_address():
+    """Test that invalid IP addresses and networks are rejected."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("local_ip", "192.168.1.256")
+
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("external_ip", ["100.100.200.200", "not an ip"])
+
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("local_ip", "10.0.0.0/33")
+
+
+def test_local_ip_collapsed_fql():
+    """Test that contiguous local IP addresses are collapsed into the fewest CIDR networks."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    ip_addresses = [f"10.0.0.{i}" for i in range(256)] + ["10.0.1.0", "fe80::1", "10.0.0.7/32"]
+    fql_generator.create_new_filter("local_ip_collapsed", ip_addresses)
+    fql = fql_generator.get_fql()
+    assert fql == "local_ip: ['10.0.0.0/24','10.0.1.0','fe80::1']"
+
+
+def test_local_ip_wildcards():
+    """Test that wildcard IP addresses are accepted, and kept as they are when collapsing."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("local_ip", "10.0.*")
+    fql_generator.create_new_filter("local_ip_collapsed", ["10.1.0.1", "fe80::*", "10.1.0.0"])
+    fql = fql_generator.get_fql()
+    assert fql == "local_ip: '10.0.*'+local_ip: ['10.1.0.0/31','fe80::*']"
+
+    for wildcard in ["10.*", "10.0.0.*", "2001:db8:*", "fe80::1:*"]:
+        fql_generator.create_new_filter("local_ip", wildcard)
+
+    for bad_wildcard in ["10.0.*.x", "*", "beef*", "::*::*", "256.*", "10.0.1*", "a::b::*"]:
+        with pytest.raises(ValueError):
+            fql_generator.create_new_filter("local_ip", bad_wildcard)
+
+
+def test_local_ip_collapsed_parses_once():
+    """Test that collapsing reuses the networks parsed by the transform of each address."""
+    ip_addresses = [ip_address_transform(f"10.2.0.{i}") for i in range(64)]
+    parse_ip_network.cache_clear()
+    assert ip_network_collapse_transform(ip_addresses) == ["10.2.0.0/26"]
+    assert parse_ip_network.cache_info().hits + parse_ip_network.cache_info().misses == 0
+
+
+def test_external_ip_collapsed_single_value():
+    """Test that a single external IP address passes through the collapsed filter unchanged."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("externalipcollapsed", "100.100.200.200")
+    fql = fql_generator.get_fql()
+    assert fql == "external_ip: '100.100.200.200'"
@@ -0,0 +1,82 @@
+"""Test answering filters and generators from a local record index."""
+
+import random
+
+from caracara_filters import FQLGenerator, OrGroup, builders
+from caracara_filters.evaluate import evaluate
+from caracara_filters.fql import FilterArgs
+from caracara_filters.index import RecordIndex
+
+PLATFORMS = ["Windows", "Linux", "Mac"]
+SITES = ["London", "Paris", None]
+
+
+def make_records(count: int):
+    """Return a reproducible list of host records."""
+    rng = random.Random(1234)
+    return [
+        {
+            "hostname": f"HOST-{i:04d}",
+            "platform_name": rng.choice(PLATFORMS),
+            "site_name": rng.choice(SITES),
+            "tags": [f"FalconGroupingTags/T{rng.randrange(5)}" for _ in range(rng.randrange(3))],
+            "last_seen": f"2023-01-{rng.randrange(1, 29):02d}T00:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+RECORDS = make_records(500)
+
+
+def assert_matches_scan(index: RecordIndex, operand):
+    """Assert that the index returns the same records, in the same order, as a full scan."""
+    expected = [record for record in RECORDS if evaluate(operand, record)]
+    assert index.query(operand) == expected
+    return expected
+
+
+def test_default_fields():
+    """Test that the default fields are taken from the dialect."""
+    index = RecordIndex(RECORDS, dialect="hosts")
+    assert len(index) == 500
+    assert index.candidates(builders.hosts.os("Linux")) is not None
+    assert index.candidates(builders.hosts.last_seen("2023-01-10T00:00:00Z", "GTE")) is not None
+    assert index.candidates(builders.hosts.hostname("HOST-0001")) is None
+    assert index.candidates(builders.hosts.tag("FalconGroupingTags/*")) is None
+
+
+def test_generators_match_scan():
+    """Test that indexed queries return exactly the records of a full scan."""
+    index = RecordIndex(RECORDS, dialect="hosts")
+
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("os", ["Linux", "Mac"])
+    fql_generator.create_new_filter("tag", "FalconGroupingTags/T1")
+    fql_generator.create_new_filter("last_seen", "2023-01-10T00:00:00Z", "GTE")
+    fql_generator.create_new_filter("last_seen", "2023-01-20T00:00:00Z", "LESS")
+    assert assert_matches_scan(index, fql_generator)
+
+    fql_generator.create_new_filter("hostname", "HOST-00*")
+    assert_matches_scan(index, fql_generator)
+    assert_matches_scan(index, FQLGenerator(dialect="hosts"))
+
+
+def test_operators_and_nulls():
+    """Test NOT, comparisons, equality on timestamps and null values."""
+    index = RecordIndex(RECORDS, dialect="hosts")
+    for operator in ("EQUAL", "GREATER", "GTE", "LESS", "LTE"):
+        assert_matches_scan(index, builders.hosts.last_seen("2023-01-15T00:00:00Z", operator))
+
+    assert assert_matches_scan(index, FilterArgs("platform_name", "platform_name", "Mac", "NOT"))
+    assert assert_matches_scan(index, FilterArgs("site_name", "site_name", None, "EQUAL"))
+    assert not index.query(FilterArgs("platform_name", "platform_name", "Solaris", "EQUAL"))
+
+
+def test_incremental_and_fallback():
+    """Test adding records after creation, and falling back to a scan for expressions."""
+    index = RecordIndex(dialect="hosts", equality_fields=["platform_name"], range_fields=[])
+    index.add_records(RECORDS)
+    assert index.candidates(builders.hosts.site("London")) is None
+    assert_matches_scan(index, builders.hosts.os("Windows"))
+    assert_matches_scan(index, OrGroup(builders.hosts.os("Windows"), builders.hosts.site("Paris")))
@@ -1,8 +1,14 @@
 """Tests that can cover the way that the filtering logic works outside of individual dialects."""
 
+import copy
+import io
+import pickle
+from urllib.parse import quote
+
 import pytest
 
 from caracara_filters import FQLGenerator
+from caracara_filters.dialects import DIALECTS, register_dialect
 
 
 def test_non_existent_dialect():
@@ -58,3 +64,274 @@ def test_str_dunder():
     fql = fql_generator.get_fql()
     assert fql == str(fql_generator)
     assert fql == "name: 'testname'"
+
+
+def test_dedupe_generator():
+    """Test that a deduplicating generator drops repeated values while preserving order."""
+    fql_generator = FQLGenerator(dialect="hosts", dedupe=True)
+    fql_generator.create_new_filter("tag", ["Tag2", "Tag1", "Tag2", "Tag3", "Tag1"])
+    fql = fql_generator.get_fql()
+    assert fql == "tags: ['Tag2','Tag1','Tag3']"
+
+
+def test_dedupe_transformed_values():
+    """Test that values which transform to the same output are only stored once."""
+    fql_generator = FQLGenerator(dialect="hosts", dedupe=True)
+    fql_generator.create_new_filter("role", ["DC", "Server", "Domain Controller"])
+    fql = fql_generator.get_fql()
+    assert fql == "product_type_desc: ['Domain Controller','Server']"
+
+
+def test_dedupe_per_filter_override():
+    """Test that deduplication can be enabled or disabled for an individual filter."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("hostname", ["HOST1", "HOST1"])
+    fql_generator.create_new_filter("site", ["London", "London"], dedupe=True)
+    fql = fql_generator.get_fql()
+    assert fql == "hostname: ['HOST1','HOST1']+site_name: ['London']"
+
+    dedupe_generator = FQLGenerator(dialect="hosts", dedupe=True)
+    dedupe_generator.create_new_filter("hostname", ["HOST1", "HOST1"], dedupe=False)
+    assert dedupe_generator.get_fql() == "hostname: ['HOST1','HOST1']"
+
+
+def test_dedupe_skips_validation_of_seen_values():
+    """Test that a repeated value is only validated once."""
+    validated = []
+
+    def counting_validator(value):
+        validated.append(value)
+        return True
+
+    register_dialect("counting", {"counted": {"fql": "counted", "validator": counting_validator}})
+    try:
+        fql_generator = FQLGenerator(dialect="counting", dedupe=True)
+        fql_generator.create_new_filter("counted", ["a", "b", "a", "a", "c", "b"])
+        assert validated == ["a", "b", "c"]
+    finally:
+        del DIALECTS["counting"]
+
+
+def test_bad_data_type_later_in_list():
+    """Test that every item in a multivariate list is type checked, not just the first."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    with pytest.raises(TypeError, match="item 2"):
+        fql_generator.create_new_filter("hostname", ["host1", "host2", 3, "host4"])
+
+    with pytest.raises(TypeError):
+        fql_generator.create_new_filter("rfm", [True, "yes", None])
+
+    assert not fql_generator.filters
+
+
+def test_mixed_acceptable_list_types():
+    """Test that a list mixing several acceptable types passes the type check."""
+    fql_generator = FQLGenerator(dialect="iocs")
+    fql_generator.create_new_filter("expired", [True, "false"])
+    assert fql_generator.get_fql() == "expired: [true,false]"
+
+
+def test_estimated_length():
+    """Test that the estimated length and value count track filters as they change."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    assert fql_generator.estimated_length == 0
+    os_id = fql_generator.create_new_filter("os", "Windows")
+    fql_generator.create_new_filter("hostname", ["HOST1", "HOST2"])
+    fql_generator.create_new_filter("rfm", [True, "false"])
+    assert fql_generator.estimated_length == len(fql_generator.get_fql())
+    assert fql_generator.value_count == 5
+
+    fql_generator.remove_filter(os_id)
+    assert fql_generator.estimated_length == len(fql_generator.get_fql())
+    assert fql_generator.value_count == 4
+
+
+def test_budget():
+    """Test that a filter that would exceed the budget is rejected, or signalled."""
+    fql_generator = FQLGenerator(dialect="hosts", max_length=40, max_values=3)
+    fql_generator.create_new_filter("hostname", ["HOST1", "HOST2"])
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("hostname", ["HOST3", "HOST4"])
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("os", "Windows")
+    assert fql_generator.get_fql() == "hostname: ['HOST1','HOST2']"
+
+    signalled = []
+    fql_generator = FQLGenerator(
+        dialect="hosts",
+        max_values=1,
+        on_budget_exceeded=lambda generator, filter_args: signalled.append(filter_args),
+    )
+    fql_generator.create_new_filter("hostname", ["HOST1", "HOST2"])
+    assert [x.fql for x in signalled] == ["hostname"]
+    assert fql_generator.value_count == 2
+
+
+def test_filter_args_storage():
+    """Test that stored filters are slotted, frozen and share their field name strings."""
+    first = FQLGenerator(dialect="hosts")
+    second = FQLGenerator(dialect="hosts")
+    first_args = first.filters[first.create_new_filter("LastSeen", "-30m", "".join(["LE", "SS"]))]
+    second_args = second.filters[second.create_new_filter("last_seen", "-1d", "LESS")]
+
+    assert not hasattr(first_args, "__dict__")
+    with pytest.raises(AttributeError):
+        first_args.value = "2020-01-01T00:00:00Z"
+
+    assert first_args.filter_def is second_args.filter_def
+    assert first_args.fql is second_args.fql
+    assert first_args.operator is second_args.operator
+
+
+def test_pickle_and_deepcopy():
+    """Test that generators and their stored filters survive pickling and deep copying."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("os", ["Linux", "Mac"])
+    fql_generator.create_new_filter("device_id", ["0" * 32, "1" * 32])
+    filter_args = next(iter(fql_generator.filters.values()))
+
+    for restored in (pickle.loads(pickle.dumps(fql_generator)), copy.deepcopy(fql_generator)):
+        assert restored.get_fql() == fql_generator.get_fql()
+        assert list(restored.filters) == list(fql_generator.filters)
+
+    # IOC filter definitions hold lambdas, which must not be pickled with the generator
+    iocs_generator = FQLGenerator(dialect="iocs")
+    iocs_generator.create_new_filter("type", "MD5")
+    assert pickle.loads(pickle.dumps(iocs_generator)).get_fql() == "type: 'md5'"
+
+    restored_args = pickle.loads(pickle.dumps(filter_args))
+    assert restored_args == filter_args
+    assert restored_args.fql is filter_args.fql
+    with pytest.raises(AttributeError):
+        restored_args.value = "Windows"
+
+
+def test_write_fql():
+    """Test streaming FQL into text and binary writers, optionally URL encoded."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("hostname", [f"HOST{i}" for i in range(2500)])
+    fql_generator.create_new_filter("rfm", [True, "false"])
+    fql_generator.create_new_filter("device_id", [f"{i:032x}" for i in range(1500)])
+    fql_generator.create_new_filter("os", "Windows")
+
+    text_writer = io.StringIO()
+    assert fql_generator.write_fql(text_writer) == len(fql_generator.get_fql())
+    assert text_writer.getvalue() == fql_generator.get_fql()
+
+    binary_writer = io.BytesIO()
+    fql_generator.write_fql(binary_writer, encoding="url")
+    assert binary_writer.getvalue() == quote(fql_generator.get_fql(), safe="").encode()
+
+    with pytest.raises(ValueError):
+        fql_generator.write_fql(text_writer, encoding="base64")
+
+
+class ShortRawWriter(io.RawIOBase):
+    """A raw writer that accepts at most a few bytes per write() call."""
+
+    def __init__(self):
+        """Create an empty writer."""
+        super().__init__()
+        self.data = bytearray()
+
+    def writable(self):
+        """Return True, as this writer can be written to."""
+        return True
+
+    def write(self, b):
+        """Write up to seven bytes, and return the number written."""
+        chunk = bytes(b[:7])
+        self.data += chunk
+        return len(chunk)
+
+
+def test_write_fql_short_writes():
+    """Test that short writes made by raw binary writers are retried until complete."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("hostname", [f"HÖST{i}" for i in range(50)])
+    fql_generator.create_new_filter("os", "Windows")
+
+    writer = ShortRawWriter()
+    expected = fql_generator.get_fql().encode("utf-8")
+    assert fql_generator.write_fql(writer) == len(expected)
+    assert bytes(writer.data) == expected
+
+
+def test_encoded_fql():
+    """Test that encoded FQL matches the raw FQL, and that fragments are only encoded once."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("hostname", ["HOST1", "HOST 2"])
+    os_id = fql_generator.create_new_filter("os", "Windows")
+    assert fql_generator.get_fql(encoded=True) == quote(fql_generator.get_fql(), safe="")
+
+    fql_generator.remove_filter(os_id)
+    fql_generator.create_new_filter("site", "London")
+    cached_fragments = dict(fql_generator._encoded_fragments)  # pylint: disable=protected-access
+    assert fql_generator.get_fql(encoded=True) == quote(fql_generator.get_fql(), safe="")
+    assert len(cached_fragments) == 1
+    for filter_id, cached_fragment in cached_fragments.items():
+        # pylint: disable=protected-access
+        assert fql_generator._encoded_fragments[filter_id][1] is cached_fragment[1]
+
+    writer = io.StringIO()
+    fql_generator.write_fql(writer, encoding="url")
+    assert writer.getvalue() == fql_generator.get_fql(encoded=True)
+
+
+def test_trusted_input():
+    """Test that trusted input skips type checks and validators, but is still transformed."""
+    fql_generator = FQLGenerator(dialect="hosts", trusted=True)
+    fql_generator.create_new_filter("hostname", 12345)
+    fql_generator.create_new_filter("local_ip", ["10.0.0.1/32"])
+    fql_generator.create_new_filter("role", "Domain Controller")
+    assert fql_generator.get_fql() == (
+        "hostname: 12345+local_ip: ['10.0.0.1']"
+        "+product_type_desc: 'Domain Controller'"
+    )
+
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("rfm", "maybe", trusted=False)
+
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("hostname", "HOST1", "GTE")
+
+
+def test_equality_and_freeze():
+    """Test that frozen snapshots are compared and hashed by their canonical FQL."""
+    first = FQLGenerator(dialect="hosts")
+    first.create_new_filter("hostname", "HOST1")
+    first.create_new_filter("os", "Linux")
+
+    second = FQLGenerator(dialect="hosts")
+    second.create_new_filter("os", "Linux")
+    second.create_new_filter("hostname", "HOST1")
+
+    # Generators are mutable, so they are compared and hashed by identity
+    assert first != second
+    assert first in [first, second] and [second, first].index(first) == 1
+    assert len({first, second}) == 2
+
+    frozen = first.freeze()
+    assert frozen == second.freeze()
+    assert frozen != FQLGenerator(dialect="hosts").freeze()
+    assert hash(frozen) == hash(second.freeze())
+    assert len({frozen, second.freeze()}) == 1
+    assert frozen.get_fql() == first.get_fql()
+
+    # Filters that render identically are equal once frozen, whatever their original input
+    true_generator = FQLGenerator(dialect="iocs")
+    true_generator.create_new_filter("expired", True)
+    string_generator = FQLGenerator(dialect="iocs")
+    string_generator.create_new_filter("expired", "true")
+    assert true_generator.freeze() == string_generator.freeze()
+
+    with pytest.raises(AttributeError):
+        frozen.fql = "hostname: 'HOST2'"
+
+    for restored in (pickle.loads(pickle.dumps(frozen)), copy.deepcopy(frozen)):
+        assert restored == frozen
+        assert hash(restored) == hash(frozen)
+
+    first.create_new_filter("hostname", "HOST2")
+    assert frozen != first.freeze()
+    assert frozen.to_generator().freeze() == second.freeze()
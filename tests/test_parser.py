@@ -0,0 +1,63 @@
+"""Test parsing FQL strings back into filters and expressions."""
+
+import pytest
+
+from caracara_filters import AndGroup, FQLGenerator, OrGroup
+from caracara_filters.evaluate import evaluate
+from caracara_filters.parser import parse_fql
+
+
+def test_round_trip():
+    """Test that parsing the FQL of a generator returns a generator with the same filters."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("os", ["Linux", "Mac"])
+    fql_generator.create_new_filter("last_seen", "2023-01-01T00:00:00Z", "GTE")
+    fql_generator.create_new_filter("rfm", True)
+    fql_generator.create_new_filter("hostname", "WEB-*")
+
+    parsed = parse_fql(fql_generator.get_fql(), dialect="hosts")
+    assert isinstance(parsed, FQLGenerator)
+    assert parsed.freeze() == fql_generator.freeze()
+    assert [x.filter_def for x in parsed.filters.values()] == [
+        x.filter_def for x in fql_generator.filters.values()
+    ]
+
+
+def test_values_and_operators():
+    """Test parsing each type of value and operator."""
+    parsed = parse_fql(
+        "a: 'x\\'y'+b: \"z\"+c: !null+d: >=5+e: <1.5+f: true+g: []+h: 2023-01-01T00:00:00Z"
+    )
+    values = [(x.fql, x.value, x.operator) for x in parsed.filters.values()]
+    assert values == [
+        ("a", "x'y", "EQUAL"),
+        ("b", "z", "EQUAL"),
+        ("c", None, "NOT"),
+        ("d", 5, "GTE"),
+        ("e", 1.5, "LESS"),
+        ("f", True, "EQUAL"),
+        ("g", [], "EQUAL"),
+        ("h", "2023-01-01T00:00:00Z", "EQUAL"),
+    ]
+
+
+def test_expressions():
+    """Test that + binds more tightly than , and that parentheses group terms."""
+    expression = parse_fql("platform_name: 'Linux'+tags: 'A',platform_name: 'Mac'", "hosts")
+    assert isinstance(expression, OrGroup)
+    assert evaluate(expression, {"platform_name": "Mac"})
+    assert not evaluate(expression, {"platform_name": "Linux"})
+
+    grouped = parse_fql("platform_name: 'Linux'+(tags: 'A',tags: 'B')", "hosts")
+    assert isinstance(grouped, AndGroup)
+    assert evaluate(grouped, {"platform_name": "Linux", "tags": ["B"]})
+    assert str(grouped) == "platform_name: 'Linux'+(tags: 'A',tags: 'B')"
+
+
+@pytest.mark.parametrize(
+    "fql", ["hostname", "hostname: 'x", "a: 1+", "a: ~'x'", "(a: 1", "a: 1)", "a: [1,"]
+)
+def test_invalid_fql(fql):
+    """Test that invalid FQL raises a ValueError."""
+    with pytest.raises(ValueError):
+        parse_fql(fql)
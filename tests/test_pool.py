@@ -0,0 +1,81 @@
+"""Test resetting FQL generators, and reusing them via the generator pool."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from caracara_filters import FQLGenerator
+from caracara_filters.pool import GeneratorPool
+
+
+def test_reset():
+    """Test that a reset generator is empty, but keeps its dialect and settings."""
+    fql_generator = FQLGenerator(dialect="hosts", dedupe=True)
+    fql_generator.create_new_filter("os", "Windows")
+    fql_generator.get_fql(encoded=True)
+    fql_generator.reset()
+    assert fql_generator.get_fql() == ""
+    assert fql_generator.get_fql(encoded=True) == ""
+    assert fql_generator.estimated_length == 0
+    assert fql_generator.value_count == 0
+    assert fql_generator.dedupe
+
+    fql_generator.create_new_filter("os", "Linux")
+    assert fql_generator.get_fql() == "platform_name: 'Linux'"
+
+
+def test_pool_reuse():
+    """Test that released generators are reset, restored to defaults and reused."""
+    pool = GeneratorPool(max_size=1)
+    with pool.generator("hosts") as fql_generator:
+        fql_generator.trusted = True
+        fql_generator.create_new_filter("os", "Windows")
+
+    assert pool.idle_count("hosts") == 1
+    reused = pool.acquire("hosts")
+    assert reused is fql_generator
+    assert not reused.filters
+    assert not reused.trusted
+    assert pool.acquire("hosts") is not reused
+
+    second = pool.acquire("hosts")
+    pool.release(reused)
+    pool.release(second)
+    assert pool.idle_count("hosts") == 1
+    assert pool.acquire("users").dialect == "users"
+
+
+def test_pool_release_checks():
+    """Test that only generators currently borrowed from the pool can be released."""
+    pool = GeneratorPool()
+    fql_generator = pool.acquire("hosts")
+    fql_generator.create_new_filter("os", "Windows")
+    pool.release(fql_generator)
+
+    with pytest.raises(ValueError):
+        pool.release(fql_generator)
+    assert pool.idle_count("hosts") == 1
+
+    with pytest.raises(ValueError):
+        pool.release(FQLGenerator(dialect="hosts"))
+
+    # A generator that is equal to a borrowed one, but is not the same object, is rejected too
+    borrowed = pool.acquire("hosts")
+    with pytest.raises(ValueError):
+        pool.release(borrowed.copy())
+    pool.release(borrowed)
+
+
+def test_pool_threads():
+    """Test that generators borrowed concurrently are never shared."""
+    pool = GeneratorPool()
+
+    def build(index):
+        with pool.generator("hosts") as fql_generator:
+            fql_generator.create_new_filter("hostname", f"HOST{index}")
+            return fql_generator.get_fql()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(build, range(200)))
+
+    assert results == [f"hostname: 'HOST{i}'" for i in range(200)]
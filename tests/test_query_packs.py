@@ -0,0 +1,150 @@
+"""Test loading query packs from JSON and TOML files, and their compiled cache."""
+
+import json
+from datetime import datetime
+
+import pytest
+import time_machine
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
+
+from caracara_filters import packs
+from caracara_filters.dialects import DIALECTS, get_dialect_fingerprint, register_dialect
+
+TOML_PACK = """
+[queries.online_windows]
+dialect = "hosts"
+
+[[queries.online_windows.filters]]
+name = "OS"
+value = "Windows"
+
+[[queries.online_windows.filters]]
+name = "last_seen"
+value = "-30m"
+operator = "GTE"
+
+[queries.dcs]
+dialect = "hosts"
+
+[[queries.dcs.filters]]
+name = "role"
+value = ["DC", "Server"]
+"""
+
+JSON_PACK = {
+    "queries": {
+        "sha256_iocs": {
+            "dialect": "iocs",
+            "filters": [{"name": "type", "value": "SHA256"}],
+        },
+    },
+}
+
+
+@time_machine.travel(datetime(2023, 8, 15, 1, 2, 3, tzinfo=ZoneInfo("UTC")))
+def test_load_toml_pack(tmp_path):
+    """Test loading a TOML query pack and building generators from it."""
+    pack_path = tmp_path / "pack.toml"
+    pack_path.write_text(TOML_PACK)
+    query_pack = packs.load_query_pack(str(pack_path))
+    assert sorted(query_pack) == ["dcs", "online_windows"]
+    assert query_pack["online_windows"].get_fql() == (
+        "platform_name: 'Windows'+last_seen: >='2023-08-15T00:32:03Z'"
+    )
+    assert query_pack["dcs"].get_fql() == "product_type_desc: ['Domain Controller','Server']"
+
+
+def test_load_json_pack(tmp_path):
+    """Test loading a JSON query pack."""
+    pack_path = tmp_path / "pack.json"
+    pack_path.write_text(json.dumps(JSON_PACK))
+    query_pack = packs.load_query_pack(str(pack_path), use_cache=False)
+    assert query_pack["sha256_iocs"].get_fql() == "type: 'sha256'"
+    assert not (tmp_path / "pack.json.cache.json").exists()
+
+    with pytest.raises(KeyError):
+        query_pack.get_generator("not_a_query")
+
+
+def test_cached_pack_skips_validation(tmp_path, monkeypatch):
+    """Test that an unchanged pack is loaded from its cache without recompiling."""
+    pack_path = tmp_path / "pack.toml"
+    pack_path.write_text(TOML_PACK)
+    packs.load_query_pack(str(pack_path))
+    cache = json.loads((tmp_path / "pack.toml.cache.json").read_text())
+    assert cache["version"] == packs.QUERY_PACK_CACHE_VERSION
+    # Impure filters are stored uncompiled, so they remain relative to the time of use
+    assert cache["compiled"]["online_windows"]["filters"][1]["value"] == "-30m"
+    assert cache["compiled"]["online_windows"]["filters"][1]["compiled"] is False
+
+    def fail_compile(_):
+        raise AssertionError("The query pack should have been loaded from the cache.")
+
+    monkeypatch.setattr(packs, "compile_query_pack", fail_compile)
+    query_pack = packs.load_query_pack(str(pack_path))
+    assert query_pack["dcs"].get_fql() == "product_type_desc: ['Domain Controller','Server']"
+
+
+def test_changed_pack_recompiles(tmp_path):
+    """Test that a change to a pack's contents invalidates its cache."""
+    pack_path = tmp_path / "pack.json"
+    pack_path.write_text(json.dumps(JSON_PACK))
+    packs.load_query_pack(str(pack_path))
+
+    new_pack = {"queries": {"md5_iocs": {"dialect": "iocs", "filters": []}}}
+    pack_path.write_text(json.dumps(new_pack))
+    query_pack = packs.load_query_pack(str(pack_path))
+    assert list(query_pack) == ["md5_iocs"]
+
+
+def test_changed_dialect_recompiles(tmp_path, monkeypatch):
+    """Test that registering a changed dialect invalidates the cache of a pack that uses it."""
+    pack_path = tmp_path / "pack.json"
+    pack_path.write_text(
+        json.dumps(
+            {
+                "queries": {
+                    "linux": {"dialect": "pack_test", "filters": [{"name": "os", "value": "Linux"}]}
+                }
+            }
+        )
+    )
+    register_dialect("pack_test", {"os": {"fql": "platform_name", "transform": str.upper}})
+    try:
+        assert packs.load_query_pack(str(pack_path))["linux"].get_fql() == "platform_name: 'LINUX'"
+        cache = json.loads((tmp_path / "pack.json.cache.json").read_text())
+        assert cache["fingerprint"] == {"pack_test": get_dialect_fingerprint("pack_test")}
+
+        register_dialect("pack_test", {"os": {"fql": "platform_name", "transform": str.lower}})
+        assert packs.load_query_pack(str(pack_path))["linux"].get_fql() == "platform_name: 'linux'"
+
+        def fail_compile(_):
+            raise AssertionError("The query pack should have been loaded from the cache.")
+
+        monkeypatch.setattr(packs, "compile_query_pack", fail_compile)
+        assert packs.load_query_pack(str(pack_path))["linux"].get_fql() == "platform_name: 'linux'"
+    finally:
+        del DIALECTS["pack_test"]
+
+
+def test_invalid_pack(tmp_path):
+    """Test that invalid query packs are rejected."""
+    pack_path = tmp_path / "pack.json"
+    pack_path.write_text(json.dumps({"queries": {"bad": {"filters": []}}}))
+    with pytest.raises(ValueError):
+        packs.load_query_pack(str(pack_path))
+
+    pack_path.write_text(
+        json.dumps({"queries": {"bad": {"dialect": "hosts", "filters": [{"name": "role"}]}}})
+    )
+    with pytest.raises(TypeError):
+        packs.load_query_pack(str(pack_path))
+
+    yaml_path = tmp_path / "pack.yaml"
+    yaml_path.write_text("queries: {}")
+    with pytest.raises(ValueError):
+        packs.load_query_pack(str(yaml_path))
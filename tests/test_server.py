@@ -0,0 +1,109 @@
+"""Test the local stand-in server for the Falcon API."""
+
+import json
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+import pytest
+
+from caracara_filters import FQLGenerator
+from caracara_filters.evaluate import evaluate
+from caracara_filters.server import StandInServer, make_fixtures
+
+FIXTURES = make_fixtures(count=300)
+
+
+@pytest.fixture(name="server", scope="module")
+def fixture_server():
+    """Run a stand-in server for the duration of the tests."""
+    with StandInServer(FIXTURES) as server:
+        yield server
+
+
+def get_json(url: str, data=None):
+    """Send a request, and return the status code and decoded JSON body of the response."""
+    try:
+        with urllib.request.urlopen(url, data=data) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+
+def test_fixtures():
+    """Test that synthetic fixtures are reproducible and cover each dialect."""
+    assert make_fixtures(count=5, seed=1) == make_fixtures(count=5, seed=1)
+    assert sorted(FIXTURES) == ["hosts", "iocs", "sensor_download", "users"]
+    assert all(len(x) == 300 for x in FIXTURES.values())
+
+
+def test_pagination(server):
+    """Test that queries are filtered and paginated, matching local evaluation."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("os", "Linux")
+    fql_generator.create_new_filter("last_seen", "2023-03-01T00:00:00Z", "GTE")
+    expected = [x["device_id"] for x in FIXTURES["hosts"] if evaluate(fql_generator, x)]
+
+    device_ids = []
+    offset = 0
+    while True:
+        status, body = get_json(
+            f"{server.url}/devices/queries/devices/v1?limit=25&offset={offset}"
+            f"&filter={fql_generator.get_fql(encoded=True)}"
+        )
+        assert status == 200
+        assert body["meta"]["pagination"]["total"] == len(expected)
+        if not body["resources"]:
+            break
+        device_ids.extend(body["resources"])
+        offset += 25
+
+    assert device_ids == expected
+
+
+def test_form_encoded_filter(server):
+    """Test that a form encoded filter, whose spaces become + signs, is decoded correctly."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("os", ["Linux", "Mac"])
+    fql_generator.create_new_filter("site", "New York")
+    expected = [x["device_id"] for x in FIXTURES["hosts"] if evaluate(fql_generator, x)]
+
+    query = urlencode({"filter": fql_generator.get_fql(), "limit": 500})
+    assert "+" in query and "%2B" in query
+    status, body = get_json(f"{server.url}/devices/queries/devices/v1?{query}")
+    assert status == 200
+    assert expected and body["resources"] == expected
+
+
+def test_other_dialects(server):
+    """Test the combined and entities endpoints of the other dialects."""
+    query = urlencode({"filter": "type: 'md5'+expired: false", "limit": 50})
+    status, body = get_json(f"{server.url}/iocs/combined/indicator/v1?{query}")
+    assert status == 200
+    assert body["resources"] and all(x["type"] == "md5" for x in body["resources"])
+
+    sha256 = FIXTURES["sensor_download"][0]["sha256"]
+    status, body = get_json(f"{server.url}/sensors/entities/installers/v2?ids={sha256}&ids=x")
+    assert status == 200 and body["resources"] == [FIXTURES["sensor_download"][0]]
+
+    uuid = FIXTURES["users"][1]["uuid"]
+    status, body = get_json(
+        f"{server.url}/user-management/entities/users/GET/v1",
+        data=json.dumps({"ids": [uuid]}).encode("utf-8"),
+    )
+    assert status == 200 and body["resources"] == [FIXTURES["users"][1]]
+
+
+def test_errors(server):
+    """Test that invalid requests are rejected with Falcon-style errors."""
+    status, body = get_json(f"{server.url}/devices/queries/devices/v1?filter=hostname")
+    assert status == 400 and body["errors"][0]["code"] == 400
+
+    status, _ = get_json(f"{server.url}/devices/queries/devices/v1?limit=0")
+    assert status == 400
+
+    status, _ = get_json(f"{server.url}/not/an/endpoint")
+    assert status == 404
+
+    status, body = get_json(f"{server.url}/oauth2/token", data=b"client_id=x&client_secret=y")
+    assert status == 201 and body["token_type"] == "bearer"
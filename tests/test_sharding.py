@@ -0,0 +1,99 @@
+"""Test splitting FQL generators into shards that can be fetched concurrently."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from caracara_filters import FQLGenerator
+from caracara_filters.sharding import shard_by_device_id, shard_by_time
+
+
+def _iocs_generator():
+    """Create an IOCs FQL generator with a single filter."""
+    fql_generator = FQLGenerator(dialect="iocs")
+    fql_generator.create_new_filter("type", "domain")
+    return fql_generator
+
+
+def test_shard_by_count():
+    """Test splitting a time range into a number of contiguous windows."""
+    fql_generator = _iocs_generator()
+    shards = shard_by_time(
+        fql_generator, "modified_on", "2023-01-01T00:00:00Z", "2023-01-04T00:00:00Z", shards=3
+    )
+    assert [x.get_fql() for x in shards] == [
+        "type: 'domain'+modified_on: >='2023-01-01T00:00:00Z'+modified_on: <'2023-01-02T00:00:00Z'",
+        "type: 'domain'+modified_on: >='2023-01-02T00:00:00Z'+modified_on: <'2023-01-03T00:00:00Z'",
+        "type: 'domain'+modified_on: >='2023-01-03T00:00:00Z'+modified_on: <'2023-01-04T00:00:00Z'",
+    ]
+    assert len(fql_generator.filters) == 1
+
+
+def test_shard_by_interval():
+    """Test splitting a time range by interval, with a shortened final window."""
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    shards = shard_by_time(
+        _iocs_generator(), "created_on", start, start + timedelta(hours=5), interval=7200
+    )
+    assert [x.get_fql().rsplit("<", 1)[1] for x in shards] == [
+        "'2023-01-01T02:00:00Z'",
+        "'2023-01-01T04:00:00Z'",
+        "'2023-01-01T05:00:00Z'",
+    ]
+
+
+def test_shard_replaces_existing_bounds():
+    """Test that existing filters on the sharded property are replaced by each window's bounds."""
+    fql_generator = _iocs_generator()
+    fql_generator.create_new_filter("modified_on", "2022-06-01T00:00:00Z", "GTE")
+    fql_generator.create_new_filter("modifiedon", "2024-01-01T00:00:00Z", "LESS")
+    shards = shard_by_time(
+        fql_generator, "modified_on", "2023-01-01T00:00:00Z", "2023-01-03T00:00:00Z", shards=2
+    )
+    assert [x.get_fql() for x in shards] == [
+        "type: 'domain'+modified_on: >='2023-01-01T00:00:00Z'+modified_on: <'2023-01-02T00:00:00Z'",
+        "type: 'domain'+modified_on: >='2023-01-02T00:00:00Z'+modified_on: <'2023-01-03T00:00:00Z'",
+    ]
+    assert len(fql_generator.filters) == 3
+
+
+def test_invalid_shards():
+    """Test that invalid ranges and shard specifications are rejected."""
+    start, end = "2023-01-02T00:00:00Z", "2023-01-01T00:00:00Z"
+    with pytest.raises(ValueError):
+        shard_by_time(_iocs_generator(), "modified_on", start, end, shards=2)
+
+    with pytest.raises(ValueError):
+        shard_by_time(_iocs_generator(), "modified_on", end, start)
+
+    with pytest.raises(ValueError):
+        shard_by_time(_iocs_generator(), "modified_on", end, start, shards=2, interval=60)
+
+    # The filter must exist, and support both of the operators used for each window's bounds
+    with pytest.raises(ValueError):
+        shard_by_time(_iocs_generator(), "not_a_filter", end, start, shards=2)
+
+    with pytest.raises(ValueError):
+        shard_by_time(_iocs_generator(), "type", end, start, shards=2)
+
+
+def test_shard_by_device_id():
+    """Test splitting a hosts query by device ID prefix."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("os", "Linux")
+    shards = shard_by_device_id(fql_generator)
+    assert len(shards) == 16
+    assert shards[0].get_fql() == "platform_name: 'Linux'+device_id: '0*'"
+    assert shards[15].get_fql() == "platform_name: 'Linux'+device_id: 'f*'"
+
+    shards = shard_by_device_id(fql_generator, shards=256)
+    assert [x.get_fql().rsplit("+", 1)[1] for x in shards[254:]] == [
+        "device_id: 'fe*'",
+        "device_id: 'ff*'",
+    ]
+
+    with pytest.raises(ValueError):
+        shard_by_device_id(fql_generator, shards=32)
+
+    with pytest.raises(ValueError):
+        shard_by_device_id(FQLGenerator(dialect="users"))
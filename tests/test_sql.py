@@ -0,0 +1,146 @@
+"""Test translating FQL generators into SQLite WHERE clauses."""
+
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from caracara_filters import FQLGenerator
+from caracara_filters.evaluate import evaluate
+from caracara_filters.fql import FilterArgs
+
+HOSTS = [
+    {
+        "hostname": f"HOST-{i:03d}",
+        "platform_name": ["Windows", "Linux", "Mac"][i % 3],
+        "site_name": ["London", "Paris", None][i % 3 if i % 5 else 2],
+        "last_seen": f"2023-01-{i % 28 + 1:02d}T00:00:00Z",
+    }
+    for i in range(200)
+]
+
+
+@pytest.fixture(name="connection")
+def fixture_connection():
+    """Return a SQLite database of hosts, with case-insensitive columns as FQL expects."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute(
+        "CREATE TABLE hosts (name TEXT COLLATE NOCASE, platform_name TEXT COLLATE NOCASE, "
+        "site_name TEXT COLLATE NOCASE, last_seen TEXT)"
+    )
+    connection.executemany(
+        "INSERT INTO hosts VALUES (?, ?, ?, ?)",
+        [(x["hostname"], x["platform_name"], x["site_name"], x["last_seen"]) for x in HOSTS],
+    )
+    yield connection
+    connection.close()
+
+
+def select_hostnames(connection, fql_generator, **kwargs):
+    """Run a generator's WHERE clause against the database, and return the matching hostnames."""
+    where, params = fql_generator.to_sql({"hostname": "name"}, connection=connection, **kwargs)
+    rows = connection.execute(f"SELECT name FROM hosts WHERE {where} ORDER BY name", params)
+    return [row[0] for row in rows]
+
+
+def expected_hostnames(fql_generator):
+    """Return the hostnames of the records that match a generator when evaluated locally."""
+    return [x["hostname"] for x in HOSTS if evaluate(fql_generator, x)]
+
+
+def test_where_clause():
+    """Test the WHERE clause and bind parameters generated for a simple generator."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    assert fql_generator.to_sql() == ("1", [])
+
+    fql_generator.create_new_filter("os", ["Linux", "Mac"])
+    fql_generator.create_new_filter("last_seen", "2023-01-10T00:00:00Z", "GTE")
+    fql_generator.create_new_filter("hostname", "WEB_*")
+    assert fql_generator.to_sql({"hostname": "name"}) == (
+        '"platform_name" IN (?, ?) AND "last_seen" >= ? AND "name" LIKE ? ESCAPE \'\\\'',
+        ["Linux", "Mac", "2023-01-10T00:00:00Z", "WEB\\_%"],
+    )
+
+
+def test_matches_local_evaluation(connection):
+    """Test that the database returns the same records as local evaluation."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("os", ["Linux", "Mac"])
+    fql_generator.create_new_filter("last_seen", "2023-01-10T00:00:00Z", "GTE")
+    fql_generator.create_new_filter("hostname", "host-1*")
+    assert select_hostnames(connection, fql_generator) == expected_hostnames(fql_generator)
+
+    negated = FQLGenerator(dialect="hosts")
+    negated.add_filter(FilterArgs("site_name", "site_name", ["london"], "NOT"))
+    assert select_hostnames(connection, negated) == expected_hostnames(negated)
+
+    nulls = FQLGenerator(dialect="hosts")
+    nulls.add_filter(FilterArgs("site_name", "site_name", None, "EQUAL"))
+    assert select_hostnames(connection, nulls) == expected_hostnames(nulls)
+
+
+def test_large_lists(connection):
+    """Test that large lists are stored in a temporary table, which requires a connection."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("hostname", [f"HOST-{i:03d}" for i in range(0, 200, 2)])
+    where, params = fql_generator.to_sql({"hostname": "name"}, max_inline_values=100)
+    assert where.startswith('"name" IN (?, ?') and len(params) == 100
+
+    with pytest.raises(ValueError):
+        fql_generator.to_sql(max_inline_values=10)
+
+    where, params = fql_generator.to_sql(connection=connection, max_inline_values=10)
+    assert "IN (SELECT value FROM temp." in where and not params
+
+    assert select_hostnames(connection, fql_generator, max_inline_values=10) == (
+        expected_hostnames(fql_generator)
+    )
+
+
+def temp_tables(connection):
+    """Return the names of the temporary tables on a connection."""
+    rows = connection.execute("SELECT name FROM temp.sqlite_master WHERE type = 'table'")
+    return [row[0] for row in rows]
+
+
+def test_temp_tables_dropped(connection):
+    """Test that the temporary tables of a clause are dropped once it is closed."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("hostname", [f"HOST-{i:03d}" for i in range(0, 200, 2)])
+    clause = fql_generator.to_sql({"hostname": "name"}, connection=connection, max_inline_values=10)
+    with clause as (where, params):
+        assert len(temp_tables(connection)) == 1
+        rows = connection.execute(f"SELECT name FROM hosts WHERE {where}", params).fetchall()
+        assert len(rows) == len(expected_hostnames(fql_generator))
+    assert not temp_tables(connection)
+
+    clause = fql_generator.to_sql(connection=connection, max_inline_values=10)
+    assert clause.connection is connection and clause.params == []
+    assert clause.where.startswith('"hostname" IN (SELECT')
+    clause.close()
+    clause.close()
+    assert not temp_tables(connection)
+
+    # Tables created before a filter fails to compile are dropped too
+    fql_generator.create_new_filter("local_ip", "10.0.0.0/8")
+    with pytest.raises(ValueError):
+        fql_generator.to_sql(connection=connection, max_inline_values=10)
+    assert not temp_tables(connection)
+
+
+def test_import_without_sqlite3():
+    """Test that the package can be imported on Python builds without the sqlite3 module."""
+    code = (
+        "import sys; sys.modules['sqlite3'] = None; sys.modules['_sqlite3'] = None; "
+        "import caracara_filters; assert 'caracara_filters.sql' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_cidr_rejected():
+    """Test that CIDR networks, which SQL cannot express, are rejected."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    fql_generator.create_new_filter("local_ip", "10.0.0.0/8")
+    with pytest.raises(ValueError):
+        fql_generator.to_sql()
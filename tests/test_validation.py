@@ -0,0 +1,107 @@
+"""Test collecting every validation error into a report, rather than raising the first."""
+
+import pytest
+
+from caracara_filters import FQLGenerator, ValidationIssue, ValidationReport
+
+
+def test_collect_list_errors():
+    """Test that every invalid item of a multivariate filter is reported in one pass."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    report = ValidationReport()
+    values = ["10.0.0.1", "not an ip", 5, "10.0.0.2", "999.0.0.1"]
+    assert fql_generator.create_new_filter("local_ip", values, report=report) is None
+    assert not fql_generator.filters
+    assert not report.ok
+    assert [(x.filter_name, x.index, x.value) for x in report] == [
+        ("local_ip", 1, "not an ip"),
+        ("local_ip", 2, 5),
+        ("local_ip", 4, "999.0.0.1"),
+    ]
+    assert "local_ip[2]: The type" in str(report)
+
+
+def test_drop_invalid():
+    """Test that invalid items can be dropped, keeping the valid remainder."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    report = ValidationReport()
+    filter_id = fql_generator.create_new_filter(
+        "local_ip", ["10.0.0.1", "nope", "10.0.0.2"], report=report, drop_invalid=True
+    )
+    assert fql_generator.filters[filter_id].value == ["10.0.0.1", "10.0.0.2"]
+    assert len(report) == 1
+
+    assert fql_generator.create_new_filter("local_ip", ["nope"], drop_invalid=True) is None
+    assert fql_generator.create_new_filter("rfm", "maybe", drop_invalid=True) is None
+    assert len(fql_generator.filters) == 1
+
+
+def test_create_new_filters():
+    """Test creating filters in bulk, with and without dropping invalid entries."""
+    filter_specs = [
+        {"name": "os", "value": "Windows"},
+        {"name": "not_a_filter", "value": "x"},
+        {"name": "hostname", "value": "HOST1", "operator": "GTE"},
+        {"name": "local_ip", "value": ["10.0.0.1", "bad"]},
+    ]
+    fql_generator = FQLGenerator(dialect="hosts")
+    report = fql_generator.create_new_filters(filter_specs)
+    assert [x.filter_name for x in report] == ["not_a_filter", "hostname", "local_ip"]
+    assert isinstance(report.issues[0], ValidationIssue)
+    assert report.issues[0].index is None
+    assert not report.filter_ids
+    assert not fql_generator.filters
+
+    report = fql_generator.create_new_filters(filter_specs, drop_invalid=True)
+    assert len(report.filter_ids) == 2
+    assert fql_generator.get_fql() == "platform_name: 'Windows'+local_ip: ['10.0.0.1']"
+
+
+def test_create_new_filters_malformed_specs():
+    """Test that malformed filter specifications are reported by position, not raised."""
+    filter_specs = [
+        {"value": "Windows"},
+        ["os", "Windows"],
+        {"name": "hostname", "value": "HOST1"},
+    ]
+    fql_generator = FQLGenerator(dialect="hosts")
+    report = fql_generator.create_new_filters(filter_specs)
+    assert [(x.filter_name, x.index, x.value) for x in report] == [
+        ("", 0, {"value": "Windows"}),
+        ("", 1, ["os", "Windows"]),
+    ]
+    assert not fql_generator.filters
+
+    report = fql_generator.create_new_filters(iter(filter_specs), drop_invalid=True)
+    assert len(report) == 2 and len(report.filter_ids) == 1
+    assert fql_generator.get_fql() == "hostname: 'HOST1'"
+
+
+def test_budget_reported():
+    """Test that a filter that would exceed the generator's budget is recorded in the report."""
+    fql_generator = FQLGenerator(dialect="hosts", max_values=3)
+    filter_specs = [
+        {"name": "os", "value": "Windows"},
+        {"name": "hostname", "value": ["HOST1", "HOST2", "HOST3"]},
+    ]
+    report = fql_generator.create_new_filters(filter_specs)
+    assert [(x.filter_name, x.index) for x in report] == [("hostname", None)]
+    assert "over budget" in report.issues[0].reason
+    assert not fql_generator.filters
+
+    report = fql_generator.create_new_filters(filter_specs, drop_invalid=True)
+    assert len(report) == 1 and len(report.filter_ids) == 1
+    assert fql_generator.get_fql() == "platform_name: 'Windows'"
+
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("hostname", ["HOST1", "HOST2", "HOST3"])
+
+
+def test_raises_without_report():
+    """Test that the default behaviour of raising the first error is unchanged."""
+    fql_generator = FQLGenerator(dialect="hosts")
+    with pytest.raises(ValueError):
+        fql_generator.create_new_filter("local_ip", ["10.0.0.1", "bad"])
+
+    with pytest.raises(TypeError):
+        fql_generator.create_new_filter("local_ip", ["10.0.0.1", 5])